@@ -18,6 +18,9 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from src.assistant.cache import ResultCache
+from src.assistant.incremental import IncrementalStore
+from src.assistant.model_store import ModelStore
 from src.assistant.datasource import LocalFilesDataSource
 from src.assistant.runner import (
     AnomalyConfig,
@@ -45,6 +48,11 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     )
     ap.add_argument("--root", default="data", help="Folder to scan for CSV/Parquet files")
     ap.add_argument("--max-rows", type=int, default=0, help="Limit rows per file (0 = all)")
+    ap.add_argument("--lazy", action="store_true", help="Scan local files lazily (pushdown into CSV/Parquet/NDJSON scans)")
+    ap.add_argument("--sampling", choices=["head", "random", "row_groups", "stratified"], default="head", help="How --max-rows rows are picked (row_groups: Parquet only)")
+    ap.add_argument("--streaming", action="store_true", help="Lakehouse: stream tables as Arrow batches and compute exact full-table statistics")
+    ap.add_argument("--prefetch", type=int, default=1, help="Lakehouse schema mode: number of tables fetched concurrently")
+    ap.add_argument("--sampling-column", default=None, help="Column to stratify on (stratified) or hash on (random, SQL sources)")
     
     # Lakehouse config
     ap.add_argument("--lakehouse", action="store_true", help="Use Lakehouse connection instead of local files")
@@ -66,9 +74,28 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     ap.add_argument("--contamination", type=float, default=0.01, help="Isolation Forest contamination")
     ap.add_argument("--n-estimators", type=int, default=100, help="Isolation Forest estimators")
     ap.add_argument("--random-state", type=int, default=42, help="Isolation Forest random state")
+    ap.add_argument("--isoforest-max-samples", type=int, default=100_000, help="Isolation Forest: complete rows used for fitting (0 = all)")
+    ap.add_argument("--isoforest-n-jobs", type=int, default=1, help="Isolation Forest: parallel jobs (-1 = all cores)")
+    ap.add_argument("--max-workers", type=int, default=1, help="Datasets analysed in parallel")
+    ap.add_argument("--executor", choices=["thread", "process"], default="thread", help="Worker pool type for --max-workers > 1")
+    ap.add_argument("--iqr-backend", choices=["exact", "sketch"], default="exact", help="IQR quartiles: exact, or KLL quantile sketch (bounded memory)")
+    ap.add_argument("--quantile-error", type=float, default=0.01, help="Rank error of the quantile sketch (--iqr-backend sketch)")
+    ap.add_argument("--use-mad", action="store_true", help="Enable modified Z-Score (median/MAD) detector")
+    ap.add_argument("--mad-threshold", type=float, default=3.5, help="Modified Z-Score threshold")
+    ap.add_argument("--use-hampel", action="store_true", help="Enable rolling Hampel filter (ordered data)")
+    ap.add_argument("--hampel-window", type=int, default=7, help="Hampel window in rows (centred)")
+    ap.add_argument("--hampel-threshold", type=float, default=3.0, help="Hampel threshold in robust standard deviations")
+    ap.add_argument("--hampel-order-by", type=str, default=None, help="Column that orders the rows for the Hampel filter (default: file order)")
+    ap.add_argument("--top-anomalies", type=int, default=50, help="Rows in the combined top_anomalies ranking of all detectors (0 = off)")
+    ap.add_argument("--inline-rows-limit", type=int, default=10_000, help="Methods flagging more rows store them compactly encoded (anomaly_rows_encoded)")
+    ap.add_argument("--no-nested-fields", action="store_true", help="Do not score numeric Struct fields (e.g. address.zip) as columns")
 
     # I/O
     ap.add_argument("--report", type=str, default="artifacts/assistant_report.json", help="Path to write JSON report")
+    ap.add_argument("--cache-dir", type=str, default=None, help="Reuse per-dataset results cached in this folder while data and config are unchanged")
+    ap.add_argument("--model-dir", type=str, default=None, help="Persist fitted Isolation Forests here and reuse them for unchanged data and later increments")
+    ap.add_argument("--incremental-state", type=str, default=None, help="Only analyse rows appended since the last run; marks and merged statistics are kept in this folder")
+    ap.add_argument("--watermark-column", type=str, default=None, help="With --incremental-state: increasing column marking new rows (default: row count)")
     ap.add_argument("--save-anomalies", type=str, default="artifacts/anomalies", help="Folder to save anomaly samples (per dataset)")
     ap.add_argument("--config", type=str, default="", help="Optional YAML config to override CLI options")
     ap.add_argument("--verbose", action="store_true", help="Verbose console output")
@@ -117,6 +144,9 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     data_root = cfg.get("root", args.root)
     max_rows = int(cfg.get("max_rows", args.max_rows)) or 0
+    lazy = bool(cfg.get("lazy", args.lazy))
+    sampling = str(cfg.get("sampling", args.sampling))
+    sampling_column = cfg.get("sampling_column", args.sampling_column)
 
     # Semantic mapping config
     refs = coalesce_reference_fields(args, cfg)
@@ -136,6 +166,22 @@ def main(argv: Optional[List[str]] = None) -> int:
     contamination = float(cfg.get("contamination", args.contamination))
     n_estimators = int(cfg.get("n_estimators", args.n_estimators))
     random_state = int(cfg.get("random_state", args.random_state))
+    isoforest_max_samples = int(cfg.get("isoforest_max_samples", args.isoforest_max_samples)) or None
+    isoforest_n_jobs = int(cfg.get("isoforest_n_jobs", args.isoforest_n_jobs))
+    max_workers = int(cfg.get("max_workers", args.max_workers))
+    executor = str(cfg.get("executor", args.executor))
+    iqr_backend = str(cfg.get("iqr_backend", args.iqr_backend))
+    quantile_error = float(cfg.get("quantile_error", args.quantile_error))
+    use_mad = bool(cfg.get("use_mad", args.use_mad))
+    mad_threshold = float(cfg.get("mad_threshold", args.mad_threshold))
+    use_hampel = bool(cfg.get("use_hampel", args.use_hampel))
+    hampel_window = int(cfg.get("hampel_window", args.hampel_window))
+    hampel_threshold = float(cfg.get("hampel_threshold", args.hampel_threshold))
+    hampel_order_by = cfg.get("hampel_order_by", args.hampel_order_by)
+    top_anomalies = int(cfg.get("top_anomalies", args.top_anomalies))
+    ensemble_weights = cfg.get("ensemble_weights")
+    inline_rows_limit = int(cfg.get("inline_rows_limit", args.inline_rows_limit))
+    nested_fields = bool(cfg.get("nested_fields", not args.no_nested_fields))
 
     report_path = Path(cfg.get("report", args.report))
     save_anomalies = Path(cfg.get("save_anomalies", args.save_anomalies))
@@ -144,6 +190,9 @@ def main(argv: Optional[List[str]] = None) -> int:
     if not refs:
         print("[warn] No reference fields provided. Use --refs or --refs-file or config. Semantic mapping will be trivial.")
 
+    incremental_dir = cfg.get("incremental_state", args.incremental_state)
+    watermark_column = cfg.get("watermark_column", args.watermark_column)
+
     if args.lakehouse:
         if not args.query and not args.schema:
             print("[error] Either --query or --schema is required when using --lakehouse")
@@ -153,18 +202,33 @@ def main(argv: Optional[List[str]] = None) -> int:
             from src.assistant.datasource import LakehouseSQLDataSource
             
             conn = get_connection()
+            # Sampling/streaming/prefetch options are only passed when requested
+            sampling_kwargs = {}
+            if sampling != "head":
+                sampling_kwargs = {"sampling": sampling, "sampling_column": sampling_column}
+            if cfg.get("streaming", args.streaming):
+                sampling_kwargs["streaming"] = True
+            prefetch = int(cfg.get("prefetch", args.prefetch))
+            if prefetch > 1:
+                sampling_kwargs["prefetch"] = prefetch
+            if watermark_column:
+                sampling_kwargs["watermark_column"] = watermark_column
             
             if args.schema:
                 source = LakehouseSQLDataSource(
                     connection_uri=conn, 
                     schema=args.schema,
-                    max_rows=max_rows
+                    max_rows=max_rows,
+                    **sampling_kwargs
                 )
                 print(f"Using Lakehouse connection with schema: {args.schema}")
             else:
+                if sampling_kwargs:
+                    sampling_kwargs["max_rows"] = max_rows
                 source = LakehouseSQLDataSource(
                     connection_uri=conn, 
-                    query=args.query
+                    query=args.query,
+                    **sampling_kwargs
                 )
                 print(f"Using Lakehouse connection with query: {args.query}")
         except ImportError:
@@ -174,7 +238,11 @@ def main(argv: Optional[List[str]] = None) -> int:
             print(f"[error] Failed to establish Lakehouse connection: {e}")
             return 1
     else:
-        source = LocalFilesDataSource(root=data_root, max_rows=max_rows)
+        source = LocalFilesDataSource(
+            root=data_root, max_rows=max_rows, lazy=lazy,
+            sampling=sampling, sampling_column=sampling_column,
+            watermark_column=watermark_column,
+        )
 
     mapping_cfg = MappingConfig(
         reference_fields=refs,
@@ -190,9 +258,32 @@ def main(argv: Optional[List[str]] = None) -> int:
         contamination=contamination,
         n_estimators=n_estimators,
         random_state=random_state,
+        isoforest_max_samples=isoforest_max_samples,
+        isoforest_n_jobs=isoforest_n_jobs,
+        max_workers=max_workers,
+        executor=executor,
+        iqr_backend=iqr_backend,
+        quantile_error=quantile_error,
+        use_mad=use_mad,
+        mad_threshold=mad_threshold,
+        use_hampel=use_hampel,
+        hampel_window=hampel_window,
+        hampel_threshold=hampel_threshold,
+        hampel_order_by=hampel_order_by,
+        top_anomalies=top_anomalies,
+        ensemble_weights=ensemble_weights,
+        inline_rows_limit=inline_rows_limit,
+        nested_fields=nested_fields,
     )
 
-    report = run_assistant(source, mapping_cfg, anomaly_cfg, save_dir=save_anomalies)
+    cache_dir = cfg.get("cache_dir", args.cache_dir)
+    run_kwargs = {"cache": ResultCache(cache_dir)} if cache_dir else {}
+    if incremental_dir:
+        run_kwargs["incremental"] = IncrementalStore(incremental_dir, watermark_column)
+    model_dir = cfg.get("model_dir", args.model_dir)
+    if model_dir:
+        run_kwargs["models"] = ModelStore(model_dir)
+    report = run_assistant(source, mapping_cfg, anomaly_cfg, save_dir=save_anomalies, **run_kwargs)
 
     # Write report
     report_path.parent.mkdir(parents=True, exist_ok=True)
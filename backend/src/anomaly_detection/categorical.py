@@ -1,65 +1,106 @@
+import numpy as np
 import polars as pl
+from typing import Any, Dict, List, Optional
 
-def detect_categorical_anomalies(df: pl.DataFrame, threshold: float = 0.01) -> pl.DataFrame:
+from .scoring import AnomalyScores
+
+CATEGORICAL_DTYPES = (pl.Utf8, pl.Int8, pl.Int16, pl.Int32, pl.Int64)
+
+
+def _categorical_columns(
+    df: pl.DataFrame,
+    max_unique: float,
+    frequencies: Optional[Dict[str, Dict[Any, int]]],
+) -> List[str]:
+    # String or integer columns with few distinct values; cardinalities of all
+    # candidates in one select. Columns where every value is unique (like Order_ID)
+    # or highly diverse text are ignored.
+    candidates = [c for c, dtype in df.schema.items() if dtype in CATEGORICAL_DTYPES]
+    if frequencies is not None:
+        return [c for c in candidates if c in frequencies and len(frequencies[c]) <= max_unique]
+    if not candidates:
+        return []
+    n_unique = df.select([pl.col(c).n_unique() for c in candidates]).row(0, named=True)
+    return [c for c in candidates if n_unique[c] <= max_unique]
+
+
+def _frequency_tables(df: pl.DataFrame, columns: List[str]) -> Dict[str, pl.DataFrame]:
+    # Value counts of all columns in one select (one imploded frequency table per column)
+    if not columns:
+        return {}
+    row = df.select([pl.col(c).value_counts().implode() for c in columns]).row(0, named=True)
+    return {
+        c: pl.DataFrame(row[c], schema={c: df.schema[c], "count": pl.UInt32}).drop_nulls(c) for c in columns
+    }
+
+
+def categorical_scores(
+    df: pl.DataFrame,
+    threshold: float = 0.01,
+    frequencies: Optional[Dict[str, Dict[Any, int]]] = None,
+    total_rows: Optional[int] = None,
+) -> AnomalyScores:
     """
-    Identifies rows containing rare values in categorical columns.
-    
-    A value is considered rare if its frequency is below the threshold.
-    Returns a DataFrame containing only the anomalous rows.
+    Rare categorical values as per-row scores.
+
+    Every value is looked up in the frequency table of its column; the share of the
+    rarest value in a row gives the score (1 - share) and a row is flagged when that
+    share is below `threshold`. Values missing from the table (and nulls) never flag.
+    frequencies/total_rows: see detect_categorical_anomalies.
     """
-    anomalous_indices = set()
-    
-    total_rows = df.height
-    if total_rows == 0:
-        return df.head(0)
-        
-    # A column is categorical if it has a low number of unique values.
-    # We ignore columns where every value is unique (like Order_ID) or highly diverse text.
-    max_unique_threshold = min(100, max(2, total_rows * 0.1))
+    empty = AnomalyScores(np.full(df.height, np.nan, dtype=np.float32), np.zeros(df.height, dtype=bool))
+    total_rows = total_rows if frequencies is not None else df.height
+    if df.height == 0 or not total_rows:
+        return empty
+    columns = _categorical_columns(df, min(100, max(2, total_rows * 0.1)), frequencies)
 
-    # Identify categorical columns (string or low-cardinality integers)
-    cat_cols = [
-        col for col in df.columns 
-        if (df[col].dtype == pl.Utf8 or df[col].dtype in (pl.Int8, pl.Int16, pl.Int32, pl.Int64)) 
-        and df[col].n_unique() <= max_unique_threshold
+    if frequencies is None:
+        tables = _frequency_tables(df, columns)
+    else:
+        tables = {}
+        for c in columns:
+            try:
+                tables[c] = pl.DataFrame(
+                    {c: list(frequencies[c].keys()), "count": list(frequencies[c].values())},
+                    schema_overrides={c: df.schema[c]},
+                )
+            except Exception:
+                # Stored values that do not fit the column's type (e.g. after a schema change)
+                continue
+
+    # Share of each value in its column: hash lookups against the (small) frequency
+    # tables, all columns in one select. Columns without rare values cannot flag and
+    # are not looked up; with none left every row is unscored (NaN).
+    shares = [
+        pl.col(c).replace_strict(
+            table[c], table["count"] / total_rows, default=None, return_dtype=pl.Float64
+        )
+        for c, table in tables.items()
+        if (table["count"] < threshold * total_rows).any()
     ]
-    
-    total_rows = df.height
-    if total_rows == 0:
-        return df.head(0)
+    if not shares:
+        return empty
+    rarest = df.select(pl.min_horizontal(shares).alias("share")).to_series()
+    return AnomalyScores(
+        scores=(1.0 - rarest).cast(pl.Float32).to_numpy(),
+        mask=(rarest < threshold).fill_null(False).to_numpy(),
+    )
 
-    for col in cat_cols:
-        try:
-            # Calculate value counts
-            counts = df[col].value_counts()
-            
-            # Filter for rare values
-            # count / total < threshold
-            rare_values = counts.filter(
-                (pl.col("count") / total_rows) < threshold
-            )[col]
-            
-            if rare_values.len() > 0:
-                # Find rows with these rare values
-                # We use is_in to find rows where the column value is in the set of rare values
-                rare_rows = df.with_row_count().filter(
-                    pl.col(col).is_in(rare_values)
-                )
-                
-                # Add indices to our set
-                for row in rare_rows.select("row_nr").to_series().to_list():
-                    anomalous_indices.add(row)
-                    
-        except Exception:
-            # Skip columns that cause errors (e.g. all nulls)
-            continue
-            
-    if not anomalous_indices:
-        return df.head(0)
-        
-    # Return the rows corresponding to the anomalous indices
-    # We need to sort indices to maintain order or just filter
-    # Using filter with is_in on row_nr is efficient
-    return df.with_row_count().filter(
-        pl.col("row_nr").is_in(list(anomalous_indices))
-    ).drop("row_nr")
+
+def detect_categorical_anomalies(
+    df: pl.DataFrame,
+    threshold: float = 0.01,
+    frequencies: Optional[Dict[str, Dict[Any, int]]] = None,
+    total_rows: Optional[int] = None,
+) -> pl.DataFrame:
+    """
+    Identifies rows containing rare values in categorical columns.
+
+    A value is considered rare if its frequency is below the threshold.
+    Returns a DataFrame containing only the anomalous rows.
+
+    frequencies/total_rows: value counts per column (and the row count they were
+    taken over) to judge rarity by, e.g. accumulated over earlier incremental runs.
+    Without them the frequencies within `df` are used.
+    """
+    return categorical_scores(df, threshold, frequencies, total_rows).take(df, df.height)
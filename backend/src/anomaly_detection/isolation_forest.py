@@ -1,50 +1,124 @@
 import polars as pl
 import numpy as np
 from sklearn.ensemble import IsolationForest
-from typing import List
+from typing import Iterable, List, Optional, Tuple
 
+from .scoring import AnomalyScores
 
-def isolation_forest_anomalies(
+
+def complete_rows(df: pl.DataFrame, columns: List[str]) -> np.ndarray:
+    """Boolean mask of rows without nulls in `columns` (the only rows the model sees)."""
+    return df.select(pl.all_horizontal([pl.col(c).is_not_null() for c in columns])).to_series().to_numpy()
+
+
+def fit_isolation_forest(
     df: pl.DataFrame,
     columns: List[str],
     contamination: float = 0.01,
     n_estimators: int = 100,
     random_state: int = 42,
-) -> pl.DataFrame:
+    max_samples: Optional[int] = None,
+    n_jobs: Optional[int] = None,
+) -> Optional[IsolationForest]:
     """
-    Ermittelt Ausreißer mit Isolation Forest.
+    Fits an Isolation Forest on the complete rows of `df`.
 
-    - Nutzt die angegebenen numerischen Spalten als Features.
-    - Ignoriert Zeilen mit Null/NaN in den Feature-Spalten beim Fitten, markiert sie standardmäßig nicht als Ausreißer.
-    - Gibt ein DataFrame mit nur Ausreißer-Zeilen zurück.
+    - max_samples: fit on a uniform subsample of at most this many complete rows
+      (drawn with `random_state`) instead of materialising the full feature matrix;
+      every tree only looks at 256 rows anyway, so the forest barely changes.
+    - n_jobs: parallel tree building and scoring (None = 1, -1 = all cores).
+    Returns None if there is no complete row.
+    """
+    mask = complete_rows(df, columns)
+    idx = np.flatnonzero(mask)
+    if idx.size == 0:
+        return None
+    if max_samples is not None and idx.size > max_samples:
+        idx = np.sort(np.random.default_rng(random_state).choice(idx, size=max_samples, replace=False))
+    X = df.select(columns)[idx].to_numpy()
+    model = IsolationForest(
+        contamination=contamination,
+        n_estimators=n_estimators,
+        random_state=random_state,
+        n_jobs=n_jobs,
+    )
+    return model.fit(X)
+
+
+def score_isolation_forest(
+    model: IsolationForest,
+    batches: Iterable[pl.DataFrame],
+    columns: List[str],
+) -> np.ndarray:
+    """
+    Decision function (< 0 = anomaly, contamination-calibrated) for every row of
+    `batches`, e.g. `df.iter_slices(100_000)` or record batches of a larger table.
+    Only one batch is converted to a feature matrix at a time, so memory stays flat
+    apart from the float32 result. Rows with nulls in `columns` score NaN.
+    """
+    parts = []
+    for batch in batches:
+        scores = np.full(batch.height, np.nan, dtype=np.float32)
+        mask = complete_rows(batch, columns)
+        if mask.any():
+            scores[mask] = model.decision_function(batch.select(columns).filter(pl.Series(mask)).to_numpy())
+        parts.append(scores)
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+
+
+def isolation_forest_scores(
+    df: pl.DataFrame,
+    columns: List[str],
+    contamination: float = 0.01,
+    n_estimators: int = 100,
+    random_state: int = 42,
+    max_samples: Optional[int] = None,
+    n_jobs: Optional[int] = None,
+    chunk_rows: int = 100_000,
+    model: Optional[IsolationForest] = None,
+) -> Tuple[Optional[IsolationForest], np.ndarray]:
+    """
+    Fits (unless a fitted `model` is passed) and scores all rows in chunks of
+    `chunk_rows`. Returns the model and the per-row decision function (NaN for
+    incomplete rows); the model is None if nothing could be fitted.
     """
     if not columns:
         raise ValueError("'columns' darf nicht leer sein.")
     for c in columns:
         if c not in df.columns:
             raise KeyError(f"Spalte '{c}' existiert nicht im DataFrame.")
+    if model is None:
+        model = fit_isolation_forest(df, columns, contamination, n_estimators, random_state, max_samples, n_jobs)
+    if model is None:
+        return None, np.full(df.height, np.nan, dtype=np.float32)
+    return model, score_isolation_forest(model, df.iter_slices(chunk_rows), columns)
 
-    # Zeilenmaske: nur vollständige Zeilen (keine Nulls) für das Modell verwenden
-    complete_mask_expr = pl.all_horizontal([pl.col(c).is_not_null() for c in columns])
-    complete_mask = df.select(complete_mask_expr.alias("_ok")).to_series().to_numpy()
 
-    # Feature-Matrix
-    X_complete = df.filter(pl.Series(complete_mask)).select(columns).to_numpy()
-    if X_complete.size == 0:
-        # Keine validen Zeilen -> keine Ausreißer
-        return df.clear()
+def decision_scores(decision: np.ndarray) -> AnomalyScores:
+    """Decision function values as AnomalyScores: score = -decision, flagged below 0 (NaN never)."""
+    with np.errstate(invalid="ignore"):
+        return AnomalyScores(scores=-decision, mask=decision < 0)
 
-    model = IsolationForest(
-        contamination=contamination,
-        n_estimators=n_estimators,
-        random_state=random_state,
-    )
-    preds_complete = model.fit_predict(X_complete)  # -1 = Anomalie, 1 = normal
 
-    # Vollständige Ergebnis-Maske in volle Länge zurückprojizieren
-    is_anomaly_full = np.zeros(len(df), dtype=bool)
-    is_anomaly_full[complete_mask] = (preds_complete == -1)
+def isolation_forest_anomalies(
+    df: pl.DataFrame,
+    columns: List[str],
+    contamination: float = 0.01,
+    n_estimators: int = 100,
+    random_state: int = 42,
+    max_samples: Optional[int] = None,
+    n_jobs: Optional[int] = None,
+    chunk_rows: int = 100_000,
+) -> pl.DataFrame:
+    """
+    Ermittelt Ausreißer mit Isolation Forest.
 
-    # Ergebnis-DataFrame mit Flag (optional nützlich)
-    df_flagged = df.with_columns(pl.Series("is_anomaly", is_anomaly_full))
-    return df_flagged.filter(pl.col("is_anomaly"))
+    - Nutzt die angegebenen numerischen Spalten als Features.
+    - Ignoriert Zeilen mit Null/NaN in den Feature-Spalten beim Fitten, markiert sie standardmäßig nicht als Ausreißer.
+    - max_samples/n_jobs/chunk_rows: siehe fit_isolation_forest und isolation_forest_scores.
+    - Gibt ein DataFrame mit nur Ausreißer-Zeilen zurück.
+    """
+    _, scores = isolation_forest_scores(
+        df, columns, contamination, n_estimators, random_state, max_samples, n_jobs, chunk_rows
+    )
+    return decision_scores(scores).take(df, df.height)
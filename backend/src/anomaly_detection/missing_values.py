@@ -1,5 +1,24 @@
+import numpy as np
 import polars as pl
 
+from .scoring import AnomalyScores
+
+
+def _missing_count(df: pl.DataFrame) -> pl.Expr:
+    # Missing = NULL, or empty string in string columns (common in CSV imports)
+    return pl.sum_horizontal([
+        (pl.col(c).is_null() | (pl.col(c) == "")) if dtype == pl.Utf8 else pl.col(c).is_null()
+        for c, dtype in df.schema.items()
+    ]).cast(pl.Int32)
+
+
+def missing_value_scores(df: pl.DataFrame, threshold: int = 1) -> AnomalyScores:
+    """Per-row missing value count as score, flagged from `threshold` missing values on."""
+    if df.width == 0:
+        return AnomalyScores(np.zeros(df.height, dtype=np.float32), np.zeros(df.height, dtype=bool))
+    counts = df.select(_missing_count(df)).to_series().to_numpy()
+    return AnomalyScores(scores=counts.astype(np.float32), mask=counts >= threshold)
+
 
 def detect_missing_value_anomalies(
     df: pl.DataFrame,
@@ -21,28 +40,4 @@ def detect_missing_value_anomalies(
     """
     if df.height == 0:
         return df.head(0)
-    
-    # Count missing values per row across all columns
-    # Missing = NULL or empty string (common in CSV imports)
-    missing_expressions = []
-    for col in df.columns:
-        # Check if column is string type
-        if df[col].dtype == pl.Utf8:
-            # For string columns: count NULLs and empty strings
-            missing_expr = (pl.col(col).is_null() | (pl.col(col) == "")).cast(pl.Int32)
-        else:
-            # For non-string columns: only count NULLs
-            missing_expr = pl.col(col).is_null().cast(pl.Int32)
-        missing_expressions.append(missing_expr)
-    
-    # Sum missing values across all columns for each row
-    missing_count_expr = sum(missing_expressions)
-    
-    # Add a temporary column with missing value counts
-    df_with_counts = df.with_columns(missing_count_expr.alias("_missing_count"))
-    
-    # Filter rows where missing count >= threshold
-    anomalies = df_with_counts.filter(pl.col("_missing_count") >= threshold)
-    
-    # Drop the temporary column before returning
-    return anomalies.drop("_missing_count")
+    return missing_value_scores(df, threshold).take(df, df.height)
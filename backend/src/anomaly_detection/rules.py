@@ -1,51 +1,398 @@
 import polars as pl
 import numpy as np
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Literal, Mapping, Optional, Sequence, Tuple
 
+from src.anomaly_detection.scoring import AnomalyScores
+from src.utils.sketches import KLLSketch
 
-def z_score_anomalies(df: pl.DataFrame, column: str, threshold: float = 3.0) -> pl.DataFrame:
+# "exact": quartiles from the in-memory column; "sketch": from a mergeable KLL sketch
+QuantileBackend = Literal["exact", "sketch"]
+
+
+@dataclass
+class ColumnFlags:
+    """
+    Result of a multi-column rule detector.
+    - mask: boolean frame, one column per checked column and one row per input row
+    - rows: sorted indices of rows flagged in at least one column
+    - bounds: per column the statistics the rule used (e.g. mean/std or lower/upper)
+    """
+    mask: pl.DataFrame
+    rows: np.ndarray
+    bounds: Dict[str, Dict[str, Optional[float]]]
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Flagged rows per column."""
+        if self.mask.width == 0:
+            return {}
+        return self.mask.sum().row(0, named=True)
+
+    @property
+    def total(self) -> int:
+        """Flags summed over all columns (a row flagged in two columns counts twice)."""
+        return int(sum(self.counts.values()))
+
+
+def _values(df: pl.DataFrame, column: str) -> pl.Expr:
+    # NaN counts as missing, like np.nanmean/np.nanpercentile
+    col = pl.col(column)
+    return col.fill_nan(None) if df.schema[column] in (pl.Float32, pl.Float64) else col
+
+
+def _check_columns(df: pl.DataFrame, columns: Sequence[str]) -> None:
+    for column in columns:
+        if column not in df.columns:
+            raise KeyError(f"Column '{column}' does not exist in the DataFrame.")
+
+
+def _flags(df: pl.DataFrame, exprs: List[pl.Expr], bounds: Dict[str, Dict[str, Optional[float]]]) -> ColumnFlags:
+    mask = df.select(exprs) if exprs else pl.DataFrame()
+    if mask.width:
+        rows = np.flatnonzero(mask.select(pl.any_horizontal(pl.all())).to_series().to_numpy())
+    else:
+        rows = np.empty(0, dtype=np.int64)
+    return ColumnFlags(mask=mask, rows=rows, bounds=bounds)
+
+
+def _stats(df: pl.DataFrame, exprs: Dict[str, pl.Expr]) -> Dict[str, Optional[float]]:
+    # All statistics of all columns in one pass over the frame
+    if not exprs:
+        return {}
+    return df.select([e.alias(k) for k, e in exprs.items()]).row(0, named=True)
+
+
+# Every rule is a per-column score expression (None: column cannot flag, e.g. no
+# variance) and a cutoff; a value is flagged where its score exceeds the cutoff.
+# The same expressions give per-column masks (*_flags) or per-row scores (*_scores).
+ScoreExprs = Dict[str, Optional[pl.Expr]]
+
+
+def _column_flags(df: pl.DataFrame, scores: ScoreExprs, cutoff: float, bounds) -> ColumnFlags:
+    exprs = [
+        (e > cutoff).fill_null(False).alias(c) if e is not None else pl.repeat(False, df.height, dtype=pl.Boolean).alias(c)
+        for c, e in scores.items()
+    ]
+    return _flags(df, exprs, bounds)
+
+
+def _row_scores(df: pl.DataFrame, scores: ScoreExprs, cutoff: float) -> AnomalyScores:
+    # Row score = highest column score; only the two per-row buffers and the counts are materialised
+    live = {c: e for c, e in scores.items() if e is not None}
+    if not live:
+        return AnomalyScores(
+            np.full(df.height, np.nan, dtype=np.float32), np.zeros(df.height, dtype=bool), dict.fromkeys(scores, 0)
+        )
+    flags = {c: (e > cutoff).fill_null(False) for c, e in live.items()}
+    row = df.select(
+        pl.max_horizontal(list(live.values())).cast(pl.Float32).alias("score"),
+        pl.any_horizontal(list(flags.values())).alias("mask"),
+    )
+    counts = df.select([f.sum().alias(c) for c, f in flags.items()]).row(0, named=True)
+    return AnomalyScores(
+        scores=row["score"].to_numpy(),
+        mask=row["mask"].to_numpy(),
+        column_counts={c: int(counts.get(c, 0)) for c in scores},
+    )
+
+
+def _z_score_exprs(df: pl.DataFrame, columns: Sequence[str], reference) -> Tuple[ScoreExprs, Dict]:
+    _check_columns(df, columns)
+    reference = reference or {}
+    own = [c for c in columns if not {"mean", "std"} <= set(reference.get(c, {}))]
+    stats = _stats(df, {
+        **{f"{i}:mean": _values(df, c).mean() for i, c in enumerate(columns) if c in own},
+        **{f"{i}:std": _values(df, c).std(ddof=0) for i, c in enumerate(columns) if c in own},
+    })
+    exprs, bounds = {}, {}
+    for i, c in enumerate(columns):
+        if c in own:
+            mean, std = stats[f"{i}:mean"], stats[f"{i}:std"]
+        else:
+            mean, std = reference[c]["mean"], reference[c]["std"]
+        bounds[c] = {"mean": mean, "std": std}
+        # No variance or only missing values: nothing to flag
+        exprs[c] = None if mean is None or not std or np.isnan(std) else ((_values(df, c) - mean) / std).abs()
+    return exprs, bounds
+
+
+def z_score_flags(
+    df: pl.DataFrame,
+    columns: Sequence[str],
+    threshold: float = 3.0,
+    reference: Optional[Mapping[str, Mapping[str, float]]] = None,
+) -> ColumnFlags:
+    """
+    Z-Score rule over several columns at once.
+
+    Means and (population) standard deviations of all columns are computed in one
+    select, then the |z| > threshold mask of every column in a second one.
+    reference: per column "mean"/"std" to score against instead of the column's own.
+    Columns without variance never flag; missing values never flag.
+    """
+    exprs, bounds = _z_score_exprs(df, columns, reference)
+    return _column_flags(df, exprs, threshold, bounds)
+
+
+def z_score_scores(
+    df: pl.DataFrame,
+    columns: Sequence[str],
+    threshold: float = 3.0,
+    reference: Optional[Mapping[str, Mapping[str, float]]] = None,
+) -> AnomalyScores:
+    """Per-row Z-Score rule: score = highest |z| of the row (see z_score_flags)."""
+    exprs, _ = _z_score_exprs(df, columns, reference)
+    return _row_scores(df, exprs, threshold)
+
+
+def _mad_exprs(df: pl.DataFrame, columns: Sequence[str]) -> Tuple[ScoreExprs, Dict]:
+    _check_columns(df, columns)
+    stat_exprs = {}
+    for i, c in enumerate(columns):
+        values = _values(df, c)
+        deviation = (values - values.median()).abs()
+        stat_exprs[f"{i}:median"] = values.median()
+        stat_exprs[f"{i}:mad"] = deviation.median()
+        stat_exprs[f"{i}:meanad"] = deviation.mean()
+    stats = _stats(df, stat_exprs)
+
+    exprs, bounds = {}, {}
+    for i, c in enumerate(columns):
+        median, mad, meanad = stats[f"{i}:median"], stats[f"{i}:mad"], stats[f"{i}:meanad"]
+        scale = mad / 0.6745 if mad else (1.253314 * meanad if meanad else None)
+        bounds[c] = {"median": median, "scale": scale}
+        # Constant or only missing values: nothing to flag
+        exprs[c] = None if median is None or scale is None else ((_values(df, c) - median) / scale).abs()
+    return exprs, bounds
+
+
+def mad_flags(
+    df: pl.DataFrame,
+    columns: Sequence[str],
+    threshold: float = 3.5,
+) -> ColumnFlags:
+    """
+    Modified Z-Score (Iglewicz & Hoaglin) over several columns at once:
+    M = 0.6745 * (x - median) / MAD, flagged where |M| > threshold.
+
+    Median and MAD are not inflated by the outliers themselves, so a few extreme
+    values (e.g. in revenue columns) cannot mask each other as they do with mean/std.
+    When more than half the values are equal (MAD = 0) the mean absolute
+    deviation is used instead: M = (x - median) / (1.253314 * MeanAD).
+    """
+    exprs, bounds = _mad_exprs(df, columns)
+    return _column_flags(df, exprs, threshold, bounds)
+
+
+def mad_scores(df: pl.DataFrame, columns: Sequence[str], threshold: float = 3.5) -> AnomalyScores:
+    """Per-row modified Z-Score rule: score = highest |M| of the row (see mad_flags)."""
+    exprs, _ = _mad_exprs(df, columns)
+    return _row_scores(df, exprs, threshold)
+
+
+def _hampel_frame(df: pl.DataFrame, columns: Sequence[str], window: int, order_by: Optional[str]) -> pl.DataFrame:
+    """Per-column |x - rolling median| / rolling scale, in the row order of `df`."""
+    if window < 3:
+        raise ValueError("window must be at least 3")
+    _check_columns(df, list(columns) + ([order_by] if order_by else []))
+    order = pl.col(order_by).arg_sort() if order_by else None
+
+    # Staged selects so each rolling median is evaluated once per column:
+    # |x - rolling median| (in `order_by` order), then the rolling scale of those deviations
+    deviations = df.select([
+        (_values(df, c).gather(order) if order is not None else _values(df, c)).alias(c)
+        for c in columns
+    ]).select([
+        (pl.col(c) - pl.col(c).rolling_median(window, center=True, min_samples=1)).abs()
+        for c in columns
+    ])
+    scales = deviations.select([
+        (1.4826 * pl.col(c).rolling_median(window, center=True, min_samples=1)).alias(c) for c in columns
+    ])
+    frame = pl.concat([deviations, scales.rename(lambda c: f"{c}:scale")], how="horizontal").select([
+        # A zero scale (flat neighbourhood) never flags
+        pl.when(pl.col(f"{c}:scale") > 0).then(pl.col(c) / pl.col(f"{c}:scale")).alias(c) for c in columns
+    ])
+    if order is not None:
+        # Back from sorted to original row positions
+        frame = frame.select(pl.all().gather(df.select(order.arg_sort()).to_series()))
+    return frame
+
+
+def hampel_flags(
+    df: pl.DataFrame,
+    columns: Sequence[str],
+    window: int = 7,
+    threshold: float = 3.0,
+    order_by: Optional[str] = None,
+) -> ColumnFlags:
+    """
+    Rolling Hampel filter for ordered data (time series, sequence numbers).
+
+    A value is flagged when it is more than `threshold` robust standard deviations
+    away from the median of the centred `window` around it. The local deviation is
+    1.4826 * the rolling median of |x - rolling median|, so everything stays a Polars
+    rolling expression. Rows are taken in frame order, or sorted by `order_by`
+    (results are mapped back to the original row positions).
+    """
+    frame = _hampel_frame(df, columns, window, order_by)
+    bounds = {c: {"window": window, "threshold": threshold} for c in columns}
+    return _column_flags(frame, {c: pl.col(c) for c in columns}, threshold, bounds)
+
+
+def hampel_scores(
+    df: pl.DataFrame,
+    columns: Sequence[str],
+    window: int = 7,
+    threshold: float = 3.0,
+    order_by: Optional[str] = None,
+) -> AnomalyScores:
+    """Per-row Hampel filter: score = highest local robust deviation of the row (see hampel_flags)."""
+    frame = _hampel_frame(df, columns, window, order_by)
+    return _row_scores(frame, {c: pl.col(c) for c in columns}, threshold)
+
+
+def column_sketches(
+    batches: Iterable[pl.DataFrame],
+    columns: Sequence[str],
+    epsilon: float = 0.01,
+) -> Dict[str, KLLSketch]:
+    """
+    KLL sketches of `columns` over a stream of batches (e.g. `df.iter_slices()` or
+    Arrow record batches of a table that does not fit in memory). Only one batch is
+    held at a time; sketches of different partitions or workers combine with `merge`.
+    epsilon: target rank error of the quantiles.
+    """
+    sketches = {c: KLLSketch.with_error(epsilon) for c in columns}
+    for batch in batches:
+        for c in columns:
+            values = batch.select(_values(batch, c).cast(pl.Float64)).to_series().drop_nulls()
+            sketches[c].update(values.to_numpy())
+    return sketches
+
+
+def sketch_quartiles(sketches: Mapping[str, KLLSketch]) -> Dict[str, Dict[str, float]]:
+    """q1/q3 per sketched column, in the `reference` format of iqr_flags (empty sketches are skipped)."""
+    out = {}
+    for c, sketch in sketches.items():
+        if sketch.n:
+            q1, q3 = sketch.quantiles([0.25, 0.75])
+            out[c] = {"q1": q1, "q3": q3}
+    return out
+
+
+def _iqr_exprs(
+    df: pl.DataFrame,
+    columns: Sequence[str],
+    reference,
+    backend: QuantileBackend,
+    quantile_error: float,
+    batch_rows: int,
+) -> Tuple[ScoreExprs, Dict]:
+    _check_columns(df, columns)
+    reference = reference or {}
+    own = [c for c in columns if not {"q1", "q3"} <= set(reference.get(c, {}))]
+    if backend == "sketch":
+        sketched = sketch_quartiles(column_sketches(df.iter_slices(batch_rows), own, quantile_error))
+        reference = {**reference, **sketched}
+        own = []
+    elif backend != "exact":
+        raise ValueError(f"Unknown quantile backend: {backend}. Allowed are 'exact', 'sketch'.")
+    stats = _stats(df, {
+        **{f"{i}:q1": _values(df, c).quantile(0.25, "linear") for i, c in enumerate(columns) if c in own},
+        **{f"{i}:q3": _values(df, c).quantile(0.75, "linear") for i, c in enumerate(columns) if c in own},
+    })
+
+    exprs, bounds = {}, {}
+    for i, c in enumerate(columns):
+        if c in own:
+            q1, q3 = stats[f"{i}:q1"], stats[f"{i}:q3"]
+        elif "q1" not in reference.get(c, {}):  # sketch of an all-missing column
+            q1 = q3 = None
+        else:
+            q1, q3 = reference[c]["q1"], reference[c]["q3"]
+        if q1 is None or q3 is None:  # empty or only missing values
+            bounds[c] = {"lower": None, "upper": None}
+            exprs[c] = None
+            continue
+        iqr = q3 - q1
+        lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        bounds[c] = {"lower": lower, "upper": upper}
+        # Distance beyond the nearer fence in IQRs (<= 0 inside the fences; raw distance if IQR = 0)
+        values = _values(df, c)
+        exprs[c] = pl.max_horizontal(lower - values, values - upper) / (iqr or 1.0)
+    return exprs, bounds
+
+
+def iqr_flags(
+    df: pl.DataFrame,
+    columns: Sequence[str],
+    reference: Optional[Mapping[str, Mapping[str, float]]] = None,
+    backend: QuantileBackend = "exact",
+    quantile_error: float = 0.01,
+    batch_rows: int = 100_000,
+) -> ColumnFlags:
+    """
+    IQR rule over several columns at once: values outside
+    [Q1 - 1.5*IQR, Q3 + 1.5*IQR] are flagged.
+
+    Quartiles (linear interpolation, as np.nanpercentile) of all columns are
+    computed in one select. reference: per column "q1"/"q3" to use instead.
+    backend="sketch" estimates the quartiles with KLL sketches fed `batch_rows`
+    rows at a time (rank error about `quantile_error`) instead of sorting each column.
+    """
+    exprs, bounds = _iqr_exprs(df, columns, reference, backend, quantile_error, batch_rows)
+    return _column_flags(df, exprs, 0.0, bounds)
+
+
+def iqr_scores(
+    df: pl.DataFrame,
+    columns: Sequence[str],
+    reference: Optional[Mapping[str, Mapping[str, float]]] = None,
+    backend: QuantileBackend = "exact",
+    quantile_error: float = 0.01,
+    batch_rows: int = 100_000,
+) -> AnomalyScores:
+    """Per-row IQR rule: score = largest distance beyond a fence, in IQRs (see iqr_flags)."""
+    exprs, _ = _iqr_exprs(df, columns, reference, backend, quantile_error, batch_rows)
+    return _row_scores(df, exprs, 0.0)
+
+
+def z_score_anomalies(
+    df: pl.DataFrame,
+    column: str,
+    threshold: float = 3.0,
+    mean: Optional[float] = None,
+    std: Optional[float] = None,
+) -> pl.DataFrame:
     """
     Finds outliers based on the Z-Score.
 
     - Calculates Z-Scores for the specified numeric column.
     - Returns all rows where the absolute Z-Score > threshold.
     - Handles NaN values robustly (ignored in mean/std calculation; NaN remains non-anomaly).
+    - mean/std: score against given statistics (e.g. of the whole table in incremental
+      runs) instead of those of `df`.
     """
-    if column not in df.columns:
-        raise KeyError(f"Column '{column}' does not exist in the DataFrame.")
-
-    values = df[column].to_numpy()
-    # Robuste Statistik mit NaN-Handling
-    mean = np.nanmean(values)
-    std = np.nanstd(values)
-    if std == 0 or np.isnan(std):  # No variance or only NaNs
-        return df.clear()
-
-    z_scores = (values - mean) / std
-    mask = np.abs(z_scores) > threshold
-    # Filter expects a Polars Expr or Series with row length
-    return df.filter(pl.Series(mask))
+    reference = {column: {"mean": mean, "std": std}} if mean is not None and std is not None else None
+    flags = z_score_flags(df, [column], threshold=threshold, reference=reference)
+    return df.filter(flags.mask[column])
 
 
-def iqr_anomalies(df: pl.DataFrame, column: str) -> pl.DataFrame:
+def iqr_anomalies(
+    df: pl.DataFrame,
+    column: str,
+    q1: Optional[float] = None,
+    q3: Optional[float] = None,
+) -> pl.DataFrame:
     """
     Finds outliers based on the Interquartile Range (IQR).
 
     - Values outside [Q1 - 1.5*IQR, Q3 + 1.5*IQR] are marked as outliers.
     - NaN values are ignored.
+    - q1/q3: use given quartiles (e.g. from a quantile sketch) instead of those of `df`.
     """
-    if column not in df.columns:
-        raise KeyError(f"Column '{column}' does not exist in the DataFrame.")
-
-    values = df[column].to_numpy()
-    # Falls alles NaN oder leer
-    if values.size == 0 or np.all(np.isnan(values)):
-        return df.clear()
-
-    q1 = np.nanpercentile(values, 25)
-    q3 = np.nanpercentile(values, 75)
-    iqr = q3 - q1
-    lower = q1 - 1.5 * iqr
-    upper = q3 + 1.5 * iqr
-    mask = (values < lower) | (values > upper)
-    return df.filter(pl.Series(mask))
+    reference = {column: {"q1": q1, "q3": q3}} if q1 is not None and q3 is not None else None
+    flags = iqr_flags(df, [column], reference=reference)
+    return df.filter(flags.mask[column])
@@ -0,0 +1,143 @@
+import numpy as np
+import polars as pl
+import pyarrow as pa
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+
+@dataclass
+class AnomalyScores:
+    """
+    Per-row output of a detector, without copying any rows.
+
+    - scores: float32, higher = more anomalous; NaN where a row could not be scored
+      (e.g. nulls in the features of an Isolation Forest)
+    - mask: bool, rows flagged as anomalous
+    - column_counts: flags per column for per-column rules (a row flagged in two
+      columns counts twice); empty for row-level detectors
+    """
+    scores: np.ndarray
+    mask: np.ndarray
+    column_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Positions of the flagged rows."""
+        return np.flatnonzero(self.mask)
+
+    @property
+    def count(self) -> int:
+        """Anomalies as reported: flags summed over columns for per-column rules, else flagged rows."""
+        if self.column_counts:
+            return int(sum(self.column_counts.values()))
+        return int(self.mask.sum())
+
+    def to_arrow(self) -> pa.Table:
+        """Arrow table with columns `score` (float32, shares the NumPy buffer) and `is_anomaly`."""
+        return pa.table({"score": pa.array(self.scores), "is_anomaly": pa.array(self.mask)})
+
+    def take(self, df: pl.DataFrame, limit: int) -> pl.DataFrame:
+        """The first `limit` flagged rows of `df` (the frame the scores were computed on)."""
+        return df[self.rows[:limit]]
+
+    @classmethod
+    def concat(cls, parts: Sequence["AnomalyScores"]) -> "AnomalyScores":
+        if not parts:
+            return cls(np.empty(0, dtype=np.float32), np.empty(0, dtype=bool))
+        counts: Dict[str, int] = {}
+        for part in parts:
+            for c, n in part.column_counts.items():
+                counts[c] = counts.get(c, 0) + n
+        return cls(
+            scores=np.concatenate([p.scores for p in parts]),
+            mask=np.concatenate([p.mask for p in parts]),
+            column_counts=counts,
+        )
+
+
+def score_batches(
+    batches: Iterable[pl.DataFrame],
+    scorer: Callable[[pl.DataFrame], AnomalyScores],
+) -> AnomalyScores:
+    """
+    Applies `scorer` (e.g. `partial(z_score_scores, columns=[...], reference=...)`) to
+    each batch of a record-batch stream and concatenates the per-row results; only
+    one batch is held at a time.
+
+    Every batch is judged on its own unless the scorer carries fixed statistics:
+    pass `reference` (e.g. from StreamingProfile.detector_reference) to the rules or
+    a fitted `model` to the Isolation Forest so all batches share one threshold.
+    Window-based rules (Hampel) do not see across batch boundaries.
+    """
+    parts: List[AnomalyScores] = [scorer(batch) for batch in batches]
+    return AnomalyScores.concat(parts)
+
+
+@dataclass
+class ScoreMatrix:
+    """
+    Scores of several detectors side by side (rows x detectors).
+
+    - matrix: float32, every detector's scores min-max normalised to [0, 1]
+      (unscored rows 0)
+    - flags: bool, the detectors' masks
+    - combined: weighted mean of the normalised scores per row
+    """
+    detectors: List[str]
+    weights: Dict[str, float]
+    matrix: np.ndarray
+    flags: np.ndarray
+    combined: np.ndarray
+
+    def to_arrow(self) -> pa.Table:
+        columns = {d: pa.array(self.matrix[:, i]) for i, d in enumerate(self.detectors)}
+        return pa.table({**columns, "combined": pa.array(self.combined)})
+
+    def top(self, k: int) -> np.ndarray:
+        """
+        Positions of the (at most) `k` flagged rows with the highest combined score,
+        best first. Partial sort: O(n) selection plus sorting the k winners.
+        """
+        candidates = np.flatnonzero(self.flags.any(axis=1))
+        if k <= 0 or candidates.size == 0:
+            return np.empty(0, dtype=np.int64)
+        values = self.combined[candidates]
+        if candidates.size > k:
+            keep = np.argpartition(-values, k - 1)[:k]
+            candidates, values = candidates[keep], values[keep]
+        # Stable on ties: earlier rows first
+        return candidates[np.lexsort((candidates, -values))]
+
+
+def _normalise(scores: np.ndarray) -> np.ndarray:
+    finite = np.isfinite(scores)
+    out = np.zeros(scores.shape, dtype=np.float32)
+    if not finite.any():
+        return out
+    lo, hi = scores[finite].min(), scores[finite].max()
+    out[finite] = (scores[finite] - lo) / (hi - lo) if hi > lo else 1.0
+    return out
+
+
+def ensemble(
+    scores: Mapping[str, AnomalyScores],
+    weights: Optional[Mapping[str, float]] = None,
+) -> ScoreMatrix:
+    """
+    Combines the per-row scores of several detectors (all over the same rows).
+
+    Each detector's scores are min-max normalised, so scales as different as |z|,
+    Isolation Forest decision values and missing value counts become comparable;
+    `weights` (default 1 per detector, missing detectors 1) weight them in the
+    combined score.
+    """
+    detectors = list(scores)
+    weights = {d: float((weights or {}).get(d, 1.0)) for d in detectors}
+    if not detectors:
+        empty = np.empty(0, dtype=np.float32)
+        return ScoreMatrix([], {}, empty.reshape(0, 0), np.empty((0, 0), dtype=bool), empty)
+    matrix = np.column_stack([_normalise(scores[d].scores) for d in detectors])
+    flags = np.column_stack([scores[d].mask for d in detectors])
+    w = np.array([weights[d] for d in detectors], dtype=np.float32)
+    combined = matrix @ w / w.sum() if w.sum() > 0 else np.zeros(matrix.shape[0], dtype=np.float32)
+    return ScoreMatrix(detectors, weights, matrix, flags, combined.astype(np.float32))
@@ -1,12 +1,25 @@
 import polars as pl
 import numpy as np
-from typing import List, Literal, Optional, Sequence
+from typing import Dict, List, Literal, Optional, Sequence
 
-from .rules import z_score_anomalies, iqr_anomalies
+from .rules import (
+    ColumnFlags,
+    hampel_flags,
+    hampel_scores,
+    iqr_anomalies,
+    iqr_flags,
+    iqr_scores,
+    mad_flags,
+    mad_scores,
+    z_score_anomalies,
+    z_score_flags,
+    z_score_scores,
+)
 from .isolation_forest import isolation_forest_anomalies
+from .scoring import AnomalyScores, ScoreMatrix, ensemble, score_batches
 
 
-Method = Literal["zscore", "iqr", "isolation_forest"]
+Method = Literal["zscore", "iqr", "mad", "hampel", "isolation_forest"]
 
 
 def select_numeric_columns(df: pl.DataFrame, exclude: Optional[Sequence[str]] = None) -> List[str]:
@@ -35,6 +48,9 @@ def detect_anomalies(
     contamination: float = 0.01,
     n_estimators: int = 100,
     random_state: int = 42,
+    reference: Optional[Dict[str, float]] = None,
+    window: int = 7,
+    order_by: Optional[str] = None,
 ) -> pl.DataFrame:
     """
     Performs anomaly detection on the given DataFrame and returns the rows
@@ -42,7 +58,13 @@ def detect_anomalies(
     
     Parameters per method:
     - method="zscore": uses a single column and the Z-Score `threshold`.
+      `reference` may supply "mean"/"std" to score against instead of the column's own.
     - method="iqr": uses a single column (Interquartile Range Rule).
+      `reference` may supply "q1"/"q3".
+    - method="mad": modified Z-Score (median/MAD) on a single column, flagged above `threshold`
+      (3.5 is the usual choice).
+    - method="hampel": rolling Hampel filter on a single column in row order (`window` rows,
+      `threshold` robust standard deviations; `order_by` sorts first).
     - method="isolation_forest": uses multiple columns and parameters `contamination`, `n_estimators`, `random_state`.
 
     Returns: DataFrame with the rows marked as anomalies.
@@ -51,10 +73,20 @@ def detect_anomalies(
         if not columns or len(columns) != 1:
             raise ValueError("For method='zscore' or 'iqr', exactly one column must be specified (columns=[...]).")
         col = columns[0]
+        reference = reference or {}
         if method == "zscore":
-            return z_score_anomalies(df, col, threshold=threshold)
+            return z_score_anomalies(df, col, threshold=threshold, mean=reference.get("mean"), std=reference.get("std"))
         else:
-            return iqr_anomalies(df, col)
+            return iqr_anomalies(df, col, q1=reference.get("q1"), q3=reference.get("q3"))
+
+    if method in ("mad", "hampel"):
+        if not columns or len(columns) != 1:
+            raise ValueError(f"For method='{method}', exactly one column must be specified (columns=[...]).")
+        if method == "mad":
+            flags = mad_flags(df, columns, threshold=threshold)
+        else:
+            flags = hampel_flags(df, columns, window=window, threshold=threshold, order_by=order_by)
+        return df.filter(flags.mask[columns[0]])
 
     if method == "isolation_forest":
         if not columns or len(columns) < 1:
@@ -69,7 +101,7 @@ def detect_anomalies(
             random_state=random_state,
         )
 
-    raise ValueError(f"Unknown method: {method}. Allowed methods are 'zscore', 'iqr', 'isolation_forest'.")
+    raise ValueError(f"Unknown method: {method}. Allowed methods are 'zscore', 'iqr', 'mad', 'hampel', 'isolation_forest'.")
 
 
 __all__ = [
@@ -78,5 +110,18 @@ __all__ = [
     "detect_anomalies",
     "z_score_anomalies",
     "iqr_anomalies",
+    "z_score_flags",
+    "iqr_flags",
+    "mad_flags",
+    "hampel_flags",
+    "ColumnFlags",
+    "z_score_scores",
+    "iqr_scores",
+    "mad_scores",
+    "hampel_scores",
+    "AnomalyScores",
+    "score_batches",
+    "ScoreMatrix",
+    "ensemble",
     "isolation_forest_anomalies",
 ]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import os
 from datetime import datetime, timezone
+from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,15 +10,18 @@ import queue
 import threading
 import json
 
-from src.api.models import RunRequest, RunAccepted, ArtifactList, ArtifactItem
+from src.api.models import RunRequest, RunAccepted, ArtifactList, ArtifactItem, AnomalyRowPage
 from src.api.services import (
     run_sync,
     create_report_id,
     save_report,
     mark_run_status,
     load_report,
+    anomaly_row_page,
     list_artifacts_for_report,
     resolve_artifact_path,
+    RESULT_CACHE,
+    MODEL_STORE,
 )
 from src.assistant.runner import MappingConfig, AnomalyConfig
 
@@ -104,6 +108,22 @@ def start_run(payload: RunRequest, mode: str = Query("sync", pattern="^(sync|asy
             contamination=payload.anomaly.contamination,
             n_estimators=payload.anomaly.n_estimators,
             random_state=payload.anomaly.random_state,
+            max_workers=payload.anomaly.max_workers,
+            executor=payload.anomaly.executor,
+            iqr_backend=payload.anomaly.iqr_backend,
+            quantile_error=payload.anomaly.quantile_error,
+            use_mad=payload.anomaly.use_mad,
+            mad_threshold=payload.anomaly.mad_threshold,
+            use_hampel=payload.anomaly.use_hampel,
+            hampel_window=payload.anomaly.hampel_window,
+            hampel_threshold=payload.anomaly.hampel_threshold,
+            hampel_order_by=payload.anomaly.hampel_order_by,
+            isoforest_max_samples=payload.anomaly.isoforest_max_samples,
+            isoforest_n_jobs=payload.anomaly.isoforest_n_jobs,
+            top_anomalies=payload.anomaly.top_anomalies,
+            ensemble_weights=payload.anomaly.ensemble_weights,
+            inline_rows_limit=payload.anomaly.inline_rows_limit,
+            nested_fields=payload.anomaly.nested_fields,
         )
 
     if mode == "sync":
@@ -112,6 +132,8 @@ def start_run(payload: RunRequest, mode: str = Query("sync", pattern="^(sync|asy
                 source_model=payload.source,
                 mapping=mapping,
                 anomaly=anomaly,
+                use_cache=payload.use_cache,
+                incremental=payload.incremental,
             )
             # Convert pydantic model to dict for JSON serialization
             return report.model_dump()
@@ -128,6 +150,8 @@ def start_run(payload: RunRequest, mode: str = Query("sync", pattern="^(sync|asy
                 source_model=payload.source,
                 mapping=mapping,
                 anomaly=anomaly,
+                use_cache=payload.use_cache,
+                incremental=payload.incremental,
             )
             save_report(report_id, report)
             mark_run_status(report_id, "complete", {"finished_at": datetime.now(timezone.utc).isoformat()})
@@ -161,6 +185,22 @@ def start_run_stream(payload: RunRequest):
             contamination=payload.anomaly.contamination,
             n_estimators=payload.anomaly.n_estimators,
             random_state=payload.anomaly.random_state,
+            max_workers=payload.anomaly.max_workers,
+            executor=payload.anomaly.executor,
+            iqr_backend=payload.anomaly.iqr_backend,
+            quantile_error=payload.anomaly.quantile_error,
+            use_mad=payload.anomaly.use_mad,
+            mad_threshold=payload.anomaly.mad_threshold,
+            use_hampel=payload.anomaly.use_hampel,
+            hampel_window=payload.anomaly.hampel_window,
+            hampel_threshold=payload.anomaly.hampel_threshold,
+            hampel_order_by=payload.anomaly.hampel_order_by,
+            isoforest_max_samples=payload.anomaly.isoforest_max_samples,
+            isoforest_n_jobs=payload.anomaly.isoforest_n_jobs,
+            top_anomalies=payload.anomaly.top_anomalies,
+            ensemble_weights=payload.anomaly.ensemble_weights,
+            inline_rows_limit=payload.anomaly.inline_rows_limit,
+            nested_fields=payload.anomaly.nested_fields,
         )
 
     q = queue.Queue()
@@ -174,7 +214,9 @@ def start_run_stream(payload: RunRequest):
                 source_model=payload.source,
                 mapping=mapping,
                 anomaly=anomaly,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                use_cache=payload.use_cache,
+                incremental=payload.incremental,
             )
             q.put({"type": "complete", "report": report.model_dump(mode="json")})
         except Exception as e:
@@ -202,6 +244,24 @@ def get_report(report_id: str):
     return data
 
 
+@app.get("/api/v1/reports/{report_id}/anomaly_rows", response_model=AnomalyRowPage)
+def get_anomaly_rows(
+    report_id: str,
+    dataset: str,
+    method: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=100_000),
+):
+    # Pages through the flagged rows of one method; large sets are stored encoded in the report
+    data = load_report(report_id)
+    if not data:
+        raise HTTPException(status_code=404, detail="Report not found")
+    page = anomaly_row_page(data, dataset, method, offset, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="No anomaly rows for this dataset and method")
+    return page
+
+
 @app.get("/api/v1/reports/{report_id}/artifacts", response_model=ArtifactList)
 def list_artifacts(report_id: str):
     data = load_report(report_id)
@@ -223,6 +283,18 @@ def download_artifact(report_id: str, name: str):
     return FileResponse(path, media_type="text/csv", filename=path.name)
 
 
+@app.get("/api/v1/cache")
+def cache_stats():
+    return {**RESULT_CACHE.stats(), "models": MODEL_STORE.stats()}
+
+
+@app.delete("/api/v1/cache")
+def invalidate_cache(dataset: Optional[str] = None):
+    """Drops cached results and fitted models of one dataset (by report name), or all of them."""
+    MODEL_STORE.invalidate(dataset)
+    return {"removed": RESULT_CACHE.invalidate(dataset)}
+
+
 @app.get("/api/v1/tables")
 def list_tables_endpoint(schema: str = "lakehouse.datalake.raw"):
     from src.connection.data_export import list_tables
@@ -233,6 +305,12 @@ def list_tables_endpoint(schema: str = "lakehouse.datalake.raw"):
         raise HTTPException(status_code=500, detail=f"Failed to list tables: {e}")
 
 
+@app.get("/api/v1/connection/pool")
+def connection_pool_metrics():
+    from src.connection.pool import pool_metrics
+    return {"pools": pool_metrics()}
+
+
 @app.get("/api/v1/schemas")
 def list_schemas_endpoint():
     from src.connection.data_export import list_schemas
@@ -18,6 +18,9 @@ class DatasetReport(BaseModel):
     semantic_types: Dict[str, str]
     statistics: Dict[str, Any]
     nested_structures: List[str]
+    # By field path ("address.zip", "orders[].price"): dtype, depth, in_list, values, nulls
+    # and for lists list_length {min, max, mean} (see profile_nested)
+    nested_profile: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
     categorical_cols: List[str]
     llm_insights: Dict[str, Any]
     mapping: Dict
@@ -26,7 +29,17 @@ class DatasetReport(BaseModel):
     anomalies: Dict[str, int]
     anomaly_samples_saved: Dict[str, Optional[str]]
     anomaly_rows: Optional[Dict[str, List[int]]] = None
+    # Methods with more rows than AnomalyConfig.inline_rows_limit:
+    # {"encoding", "count", "head", "data"} (src.utils.row_encoding), paged via the API
+    anomaly_rows_encoded: Optional[Dict[str, Dict[str, Any]]] = None
     anomaly_previews: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    # Ensemble view: {"detectors", "weights", "rows": [{"row", "score", "methods", "scores", "values"}]}
+    top_anomalies: Optional[Dict[str, Any]] = None
+    stage_timings: Optional[Dict[str, float]] = None
+    sampling: Optional[Dict[str, Any]] = None
+    anomaly_estimates: Optional[Dict[str, Dict[str, float]]] = None
+    cached: bool = False
+    incremental: Optional[Dict[str, Any]] = None
 
 class AssistantReport(BaseModel):
     data_root: Optional[str]
@@ -46,12 +59,32 @@ class AnomalyConfigModel(BaseModel):
     contamination: Annotated[float, Field(gt=0.0, lt=0.5)] = 0.01
     n_estimators: int = 100
     random_state: int = 42
+    max_workers: Annotated[int, Field(ge=1)] = 1
+    executor: Literal["thread", "process"] = "thread"
+    iqr_backend: Literal["exact", "sketch"] = "exact"
+    quantile_error: Annotated[float, Field(gt=0.0, lt=0.5)] = 0.01
+    use_mad: bool = False
+    mad_threshold: Annotated[float, Field(gt=0.0)] = 3.5
+    use_hampel: bool = False
+    hampel_window: Annotated[int, Field(ge=3)] = 7
+    hampel_threshold: Annotated[float, Field(gt=0.0)] = 3.0
+    hampel_order_by: Optional[str] = None
+    isoforest_max_samples: Optional[Annotated[int, Field(ge=256)]] = 100_000
+    isoforest_n_jobs: Annotated[int, Field(ge=-1)] = 1
+    top_anomalies: Annotated[int, Field(ge=0, le=1000)] = 50
+    inline_rows_limit: Annotated[int, Field(ge=0)] = 10_000
+    nested_fields: bool = True
+    ensemble_weights: Optional[Dict[str, Annotated[float, Field(ge=0.0)]]] = None
 
 
 class LocalSourceModel(BaseModel):
     type: Literal["local"] = "local"
     root: str
     max_rows: Optional[int] = None
+    lazy: bool = False
+    sampling: Literal["head", "random", "row_groups", "stratified"] = "head"
+    sampling_column: Optional[str] = None
+    watermark_column: Optional[str] = None
 
 
 class SQLSourceModel(BaseModel):
@@ -59,12 +92,21 @@ class SQLSourceModel(BaseModel):
     query: Optional[str] = None
     schema: Optional[str] = None
     max_rows: Optional[int] = None
+    sampling: Literal["head", "random", "stratified"] = "head"
+    sampling_column: Optional[str] = None
+    streaming: bool = False
+    prefetch: Annotated[int, Field(ge=1)] = 1
+    watermark_column: Optional[str] = None
 
 
 class RunRequest(BaseModel):
     source: Annotated[Union[LocalSourceModel, SQLSourceModel], Field(discriminator="type")]
     mapping: MappingConfigModel
     anomaly: Optional[AnomalyConfigModel] = None
+    # Reuse cached reports of unchanged datasets (opt-in; see src.assistant.cache)
+    use_cache: bool = False
+    # Only analyse rows appended since the previous incremental run
+    incremental: bool = False
 
 
 class RunAccepted(BaseModel):
@@ -79,5 +121,13 @@ class ArtifactItem(BaseModel):
     method: Optional[str] = None
 
 
+class AnomalyRowPage(BaseModel):
+    dataset: str
+    method: str
+    total: int
+    offset: int
+    rows: List[int]
+
+
 class ArtifactList(BaseModel):
     items: Annotated[List[ArtifactItem], Field(min_length=0)] = Field(default_factory=list)
@@ -8,16 +8,31 @@ from typing import Dict, Any, Optional, List, Callable
 from src.assistant.runner import run_assistant, MappingConfig, AnomalyConfig
 from src.api.models import AssistantReport
 from src.assistant.datasource import LocalFilesDataSource
+from src.assistant.cache import ResultCache
+from src.assistant.incremental import IncrementalStore
+from src.assistant.model_store import ModelStore
+from src.utils.row_encoding import decode_rows_range
 
 # Base artifacts directory (can be overridden with env)
 ARTIFACT_DIR = Path(os.getenv("ARTIFACT_DIR", "artifacts"))
 REPORTS_DIR = ARTIFACT_DIR / "api_reports"
 INDEX_FILE = REPORTS_DIR / "index.json"
+# Per-dataset high-water marks and merged statistics of incremental runs
+INCREMENTAL_DIR = ARTIFACT_DIR / "incremental"
 
 # Ensure directories exist
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 (ARTIFACT_DIR / "anomalies").mkdir(parents=True, exist_ok=True)
 
+# Per-dataset analysis results, reused while data and configuration are unchanged
+RESULT_CACHE = ResultCache(
+    ARTIFACT_DIR / "cache",
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024,
+)
+# Fitted Isolation Forests, reused for unchanged datasets and later increments
+MODEL_STORE = ModelStore(ARTIFACT_DIR / "models")
+
 
 # Simple JSON index for runs
 
@@ -43,9 +58,18 @@ def run_sync(
     mapping: MappingConfig,
     anomaly: Optional[AnomalyConfig],
     progress_callback: Optional[Callable[[str, int], None]] = None,
+    use_cache: bool = False,
+    incremental: bool = False,
 ) -> AssistantReport:
     if source_model.type == "local":
-        source = LocalFilesDataSource(root=source_model.root, max_rows=source_model.max_rows)
+        source = LocalFilesDataSource(
+            root=source_model.root,
+            max_rows=source_model.max_rows,
+            lazy=source_model.lazy,
+            sampling=source_model.sampling,
+            sampling_column=source_model.sampling_column,
+            watermark_column=source_model.watermark_column,
+        )
     elif source_model.type == "sql":
         from src.assistant.datasource import LakehouseSQLDataSource
         from src.connection.connection import get_connection
@@ -55,7 +79,12 @@ def run_sync(
             connection_uri=conn,
             query=source_model.query,
             schema=source_model.schema,
-            max_rows=source_model.max_rows
+            max_rows=source_model.max_rows,
+            sampling=source_model.sampling,
+            sampling_column=source_model.sampling_column,
+            streaming=source_model.streaming,
+            prefetch=source_model.prefetch,
+            watermark_column=source_model.watermark_column,
         )
     else:
         raise ValueError(f"Unknown source type: {source_model.type}")
@@ -66,6 +95,9 @@ def run_sync(
         anomaly_cfg=anomaly,
         save_dir=ARTIFACT_DIR / "anomalies",
         progress_callback=progress_callback,
+        cache=RESULT_CACHE if use_cache else None,
+        incremental=IncrementalStore(INCREMENTAL_DIR, source_model.watermark_column) if incremental else None,
+        models=MODEL_STORE if use_cache or incremental else None,
     )
 
 
@@ -114,6 +146,32 @@ def load_report(report_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def anomaly_row_page(
+    report_json: Dict[str, Any], dataset: str, method: str, offset: int, limit: int
+) -> Optional[Dict[str, Any]]:
+    """Rows `offset`..`offset + limit` flagged by `method` in `dataset`, inline or encoded."""
+    for ds in report_json.get("datasets", []) or []:
+        if ds.get("name") != dataset:
+            continue
+        inline = (ds.get("anomaly_rows") or {}).get(method)
+        encoded = (ds.get("anomaly_rows_encoded") or {}).get(method)
+        if inline is not None:
+            total, rows = len(inline), inline[offset:offset + limit]
+        elif encoded is not None:
+            # Only the runs overlapping the page are expanded
+            total, rows = encoded["count"], decode_rows_range(encoded, offset, offset + limit)
+        else:
+            return None
+        return {
+            "dataset": dataset,
+            "method": method,
+            "total": total,
+            "offset": offset,
+            "rows": [int(r) for r in rows],
+        }
+    return None
+
+
 def list_artifacts_for_report(report_json: Dict[str, Any]) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
     datasets = report_json.get("datasets", []) or []
@@ -1,8 +1,9 @@
-from .datasource import DataSource, LocalFilesDataSource, Dataset
+from .datasource import DataSource, LocalFilesDataSource, Dataset, DatasetSchema
 
 __all__ = [
     "DataSource",
     "LocalFilesDataSource",
     "Dataset",
+    "DatasetSchema",
 ]
 
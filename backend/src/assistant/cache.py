@@ -0,0 +1,144 @@
+"""
+Persistent, content-addressed cache of per-dataset analysis results.
+
+An entry is addressed by the dataset fingerprint (set by the data source, see
+`Dataset.fingerprint`) and a hash of the configuration fields that influence the
+result. Entries are plain JSON files, written atomically, so several workers or
+processes can share one cache directory.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import polars as pl
+
+from src.utils.logger import logger
+from src.api.models import DatasetReport
+
+# Bump when the analysis changes in a way that makes old entries wrong
+CACHE_VERSION = 3
+
+# AnomalyConfig fields that only change how the work is scheduled, not its result
+_EXECUTION_FIELDS = {"max_workers", "executor", "stage_workers", "isoforest_chunk_rows", "isoforest_n_jobs"}
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def config_key(mapping_cfg: Any, anomaly_cfg: Any, llm_model: Optional[str] = None) -> str:
+    """Hash of the MappingConfig/AnomalyConfig fields (and LLM model) a report depends on."""
+    mapping = asdict(mapping_cfg)
+    mapping["reference_fields"] = sorted(mapping["reference_fields"])
+    anomaly = {k: v for k, v in asdict(anomaly_cfg).items() if k not in _EXECUTION_FIELDS}
+    payload = {
+        "version": CACHE_VERSION,
+        "polars": pl.__version__,
+        "llm_model": llm_model,
+        "mapping": mapping,
+        "anomaly": anomaly,
+    }
+    return _sha256(json.dumps(payload, sort_keys=True, default=str))
+
+
+class ResultCache:
+    """
+    Directory of cached DatasetReports with LRU eviction.
+    - max_entries / max_bytes: after every write the least recently used entries
+      are removed until both limits hold (a hit counts as a use)
+    - invalidate(name) drops all entries of one dataset, invalidate() everything
+    """
+
+    def __init__(self, root: str | os.PathLike, max_entries: int = 1000, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Counters are per process; workers start from zero
+        return {**self.__dict__, "hits": 0, "misses": 0}
+
+    def _dataset_dir(self, name: str) -> Path:
+        return self.root / _sha256(name)[:16]
+
+    def _path(self, name: str, fingerprint: str, cfg_key: str) -> Path:
+        return self._dataset_dir(name) / f"{_sha256(fingerprint + cfg_key)}.json"
+
+    def get(self, name: str, fingerprint: str, cfg_key: str) -> Optional[DatasetReport]:
+        path = self._path(name, fingerprint, cfg_key)
+        try:
+            report = DatasetReport.model_validate_json(path.read_text())
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        # Saved anomaly samples are referenced by path; a report pointing at deleted files is stale
+        if any(p and not Path(p).exists() for p in report.anomaly_samples_saved.values()):
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        os.utime(path)  # mark as recently used
+        self.hits += 1
+        return report
+
+    def put(self, name: str, fingerprint: str, cfg_key: str, report: DatasetReport) -> None:
+        path = self._path(name, fingerprint, cfg_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(report.model_dump_json())
+            os.replace(tmp, path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:  # removed by a concurrent eviction
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def invalidate(self, name: Optional[str] = None) -> int:
+        """Removes the entries of dataset `name` (all entries if None). Returns how many were removed."""
+        target = self._dataset_dir(name) if name is not None else self.root
+        removed = len(list(target.glob("**/*.json")))
+        shutil.rmtree(target, ignore_errors=True)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
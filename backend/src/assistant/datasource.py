@@ -1,18 +1,76 @@
+import datetime as dt
+import hashlib
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import polars as pl
 
 from src.utils.logger import logger
+from src.utils.concurrency import ordered_map
+from src.assistant.sampling import (
+    SamplingStrategy,
+    parquet_footer_stats,
+    read_parquet_sample,
+    reservoir_sample,
+    sql_sample_query,
+    stratified_sample,
+)
+from src.schema_recognition.inference.schema_inference import read_file_schema
+from src.schema_recognition.inference.streaming_stats import StreamingProfile, profile_batches
+from src.assistant.incremental import watermark_value
 
 
 @dataclass
 class Dataset:
     name: str
     path: Optional[Path]
-    df: pl.DataFrame
+    df: Optional[pl.DataFrame]
+    # Set instead of `df` by sources running in lazy mode; the runner collects it
+    lf: Optional[pl.LazyFrame] = None
+    # Exact whole-source statistics (e.g. from a Parquet footer) and row count, used to
+    # pre-fill the report when `df` is only a sample
+    column_stats: Optional[Dict[str, Dict[str, Any]]] = None
+    total_rows: Optional[int] = None
+    # Sampling strategy that produced `df` (None = not sampled)
+    sampling: Optional[str] = None
+    # Identifies the analysed content for the result cache (None = do not cache)
+    fingerprint: Optional[str] = None
+    # Incremental runs: high-water mark the rows were read from, and the one after them
+    since: Any = None
+    watermark: Any = None
+
+    @property
+    def columns(self) -> List[str]:
+        if self.df is not None:
+            return list(self.df.columns)
+        return list(self.lf.collect_schema().names())
+
+
+def _sql_literal(value: Any) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value)
+    # Timestamps are stored as ISO strings; Dremio coerces the literal to the column type
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _fingerprint(*parts: Any) -> str:
+    return hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+
+def frame_fingerprint(df: pl.DataFrame, *parts: Any) -> str:
+    """Content fingerprint of a DataFrame (schema, size and a hash over all rows)."""
+    content = int(df.hash_rows(seed=0).sum()) if df.height else 0
+    return _fingerprint(*parts, sorted((k, str(v)) for k, v in df.schema.items()), df.height, content)
+
+
+@dataclass
+class DatasetSchema:
+    """Column names of a dataset, collected without keeping its rows in memory."""
+    name: str
+    path: Optional[Path]
+    columns: List[str]
 
 
 class DataSource:
@@ -20,9 +78,31 @@ class DataSource:
     Abstract data source that yields datasets (name, optional path, DataFrame).
     """
 
-    def iter_datasets(self) -> Iterator[Dataset]:  # pragma: no cover - interface
+    def iter_datasets(self, since: Optional[Dict[str, Any]] = None) -> Iterator[Dataset]:  # pragma: no cover - interface
+        """
+        since: incremental mode, high-water marks by dataset name. Only rows past the
+        mark are returned and `Dataset.watermark` is set to the mark after them.
+        """
         raise NotImplementedError
 
+    def iter_schemas(self) -> Iterator[DatasetSchema]:
+        """
+        Cheap first pass over the source that yields only column names.
+        The default loads each dataset and releases it right away; subclasses
+        override this with metadata lookups that avoid reading rows at all.
+        """
+        for ds in self.iter_datasets():
+            yield DatasetSchema(name=ds.name, path=ds.path, columns=ds.columns)
+
+
+def _watermark_literal(since: Any, dtype: pl.DataType) -> pl.Expr:
+    # Marks are persisted as JSON (temporal values as ISO strings), see watermark_value
+    if isinstance(since, str) and dtype == pl.Datetime:
+        return pl.lit(dt.datetime.fromisoformat(since)).cast(dtype)
+    if isinstance(since, str) and dtype == pl.Date:
+        return pl.lit(dt.date.fromisoformat(since))
+    return pl.lit(since).cast(dtype)
+
 
 class LocalFilesDataSource(DataSource):
     """
@@ -30,11 +110,32 @@ class LocalFilesDataSource(DataSource):
     - CSV: tries header=True first, then falls back to header=False and assigns generic names.
     - Parquet: read directly.
     - max_rows: optional row limit per file (0/None = all)
+    - lazy: yield LazyFrames from pl.scan_* instead of loaded DataFrames, so the runner
+      can push projections/limits into the scan and collect all plans together
+    - sampling: how max_rows rows are picked (see src.assistant.sampling): "head",
+      "random" (row groups for Parquet, streaming reservoir for CSV/NDJSON), "row_groups"
+      (Parquet) or "stratified" on `sampling_column`. Parquet footer statistics pre-fill the report.
+    - watermark_column: incremental mode reads rows with a larger value in this column;
+      without it the rows past the number already consumed (append-only files)
     """
 
-    def __init__(self, root: str | os.PathLike, max_rows: Optional[int] = None) -> None:
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        max_rows: Optional[int] = None,
+        lazy: bool = False,
+        sampling: SamplingStrategy = "head",
+        sampling_column: Optional[str] = None,
+        seed: int = 42,
+        watermark_column: Optional[str] = None,
+    ) -> None:
         self.root = Path(root)
         self.max_rows = None if not max_rows or max_rows <= 0 else int(max_rows)
+        self.lazy = lazy
+        self.sampling = sampling
+        self.sampling_column = sampling_column
+        self.seed = seed
+        self.watermark_column = watermark_column
 
     def _read_csv(self, path: Path) -> pl.DataFrame:
         n_rows = self.max_rows
@@ -50,11 +151,50 @@ class LocalFilesDataSource(DataSource):
             return df.rename(rename_map)
 
     def _read_parquet(self, path: Path) -> pl.DataFrame:
-        df = pl.read_parquet(path)
-        if self.max_rows:
-            df = df.head(self.max_rows)
+        if not self.max_rows:
+            return pl.read_parquet(path)
+        # Only decode the row groups the first max_rows rows live in
+        df, _ = read_parquet_sample(path, self.max_rows, strategy="head")
         return df
 
+    def _read_sample(self, path: Path) -> Tuple[pl.DataFrame, int]:
+        """Draws max_rows rows with a non-head strategy. Returns (sample, total rows)."""
+        if self.sampling == "stratified":
+            if not self.sampling_column:
+                raise ValueError("Stratified sampling requires 'sampling_column'.")
+            return stratified_sample(self._scan_full(path), self.max_rows, self.sampling_column, seed=self.seed)
+        if path.suffix.lower() == ".parquet":
+            return read_parquet_sample(path, self.max_rows, strategy=self.sampling, seed=self.seed)
+        # Row groups only exist in Parquet; other formats get a uniform streaming sample
+        return reservoir_sample(self._scan_full(path).collect_batches(), self.max_rows, seed=self.seed)
+
+    def _load(self, name: str, path: Path) -> Dataset:
+        suffix = path.suffix.lower()
+        if self.max_rows and self.sampling != "head":
+            df, total = self._read_sample(path)
+            ds = Dataset(name=name, path=path, df=df, total_rows=total)
+        elif self.lazy:
+            ds = Dataset(name=name, path=path, df=None, lf=self._scan(path))
+        elif suffix == ".csv":
+            ds = Dataset(name=name, path=path, df=self._read_csv(path))
+        elif suffix == ".parquet":
+            ds = Dataset(name=name, path=path, df=self._read_parquet(path))
+        else: # JSON/NDJSON
+            ds = Dataset(name=name, path=path, df=self._read_json(path))
+        # Path, mtime and size identify the file content without reading it again
+        st = path.stat()
+        ds.fingerprint = _fingerprint(
+            path.resolve(), st.st_mtime_ns, st.st_size, self.max_rows, self.sampling, self.sampling_column, self.seed
+        )
+        if self.max_rows:
+            ds.sampling = self.sampling
+            if suffix == ".parquet":
+                try:
+                    ds.total_rows, ds.column_stats = parquet_footer_stats(path)
+                except Exception as e:  # statistics are optional, the sample is still usable
+                    logger.warning(f"Could not read Parquet footer statistics of {path}: {e}")
+        return ds
+
     def _read_json(self, path: Path) -> pl.DataFrame:
         n_rows = self.max_rows
         # Try reading as standard JSON array first
@@ -71,23 +211,77 @@ class LocalFilesDataSource(DataSource):
              # infer_schema_length helps here
              return pl.read_ndjson(path, n_rows=n_rows, infer_schema_length=10000)
 
-    def iter_datasets(self) -> Iterator[Dataset]:
+    def _scan_csv(self, path: Path) -> pl.LazyFrame:
+        lf = pl.scan_csv(path, has_header=True, null_values=[''], try_parse_dates=True, infer_schema_length=10000)
+        try:
+            # Schema inference reads the first rows, which surfaces the same header problems as _read_csv
+            lf.collect_schema()
+        except pl.ComputeError:
+            lf = pl.scan_csv(path, has_header=False, null_values=[''], try_parse_dates=True, infer_schema_length=10000)
+            lf = lf.rename({old: f"column_{i}" for i, old in enumerate(lf.collect_schema().names())})
+        return lf
+
+    def _scan_full(self, path: Path) -> pl.LazyFrame:
+        suffix = path.suffix.lower()
+        if suffix == ".csv":
+            return self._scan_csv(path)
+        if suffix == ".parquet":
+            return pl.scan_parquet(path)
+        if suffix in (".jsonl", ".ndjson"):
+            return pl.scan_ndjson(path, infer_schema_length=10000)
+        # Plain JSON arrays cannot be scanned
+        try:
+            return pl.read_json(path).lazy()
+        except Exception:
+            return pl.scan_ndjson(path, infer_schema_length=10000)
+
+    def _scan(self, path: Path) -> pl.LazyFrame:
+        # The limit is pushed down into the scan, so Parquet row groups past it are never decoded
+        lf = self._scan_full(path)
+        return lf.head(self.max_rows) if self.max_rows else lf
+
+    def _iter_files(self) -> Iterator[Path]:
         exts = {".csv", ".parquet", ".json", ".jsonl", ".ndjson"}
         for p in self.root.rglob("*"):
             if not p.is_file():
                 continue
             if p.suffix.lower() not in exts:
                 continue
+            yield p
+
+    def iter_schemas(self) -> Iterator[DatasetSchema]:
+        for p in self._iter_files():
+            name = p.relative_to(self.root).as_posix()
+            try:
+                # File metadata only (Parquet footer, CSV header, NDJSON head), cached by fingerprint
+                yield DatasetSchema(name=name, path=p, columns=list(read_file_schema(p)))
+            except Exception:  # mirror the error dataset yielded by iter_datasets
+                yield DatasetSchema(name=name + " (read_error)", path=p, columns=["_error", "_path"])
+
+    def _load_increment(self, name: str, path: Path, since: Any) -> Dataset:
+        # Increments are read whole; max_rows/sampling only apply to full runs
+        lf = self._scan_full(path)
+        if self.watermark_column:
+            if since is not None:
+                dtype = lf.collect_schema()[self.watermark_column]
+                lf = lf.filter(pl.col(self.watermark_column) > _watermark_literal(since, dtype))
+            df = lf.collect()
+            new_max = df[self.watermark_column].max() if df.height else None
+            watermark = watermark_value(new_max) if new_max is not None else since
+        else:
+            offset = int(since or 0)
+            df = lf.slice(offset).collect()
+            watermark = offset + df.height
+        return Dataset(name=name, path=path, df=df, since=since, watermark=watermark)
+
+    def iter_datasets(self, since: Optional[Dict[str, Any]] = None) -> Iterator[Dataset]:
+        for p in self._iter_files():
             try:
-                if p.suffix.lower() == ".csv":
-                    df = self._read_csv(p)
-                elif p.suffix.lower() == ".parquet":
-                    df = self._read_parquet(p)
-                else: # JSON/NDJSON
-                    df = self._read_json(p)
-                
                 name = p.relative_to(self.root).as_posix()
-                yield Dataset(name=name, path=p, df=df)
+                if since is not None:
+                    yield self._load_increment(name, p, since.get(name))
+                    continue
+                yield self._load(name, p)
             except Exception as e:  # continue on read errors
                 name = p.relative_to(self.root).as_posix()
                 warn_df = pl.DataFrame({"_error": [str(e)], "_path": [str(p)]})
@@ -100,6 +294,17 @@ class LakehouseSQLDataSource(DataSource):
     Supports two modes:
     - query mode: execute a single query
     - schema mode: discover and iterate over all tables in a schema
+    With max_rows and sampling "random"/"stratified", sampling is pushed down into Dremio
+    (hash-modulo / RANDOM() filter, or ROW_NUMBER() per value of `sampling_column`).
+    With streaming=True every table is read as a stream of Arrow record batches: exact
+    column statistics are accumulated per batch and only a uniform reservoir sample of
+    max_rows rows (or everything without max_rows) is kept in memory.
+    In schema mode `prefetch` tables are fetched concurrently and yielded in discovery
+    order; at most `prefetch` fetched tables wait for the consumer at any time. Every
+    fetch holds a pooled connection, so prefetch is capped at the pool's max_size.
+    Incremental mode (iter_datasets(since=...)) fetches rows with `watermark_column`
+    above the mark. It requires a watermark column: Dremio guarantees no row order
+    without ORDER BY, so skipping the rows already consumed with OFFSET is not reliable.
     """
 
     def __init__(
@@ -108,7 +313,12 @@ class LakehouseSQLDataSource(DataSource):
         query: str | None = None,
         schema: str | None = None,
         max_rows: int | None = None,
-        name: str = "lakehouse_query"
+        name: str = "lakehouse_query",
+        sampling: SamplingStrategy = "head",
+        sampling_column: str | None = None,
+        streaming: bool = False,
+        prefetch: int = 1,
+        watermark_column: str | None = None,
     ) -> None:
         self.connection_uri = connection_uri
         # Normalize empty strings to None for consistency with API/frontend
@@ -116,22 +326,67 @@ class LakehouseSQLDataSource(DataSource):
         self.schema = schema if (schema is not None and str(schema).strip() != "") else None
         self.max_rows = max_rows
         self.name = name
+        self.sampling = sampling
+        self.sampling_column = sampling_column
+        self.streaming = streaming
+        self.prefetch = prefetch
+        self.watermark_column = watermark_column
 
-    def _execute_query(self, query: str) -> pl.DataFrame:
-        """Execute a query using ADBC Flight SQL connection."""
+    def _fetch_sample(self, relation: str) -> Tuple[pl.DataFrame, int]:
+        """Samples max_rows rows of a table or subquery inside Dremio. Returns (sample, total rows)."""
+        total = int(self._execute_query(f"SELECT COUNT(*) AS n FROM {relation}").item())
+        query = sql_sample_query(relation, int(self.max_rows), total, self.sampling, self.sampling_column)
+        df = self._execute_query(query)
+        return df.drop([c for c in ("_rn", "_cnt") if c in df.columns]), total
+
+    def _connection(self):
+        """Checks out a pooled connection; legacy string URIs get a dedicated one."""
+        if isinstance(self.connection_uri, dict):
+            from src.connection.pool import get_pool
+            return get_pool(self.connection_uri).connection()
         import adbc_driver_flightsql.dbapi as flight_sql
-        
+        return flight_sql.connect(self.connection_uri)
+
+    def _fetch_workers(self) -> int:
+        # More workers than pooled connections would only queue for a connection and
+        # time out (turning slow tables into error datasets)
+        if not isinstance(self.connection_uri, dict):
+            return self.prefetch
+        from src.connection.pool import get_pool
+        max_size = get_pool(self.connection_uri).max_size
+        if self.prefetch > max_size:
+            logger.warning(f"prefetch={self.prefetch} exceeds the connection pool size, fetching {max_size} tables at a time")
+        return min(self.prefetch, max_size)
+
+    def _iter_record_batches(self, query: str) -> Iterator[pl.DataFrame]:
+        """Yields the result of `query` batch by batch as the Flight stream arrives."""
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute(query)
+            for batch in cursor.fetch_record_batch():
+                yield pl.from_arrow(batch)
+
+    def _stream(self, name: str, query: str) -> Dataset:
+        """Profiles the full result of `query` in bounded memory and keeps a reservoir sample."""
+        profile = StreamingProfile()
+        batches = profile_batches(self._iter_record_batches(query), profile)
+        if self.max_rows:
+            df, total = reservoir_sample(batches, int(self.max_rows))
+        else:
+            frames = list(batches)
+            df, total = (pl.concat(frames) if frames else pl.DataFrame()), profile.row_count
+        return Dataset(
+            name=name,
+            path=None,
+            df=df,
+            column_stats=profile.column_stats(),
+            total_rows=total,
+            sampling="random" if total > df.height else None,
+        )
+
+    def _execute_query(self, query: str) -> pl.DataFrame:
+        """Execute a query on a pooled ADBC Flight SQL connection."""
         if isinstance(self.connection_uri, dict):
-            uri = self.connection_uri['uri']
-            username = self.connection_uri['username']
-            password = self.connection_uri['password']
-            
-            # Connect using DBAPI
-            # This handles grpc:// (plaintext) and grpc+tls:// (TLS) correctly
-            with flight_sql.connect(uri, db_kwargs={
-                "username": username,
-                "password": password,
-            }) as conn:
+            with self._connection() as conn:
                 return pl.read_database(query=query, connection=conn)
         else:
             # Fallback for string URI (legacy support)
@@ -139,19 +394,77 @@ class LakehouseSQLDataSource(DataSource):
             # But likely this path is not used or will fail if it's the old format
             return pl.read_database_uri(query=query, uri=self.connection_uri, engine="adbc")
 
-    def iter_datasets(self) -> Iterator[Dataset]:
+    def _increment_query(self, relation: str, since: Any) -> str:
+        if not self.watermark_column:
+            raise ValueError("Incremental SQL runs require 'watermark_column'")
+        col = f'"{self.watermark_column}"'
+        where = f" WHERE {col} > {_sql_literal(since)}" if since is not None else ""
+        return f"SELECT * FROM {relation}{where} ORDER BY {col}"
+
+    def _fetch_increment(self, name: str, relation: str, since: Any) -> Dataset:
+        df = self._execute_query(self._increment_query(relation, since))
+        new_max = df[self.watermark_column].max() if df.height else None
+        watermark = watermark_value(new_max) if new_max is not None else since
+        return Dataset(name=name, path=None, df=df, since=since, watermark=watermark)
+
+    def iter_datasets(self, since: Optional[Dict[str, Any]] = None) -> Iterator[Dataset]:
         if self.schema:
             # Schema mode: discover all tables
-            yield from self._iter_schema_tables()
+            datasets = self._iter_schema_tables(since)
         elif self.query:
             # Query mode: single query
-            yield from self._iter_single_query()
+            datasets = self._iter_single_query(since)
         else:
             raise ValueError("Either 'query' or 'schema' must be provided")
+        if since is not None and not self.watermark_column:
+            raise ValueError("Incremental SQL runs require 'watermark_column'")
+        for ds in datasets:
+            # Dremio exposes no portable snapshot id, so the fetched rows are fingerprinted;
+            # the total row count covers the part of the table outside a sample
+            if ds.df is not None and "_error" not in ds.df.columns:
+                ds.fingerprint = frame_fingerprint(ds.df, ds.name, self.query, ds.total_rows, ds.sampling)
+            yield ds
 
-    def _iter_single_query(self) -> Iterator[Dataset]:
+    def iter_schemas(self) -> Iterator[DatasetSchema]:
+        if not self.schema and not self.query:
+            raise ValueError("Either 'query' or 'schema' must be provided")
+        try:
+            if self.schema:
+                yield from self._iter_schema_columns()
+            else:
+                # LIMIT 0 lets Dremio plan the query and return only the result schema
+                df = self._execute_query(f"SELECT * FROM ({self.query}) AS _q LIMIT 0")
+                yield DatasetSchema(name=self.name, path=None, columns=list(df.columns))
+        except Exception as e:
+            # Schema pass is only used for cross-table mapping targets; the data pass reports errors
+            logger.error(f"Schema scan failed: {e}")
+
+    def _iter_schema_columns(self) -> Iterator[DatasetSchema]:
+        query = (
+            f'SELECT TABLE_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA."COLUMNS" '
+            f'WHERE TABLE_SCHEMA = \'{self.schema}\' ORDER BY TABLE_NAME, ORDINAL_POSITION'
+        )
+        columns_df = self._execute_query(query)
+        for (table_name,), group in columns_df.group_by("TABLE_NAME", maintain_order=True):
+            yield DatasetSchema(
+                name=f"{self.schema}.{table_name}",
+                path=None,
+                columns=group["COLUMN_NAME"].to_list(),
+            )
+
+    def _iter_single_query(self, since: Optional[Dict[str, Any]] = None) -> Iterator[Dataset]:
         try:
             q = self.query or ""
+            if since is not None:
+                yield self._fetch_increment(self.name, f"({q}) AS _q", since.get(self.name))
+                return
+            if self.streaming:
+                yield self._stream(self.name, q)
+                return
+            if self.max_rows and self.max_rows > 0 and self.sampling != "head":
+                df, total = self._fetch_sample(f"({q}) AS _q")
+                yield Dataset(name=self.name, path=None, df=df, total_rows=total, sampling=self.sampling)
+                return
             # Apply max_rows in query mode when not already limited
             if self.max_rows and self.max_rows > 0:
                 lowered = q.lower()
@@ -166,7 +479,7 @@ class LakehouseSQLDataSource(DataSource):
             warn_df = pl.DataFrame({"_error": [str(e)]})
             yield Dataset(name=f"{self.name} (error)", path=None, df=warn_df)
 
-    def _iter_schema_tables(self) -> Iterator[Dataset]:
+    def _iter_schema_tables(self, since: Optional[Dict[str, Any]] = None) -> Iterator[Dataset]:
         # Discover tables from INFORMATION_SCHEMA
         discovery_query = f'SELECT TABLE_NAME FROM INFORMATION_SCHEMA."TABLES" WHERE TABLE_SCHEMA = \'{self.schema}\''
         
@@ -175,8 +488,11 @@ class LakehouseSQLDataSource(DataSource):
             
             table_names = tables_df["TABLE_NAME"].to_list()
             
-            for table_name in table_names:
-                yield from self._fetch_table(table_name)
+            # _fetch_table catches its own errors, so one failing table does not stop the others
+            def fetch(table_name: str) -> Dataset:
+                return next(self._fetch_table(table_name, since))
+
+            yield from ordered_map(fetch, table_names, max_workers=self._fetch_workers())
                 
         except Exception as e:
             logger.error(f"Schema discovery failed: {e}")
@@ -185,11 +501,22 @@ class LakehouseSQLDataSource(DataSource):
             warn_df = pl.DataFrame({"_error": [f"Schema discovery failed: {str(e)}"]})
             yield Dataset(name=f"{self.schema} (discovery_error)", path=None, df=warn_df)
 
-    def _fetch_table(self, table_name: str) -> Iterator[Dataset]:
+    def _fetch_table(self, table_name: str, since: Optional[Dict[str, Any]] = None) -> Iterator[Dataset]:
         limit_clause = f" LIMIT {self.max_rows}" if self.max_rows else ""
         query = f'SELECT * FROM {self.schema}."{table_name}"{limit_clause}'
         
         try:
+            if since is not None:
+                name = f"{self.schema}.{table_name}"
+                yield self._fetch_increment(name, f'{self.schema}."{table_name}"', since.get(name))
+                return
+            if self.streaming:
+                yield self._stream(f"{self.schema}.{table_name}", f'SELECT * FROM {self.schema}."{table_name}"')
+                return
+            if self.max_rows and self.sampling != "head":
+                df, total = self._fetch_sample(f'{self.schema}."{table_name}"')
+                yield Dataset(name=f"{self.schema}.{table_name}", path=None, df=df, total_rows=total, sampling=self.sampling)
+                return
             df = self._execute_query(query)
             
             yield Dataset(name=f"{self.schema}.{table_name}", path=None, df=df)
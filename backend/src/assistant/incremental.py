@@ -0,0 +1,121 @@
+"""
+Persisted state for incremental runs over append-only datasets.
+
+Per dataset the store keeps a high-water mark (rows consumed so far, or the largest
+value of a watermark column) and a mergeable StreamingProfile of every row seen.
+A run then only reads rows past the mark and folds them into the profile, which
+yields whole-table statistics, z-score/IQR thresholds and categorical frequencies
+without rescanning the history.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.utils.logger import logger
+from src.schema_recognition.inference.streaming_stats import StreamingProfile
+
+
+def watermark_value(value: Any) -> Any:
+    """Converts a column maximum into a JSON-serialisable high-water mark."""
+    if isinstance(value, dt.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (dt.date, dt.time)):
+        return value.isoformat()
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+@dataclass
+class IncrementalState:
+    name: str
+    # None = table not seen yet; rows consumed (row-count mode) or max of `watermark_column`
+    watermark: Any = None
+    watermark_column: Optional[str] = None
+    profile: StreamingProfile = field(default_factory=StreamingProfile)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "watermark": self.watermark,
+            "watermark_column": self.watermark_column,
+            "profile": self.profile.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IncrementalState":
+        return cls(
+            name=data["name"],
+            watermark=data["watermark"],
+            watermark_column=data.get("watermark_column"),
+            profile=StreamingProfile.from_dict(data["profile"]),
+        )
+
+
+class IncrementalStore:
+    """
+    One JSON file per dataset under `root`.
+    watermark_column: column with increasing values (e.g. an ingestion timestamp);
+    None tracks the number of rows instead, which requires a stable row order.
+    State recorded with a different watermark column is discarded.
+    """
+
+    def __init__(self, root: str | os.PathLike, watermark_column: Optional[str] = None) -> None:
+        self.root = Path(root)
+        self.watermark_column = watermark_column
+
+    def _path(self, name: str) -> Path:
+        return self.root / f"{hashlib.sha256(name.encode('utf-8')).hexdigest()[:24]}.json"
+
+    def load(self, name: str) -> IncrementalState:
+        path = self._path(name)
+        try:
+            state = IncrementalState.from_dict(json.loads(path.read_text()))
+        except FileNotFoundError:
+            return IncrementalState(name=name, watermark_column=self.watermark_column)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable incremental state of {name}: {e}")
+            return IncrementalState(name=name, watermark_column=self.watermark_column)
+        if state.watermark_column != self.watermark_column:
+            logger.info(f"Watermark column of {name} changed, starting over")
+            return IncrementalState(name=name, watermark_column=self.watermark_column)
+        return state
+
+    def save(self, state: IncrementalState) -> None:
+        path = self._path(state.name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state.to_dict(), f, default=str)
+            os.replace(tmp, path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def watermarks(self) -> Dict[str, Any]:
+        """High-water marks of all known datasets, as passed to `DataSource.iter_datasets(since=...)`."""
+        marks: Dict[str, Any] = {}
+        for path in self.root.glob("*.json"):
+            try:
+                data = json.loads(path.read_text())
+            except Exception:
+                continue
+            if data.get("watermark_column") == self.watermark_column:
+                marks[data["name"]] = data["watermark"]
+        return marks
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Forgets one dataset (or all), so the next run starts from the first row."""
+        if name is None:
+            shutil.rmtree(self.root, ignore_errors=True)
+        else:
+            self._path(name).unlink(missing_ok=True)
@@ -5,16 +5,21 @@ from typing import List, Dict, Optional, Any
 
 from src.utils.logger import logger
 
+def default_model() -> str:
+    """Model used when none is given (OLLAMA_MODEL, default llama3.2:1b)."""
+    return os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+
+
 class LLMClient:
     """
     Client for interacting with a local Ollama instance.
     """
-    def __init__(self, base_url: str = None, model: str = "llama3.2:1b"):
+    def __init__(self, base_url: str = None, model: str = None):
         # Read from environment if not provided
         if base_url is None:
             base_url = os.getenv("OLLAMA_HOST", "http://localhost:11434")
         self.base_url = base_url
-        self.model = model
+        self.model = model or default_model()
 
     def _generate(self, prompt: str) -> Optional[str]:
         """
@@ -0,0 +1,72 @@
+"""
+Persisted detector models (currently fitted Isolation Forests), one per dataset.
+
+A model is stored together with the key it was fitted for: the feature columns and
+dtypes, the detector parameters and the dataset fingerprint. A later run with the
+same key loads it and only scores rows. Incremental runs key on the dataset name
+alone, so every increment is scored by the model fitted on the first batch.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+
+from src.utils.logger import logger
+
+
+def model_key(**parts: Any) -> str:
+    """Hash of everything a fitted model depends on."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ModelStore:
+    """
+    Directory of joblib-pickled models. Only the latest model per dataset (and
+    detector) is kept: saving a model for a new key replaces the old one.
+    Models are unpickled on load, so the directory must only be writable by trusted code.
+    """
+
+    def __init__(self, root: str | os.PathLike) -> None:
+        self.root = Path(root)
+
+    def _dir(self, name: str) -> Path:
+        return self.root / hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+
+    def load(self, name: str, detector: str, key: str) -> Optional[Any]:
+        path = self._dir(name) / f"{detector}.joblib"
+        try:
+            stored = joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable {detector} model of {name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        return stored["model"] if stored.get("key") == key else None
+
+    def save(self, name: str, detector: str, key: str, model: Any) -> None:
+        path = self._dir(name) / f"{detector}.joblib"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                joblib.dump({"name": name, "key": key, "model": model}, f)
+            os.replace(tmp, path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Removes the models of dataset `name` (all models if None)."""
+        shutil.rmtree(self._dir(name) if name is not None else self.root, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        files = list(self.root.glob("*/*.joblib"))
+        return {"models": len(files), "bytes": sum(f.stat().st_size for f in files)}
@@ -1,34 +1,49 @@
 from __future__ import annotations
 
-import json
+import threading
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence
 
+import numpy as np
 import polars as pl
 
 from src.utils.logger import logger
+from src.utils.concurrency import ordered_map
+from src.utils.row_encoding import encode_rows
 
 from src.assistant.datasource import DataSource, Dataset
-from src.schema_recognition.inference import schema_inference
-from src.schema_recognition.inference.nested_detection import detect_nested_structures
-from src.schema_recognition.inference.nested_detection import detect_nested_structures
-from src.schema_recognition.inference.type_inference import refine_types
+from src.assistant.sampling import extrapolate_count
+from src.assistant.cache import ResultCache, config_key
+from src.assistant.incremental import IncrementalStore
+from src.assistant.model_store import ModelStore, model_key
+from src.assistant.stages import Stage, run_stages
+from src.schema_recognition.inference.nested_detection import detect_nested_structures, profile_nested, unnest_fields
+from src.schema_recognition.inference.type_inference import refine_types, refine_types_lazy
 from src.schema_recognition.inference.statistics import (
     calculate_missing_ratios,
     calculate_numeric_stats,
     calculate_text_stats,
     detect_categorical
 )
-from src.schema_recognition.inference.semantic import SemanticTypeDetector
-from src.semantic_field_mapping import SemanticFieldMapper, map_columns
-from src.assistant.llm_client import LLMClient
+from src.schema_recognition.inference.profiler import build_profile_exprs, profile_dataframe, profile_from_row
+from src.schema_recognition.inference.semantic import ColumnProfileCache, SemanticTypeDetector
+from src.schema_recognition.inference.streaming_stats import StreamingProfile
+from src.semantic_field_mapping import SemanticFieldMapper
+from src.assistant.llm_client import LLMClient, default_model
 from src.anomaly_detection.utils import (
-    detect_anomalies,
+    AnomalyScores,
+    ensemble,
+    hampel_scores,
+    iqr_scores,
+    mad_scores,
     select_numeric_columns,
+    z_score_scores,
 )
-from src.anomaly_detection.categorical import detect_categorical_anomalies
-from src.anomaly_detection.missing_values import detect_missing_value_anomalies
+from src.anomaly_detection.categorical import categorical_scores
+from src.anomaly_detection.isolation_forest import decision_scores, isolation_forest_scores
+from src.anomaly_detection.missing_values import missing_value_scores
 
 
 @dataclass
@@ -42,6 +57,40 @@ class AnomalyConfig:
     contamination: float = 0.01
     n_estimators: int = 100
     random_state: int = 42
+    # Datasets analysed concurrently; "thread" suits I/O-bound sources (SQL, LLM),
+    # "process" suits CPU-bound detection on local files.
+    max_workers: int = 1
+    executor: str = "thread"
+    # Threads used inside one dataset to overlap independent analysis stages (1 = serial)
+    stage_workers: int = 4
+    # IQR quartiles: "exact" sorts each column, "sketch" uses mergeable KLL sketches
+    # with a rank error of about `quantile_error` (whole-table sketches of streamed sources
+    # are used when available)
+    iqr_backend: str = "exact"
+    quantile_error: float = 0.01
+    # Robust rules: modified Z-Score (median/MAD) and a rolling Hampel filter for
+    # ordered data (rows in file order, or sorted by hampel_order_by)
+    use_mad: bool = False
+    mad_threshold: float = 3.5
+    use_hampel: bool = False
+    hampel_window: int = 7
+    hampel_threshold: float = 3.0
+    hampel_order_by: Optional[str] = None
+    # Isolation Forest: fit on at most isoforest_max_samples complete rows (None = all),
+    # score every row in chunks of isoforest_chunk_rows; isoforest_n_jobs builds trees in parallel
+    isoforest_max_samples: Optional[int] = 100_000
+    isoforest_chunk_rows: int = 100_000
+    isoforest_n_jobs: int = 1
+    # Ensemble: the `top_anomalies` flagged rows with the highest weighted combined score
+    # of all detectors (0 = no top_anomalies section); weights per method name, default 1
+    top_anomalies: int = 50
+    ensemble_weights: Optional[Dict[str, float]] = None
+    # Methods flagging more rows than this report them run-length/varint encoded
+    # (anomaly_rows_encoded) instead of as an inline JSON list
+    inline_rows_limit: int = 10_000
+    # Numeric Struct fields (outside lists) are scored by the numeric and categorical
+    # detectors as virtual columns named by their path, e.g. "address.zip"
+    nested_fields: bool = True
 
 
 @dataclass
@@ -63,91 +112,200 @@ def infer_schema(df: pl.DataFrame) -> Dict[str, str]:
 
 from typing import Tuple, Any, Callable
 
+def _record_scores(
+    method: str,
+    df_anom: pl.DataFrame,
+    counts: Dict[str, int],
+    rows: Dict[str, np.ndarray],
+    previews: Dict[str, List[Dict[str, Any]]],
+    detect: Callable[[], AnomalyScores],
+) -> Optional[AnomalyScores]:
+    # Reports are built from the mask: flagged row ids are gathered from it and only
+    # the preview rows (the first five flagged) are materialised
+    try:
+        scores = detect()
+    except (pl.ComputeError, ValueError, KeyError) as e:  # KeyError: e.g. hampel_order_by not in this dataset
+        logger.error(f"Error in {method} detection: {e}")
+        counts[method] = 0
+        return None
+    counts[method] = scores.count
+    flagged = scores.rows
+    if flagged.size:
+        rows[method] = df_anom["row_idx"].gather(flagged).to_numpy()
+        previews[method] = scores.take(df_anom, 5).drop("row_idx").to_dicts()
+    return scores
+
+
+def _isolation_forest(
+    dataset_name: str,
+    df_anom: pl.DataFrame,
+    numeric_cols: List[str],
+    anomaly_cfg: AnomalyConfig,
+    models: Optional[ModelStore],
+    model_scope: Optional[str],
+) -> AnomalyScores:
+    # A stored model fitted for the same data (or, in incremental runs, the same dataset) only scores
+    key = model = None
+    if models is not None and model_scope is not None:
+        key = model_key(
+            scope=model_scope,
+            columns={c: str(df_anom.schema[c]) for c in numeric_cols},
+            contamination=anomaly_cfg.contamination,
+            n_estimators=anomaly_cfg.n_estimators,
+            random_state=anomaly_cfg.random_state,
+            max_samples=anomaly_cfg.isoforest_max_samples,
+        )
+        model = models.load(dataset_name, "isolation_forest", key)
+    fitted, scores = isolation_forest_scores(
+        df_anom,
+        numeric_cols,
+        contamination=anomaly_cfg.contamination,
+        n_estimators=anomaly_cfg.n_estimators,
+        random_state=anomaly_cfg.random_state,
+        max_samples=anomaly_cfg.isoforest_max_samples,
+        n_jobs=anomaly_cfg.isoforest_n_jobs,
+        chunk_rows=anomaly_cfg.isoforest_chunk_rows,
+        model=model,
+    )
+    if key is not None and model is None and fitted is not None:
+        try:
+            models.save(dataset_name, "isolation_forest", key, fitted)
+        except OSError as e:
+            logger.warning(f"Could not persist Isolation Forest of {dataset_name}: {e}")
+    return decision_scores(scores)
+
+
+def _top_anomalies(
+    df_anom: pl.DataFrame,
+    scores: Dict[str, AnomalyScores],
+    anomaly_cfg: AnomalyConfig,
+) -> Optional[Dict[str, Any]]:
+    # Combined view across detectors; only the top rows are materialised
+    if anomaly_cfg.top_anomalies <= 0 or not scores:
+        return None
+    matrix = ensemble(scores, anomaly_cfg.ensemble_weights)
+    top = matrix.top(anomaly_cfg.top_anomalies)
+    row_ids = df_anom["row_idx"].gather(top).to_list()
+    values = df_anom[top].drop("row_idx").to_dicts()
+    return {
+        "detectors": matrix.detectors,
+        "weights": matrix.weights,
+        "rows": [
+            {
+                "row": row_id,
+                "score": round(float(matrix.combined[i]), 4),
+                "methods": [d for d, flagged in zip(matrix.detectors, matrix.flags[i]) if flagged],
+                "scores": [round(float(x), 4) for x in matrix.matrix[i]],
+                "values": row_values,
+            }
+            for i, row_id, row_values in zip(top, row_ids, values)
+        ],
+    }
+
+
+@dataclass
+class AnomalyResults:
+    """Output of the anomaly stage, keyed by detector method."""
+    counts: Dict[str, int]
+    # Path of the CSV with the flagged rows (None when not saved)
+    saved: Dict[str, Optional[str]]
+    rows: Dict[str, np.ndarray]
+    # First flagged rows with their values, also what the LLM explanation is given
+    previews: Dict[str, List[Dict[str, Any]]]
+    top: Optional[Dict[str, Any]]
+
+
 def _detect_all_anomalies(
     dataset_name: str,
     df_anom: pl.DataFrame,
-    schema: Dict[str, str],
     mapping_cfg: MappingConfig,
     anomaly_cfg: AnomalyConfig,
     numeric_cols: List[str],
     save_dir: Optional[Path],
     save_samples_limit: int,
     progress_callback: Optional[Callable[[str, int], None]] = None,
-) -> Tuple[Dict[str, int], Dict[str, Optional[str]], Dict[str, List[int]], Dict[str, List[Dict[str, Any]]], Optional[str]]:
+    reference: Optional[Dict[str, Any]] = None,
+    quartiles: Optional[Dict[str, Dict[str, float]]] = None,
+    models: Optional[ModelStore] = None,
+    model_scope: Optional[str] = None,
+    virtual_columns: Sequence[str] = (),
+) -> AnomalyResults:
     # Anomaly detection
+    # `reference`: whole-table statistics of incremental runs (StreamingProfile.detector_reference);
+    # the new rows are then judged against the full history instead of only against each other
+    # `quartiles`: sketched whole-source q1/q3 per column for the IQR rule
+    # `virtual_columns`: Struct fields added to df_anom (see unnest_fields)
+    column_refs = reference["columns"] if reference else {}
     anomalies_counts: Dict[str, int] = {}
-    anomaly_explanation: Optional[str] = None
     anomalies_saved: Dict[str, Optional[str]] = {}
-    anomalies_rows: Dict[str, List[int]] = {}
+    anomalies_rows: Dict[str, np.ndarray] = {}
     anomalies_previews: Dict[str, List[Dict[str, Any]]] = {}
+    detector_scores: Dict[str, AnomalyScores] = {}
 
-
-    def maybe_save(name: str, adf: pl.DataFrame) -> Optional[str]:
-        if save_dir is None or adf.is_empty():
+    def maybe_save(name: str, scores: Optional[AnomalyScores]) -> Optional[str]:
+        if save_dir is None or scores is None or not scores.mask.any():
             return None
         out = save_dir / f"{Path(dataset_name).as_posix().replace('/', '__')}__{name}.csv"
-        out.parent.mkdir(parents=True, exist_ok=True)
-        adf.drop("row_idx").head(save_samples_limit).write_csv(out)
-        return str(out)
+        try:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            scores.take(df_anom, save_samples_limit).drop("row_idx").write_csv(out)
+            return str(out)
+        except (pl.ComputeError, OSError) as e:  # e.g. nested columns cannot be written as CSV
+            logger.warning(f"Could not save {name} samples of {dataset_name}: {e}")
+            return None
+
+    def record(method: str, detect: Callable[[], AnomalyScores]) -> Optional[AnomalyScores]:
+        scores = _record_scores(method, df_anom, anomalies_counts, anomalies_rows, anomalies_previews, detect)
+        if scores is not None:
+            detector_scores[method] = scores
+        return scores
 
     if numeric_cols:
         if progress_callback:
             progress_callback(f"Running Z-Score anomaly detection on {dataset_name}...", 70)
-        # Per-column methods
+        # Per-column rules, evaluated for all numeric columns in one pass each
         if anomaly_cfg.use_zscore:
-            total = 0
-            for c in numeric_cols:
-                try:
-                    adf = detect_anomalies(df_anom, method="zscore", columns=[c], threshold=anomaly_cfg.z_threshold)
-                    total += adf.height
-                    if not adf.is_empty():
-                        current_rows = anomalies_rows.get("zscore", [])
-                        current_rows.extend(adf["row_idx"].to_list())
-                        anomalies_rows["zscore"] = sorted(list(set(current_rows)))
-                        if "zscore" not in anomalies_previews:
-                             anomalies_previews["zscore"] = adf.drop("row_idx").head(5).to_dicts()
-                except (pl.ComputeError, ValueError) as e:
-                    # Log error but continue with other columns
-                    logger.error(f"Error in Z-Score detection for column {c}: {e}")
-                    continue
-            anomalies_counts["zscore"] = total
+            record(
+                "zscore",
+                lambda: z_score_scores(df_anom, numeric_cols, threshold=anomaly_cfg.z_threshold, reference=column_refs),
+            )
             anomalies_saved["zscore"] = None
         if progress_callback:
             progress_callback(f"Running IQR anomaly detection on {dataset_name}...", 75)
         if anomaly_cfg.use_iqr:
-            total = 0
-            for c in numeric_cols:
-                try:
-                    adf = detect_anomalies(df_anom, method="iqr", columns=[c])
-                    total += adf.height
-                    if not adf.is_empty():
-                        current_rows = anomalies_rows.get("iqr", [])
-                        current_rows.extend(adf["row_idx"].to_list())
-                        anomalies_rows["iqr"] = sorted(list(set(current_rows)))
-                        if "iqr" not in anomalies_previews:
-                             anomalies_previews["iqr"] = adf.drop("row_idx").head(5).to_dicts()
-                except (pl.ComputeError, ValueError) as e:
-                     logger.error(f"Error in IQR detection for column {c}: {e}")
-                     continue
-            anomalies_counts["iqr"] = total
+            record(
+                "iqr",
+                lambda: iqr_scores(
+                    df_anom, numeric_cols, reference={**(quartiles or {}), **column_refs},
+                    backend=anomaly_cfg.iqr_backend, quantile_error=anomaly_cfg.quantile_error,
+                ),
+            )
             anomalies_saved["iqr"] = None
+        if anomaly_cfg.use_mad:
+            record(
+                "mad",
+                lambda: mad_scores(df_anom, numeric_cols, threshold=anomaly_cfg.mad_threshold),
+            )
+            anomalies_saved["mad"] = None
+        if anomaly_cfg.use_hampel:
+            record(
+                "hampel",
+                lambda: hampel_scores(
+                    df_anom, [c for c in numeric_cols if c != anomaly_cfg.hampel_order_by],
+                    window=anomaly_cfg.hampel_window, threshold=anomaly_cfg.hampel_threshold,
+                    order_by=anomaly_cfg.hampel_order_by,
+                ),
+            )
+            anomalies_saved["hampel"] = None
         # Multi-column Isolation Forest
         if anomaly_cfg.use_isolation_forest and len(numeric_cols) >= 1:
             try:
-                adf = detect_anomalies(
-                    df_anom,
-                    method="isolation_forest",
-                    columns=numeric_cols,
-                    contamination=anomaly_cfg.contamination,
-                    n_estimators=anomaly_cfg.n_estimators,
-                    random_state=anomaly_cfg.random_state,
+                scores = record(
+                    "isolation_forest",
+                    lambda: _isolation_forest(dataset_name, df_anom, numeric_cols, anomaly_cfg, models, model_scope),
                 )
-                anomalies_counts["isolation_forest"] = adf.height
-                if not adf.is_empty():
-                    anomalies_rows["isolation_forest"] = adf["row_idx"].to_list()
-                    anomalies_previews["isolation_forest"] = adf.drop("row_idx").head(5).to_dicts()
-                anomalies_saved["isolation_forest"] = maybe_save("isoforest", adf)
-            except (pl.ComputeError, ValueError, ImportError) as e:
+                anomalies_saved["isolation_forest"] = maybe_save("isoforest", scores)
+            except ImportError as e:
                 logger.error(f"Error in Isolation Forest detection: {e}")
                 anomalies_counts["isolation_forest"] = 0
                 anomalies_saved["isolation_forest"] = None
@@ -156,100 +314,70 @@ def _detect_all_anomalies(
         if progress_callback:
             progress_callback(f"Running Categorical anomaly detection on {dataset_name}...", 80)
         try:
-            cat_anomalies = detect_categorical_anomalies(df_anom)
-            if cat_anomalies.height > 0:
-                anomalies_counts["categorical"] = cat_anomalies.height
-                anomalies_rows["categorical"] = cat_anomalies["row_idx"].to_list()
-                anomalies_previews["categorical"] = cat_anomalies.drop("row_idx").head(5).to_dicts()
-                anomalies_saved["categorical"] = maybe_save("categorical", cat_anomalies)
+            if reference:
+                scores = categorical_scores(
+                    df_anom, frequencies=reference["value_counts"], total_rows=reference["total_rows"]
+                )
+            else:
+                scores = categorical_scores(df_anom)
+            if scores.mask.any():
+                record("categorical", lambda: scores)
+                anomalies_saved["categorical"] = maybe_save("categorical", scores)
         except Exception as e:
             logger.error(f"Error in Categorical Anomaly detection: {e}")
 
         # Missing Value Anomalies
         if anomaly_cfg.use_missing_values:
             try:
-                missing_anomalies = detect_missing_value_anomalies(df_anom, threshold=anomaly_cfg.missing_threshold)
-                if missing_anomalies.height > 0:
-                    anomalies_counts["missing_values"] = missing_anomalies.height
-                    anomalies_rows["missing_values"] = missing_anomalies["row_idx"].to_list()
-                    anomalies_previews["missing_values"] = missing_anomalies.drop("row_idx").head(5).to_dicts()
-                    anomalies_saved["missing_values"] = maybe_save("missing_values", missing_anomalies)
+                # The row_idx column itself is never missing; virtual Struct fields
+                # would count a value again that is missing inside its column
+                scores = missing_value_scores(
+                    df_anom.drop(virtual_columns), threshold=anomaly_cfg.missing_threshold
+                )
+                if scores.mask.any():
+                    record("missing_values", lambda: scores)
+                    anomalies_saved["missing_values"] = maybe_save("missing_values", scores)
             except Exception as e:
                 logger.error(f"Error in Missing Value detection: {e}")
 
-        # LLM Anomaly Explanation
-        # If we have any anomalies, pick a few samples and ask LLM to explain
-        try:
-            anomaly_samples = []
-            for method, previews in anomalies_previews.items():
-                for p in previews[:2]:
-                    sample = p.copy()
-                    sample["_flagged_by"] = method
-                    anomaly_samples.append(sample)
-                if len(anomaly_samples) >= 5:
-                    break
-                    
-            if anomaly_samples:
-                llm = LLMClient()
-                explanation = llm.explain_anomalies(dataset_name, schema, anomaly_samples[:5])
-                if explanation:
-                    anomaly_explanation = explanation
-        except Exception as e:
-            logger.error(f"LLM Anomaly Explanation failed: {e}")
+    top_anomalies = _top_anomalies(df_anom, detector_scores, anomaly_cfg)
+    return AnomalyResults(anomalies_counts, anomalies_saved, anomalies_rows, anomalies_previews, top_anomalies)
 
-    return anomalies_counts, anomalies_saved, anomalies_rows, anomalies_previews, anomaly_explanation
 
-def run_on_dataset(
-    dataset: Dataset,
-    mapping_cfg: MappingConfig,
-    anomaly_cfg: AnomalyConfig,
-    save_dir: Optional[Path] = None,
-    save_samples_limit: int = 200,
-    progress_callback: Optional[Callable[[str, int], None]] = None,
-) -> DatasetReport:
-    df = dataset.df
-    # Enhance schema recognition for non-Parquet files (CSV/JSON) or where inference failed
-    df = refine_types(df)
-    
-    rows, cols = df.height, df.width
-    
-    # Create a version with row index specifically for anomaly tracking
-    df_anom = df.with_row_count("row_idx")
-
-    if progress_callback:
-        progress_callback(f"Inferring schema for {dataset.name}...", 10)
-        
-    # Schema
-    schema = infer_schema(df)
-    
-    # Advanced Schema Recognition
-    nested_cols = detect_nested_structures(df)
-    missing_ratios = calculate_missing_ratios(df)
-    numeric_stats = calculate_numeric_stats(df)
-    text_stats = calculate_text_stats(df)
-    categorical_cols = detect_categorical(df)
-    
-    semantic_detector = SemanticTypeDetector()
-    semantic_types = semantic_detector.detect(df)
-    
-    statistics = {
-        "missing_ratios": missing_ratios,
-        "numeric_stats": numeric_stats,
-        "text_stats": text_stats,
-        "row_count": rows,
-        "col_count": cols
-    }
+def _explain_anomalies(
+    dataset_name: str,
+    schema: Dict[str, str],
+    anomalies_previews: Dict[str, List[Dict[str, Any]]],
+) -> Optional[str]:
+    # LLM Anomaly Explanation
+    # If we have any anomalies, pick a few samples and ask LLM to explain
+    try:
+        anomaly_samples = []
+        for method, previews in anomalies_previews.items():
+            for p in previews[:2]:
+                sample = p.copy()
+                sample["_flagged_by"] = method
+                anomaly_samples.append(sample)
+            if len(anomaly_samples) >= 5:
+                break
+
+        if anomaly_samples:
+            llm = LLMClient()
+            explanation = llm.explain_anomalies(dataset_name, schema, anomaly_samples[:5])
+            if explanation:
+                return explanation
+    except Exception as e:
+        logger.error(f"LLM Anomaly Explanation failed: {e}")
+    return None
 
-    # LLM Enrichment
-    if progress_callback:
-        progress_callback(f"Generating LLM insights for {dataset.name}...", 30)
+def _llm_enrichment(dataset_name: str, df: pl.DataFrame, schema: Dict[str, str], semantic_types: Dict[str, str]) -> Dict[str, Any]:
     llm_insights = {"descriptions": {}, "summary": None, "anomaly_explanation": None}
     try:
         llm = LLMClient()
         # Generate summary
         sample_rows = df.head(3).to_dicts()
-        llm_insights["summary"] = llm.summarize_table(dataset.name, schema, sample_rows)
-        
+        llm_insights["summary"] = llm.summarize_table(dataset_name, schema, sample_rows)
+
         # Generate descriptions for a few interesting columns (limit to avoid slow response)
         for col in df.columns:
             if col not in semantic_types:
@@ -258,59 +386,367 @@ def run_on_dataset(
                     llm_insights["descriptions"][col] = desc
     except Exception as e:
         logger.error(f"LLM Enrichment failed: {e}")
+    return llm_insights
+
+
+def _llm_failed(llm_insights: Dict[str, Any], previews: Dict[str, List[Dict[str, Any]]]) -> bool:
+    # The summary is always requested and an explanation whenever rows were flagged;
+    # the client returns None when the LLM is unreachable or errors
+    if llm_insights.get("summary") is None:
+        return True
+    return any(previews.values()) and not llm_insights.get("anomaly_explanation")
+
+
+def _apply_exact_stats(
+    stats: Dict[str, Any],
+    schema: pl.Schema,
+    column_stats: Dict[str, Dict[str, Any]],
+    total_rows: int,
+) -> None:
+    """
+    Overrides sample-based values with exact whole-source statistics (Parquet footer or
+    a streamed full scan). String columns keep their sample ratio unless the source also
+    counted empty strings, since those count as missing too.
+    """
+    for col, exact in column_stats.items():
+        if col not in schema:
+            continue
+        if "null_count" in exact and (schema[col] != pl.Utf8 or "empty_count" in exact):
+            missing = exact["null_count"] + exact.get("empty_count", 0)
+            stats["missing_ratios"][col] = missing / total_rows
+        if "min" in exact and col in stats["numeric_stats"]:
+            stats["numeric_stats"][col].update(
+                {k: exact[k] for k in ("min", "max", "mean", "std", "zeros") if k in exact}
+            )
+        if "top_values" in exact and col in stats["text_stats"]:
+            stats["text_stats"][col].update(unique_count=exact["n_unique"], top_values=exact["top_values"])
+
+
+def _report_rows(
+    anomaly_rows: Dict[str, np.ndarray], inline_limit: int
+) -> Tuple[Dict[str, List[int]], Optional[Dict[str, Dict[str, Any]]]]:
+    # Small row sets stay inline JSON lists, large ones are encoded (see src.utils.row_encoding)
+    inline = {m: rows.tolist() for m, rows in anomaly_rows.items() if len(rows) <= inline_limit}
+    encoded = {m: encode_rows(rows) for m, rows in anomaly_rows.items() if len(rows) > inline_limit}
+    return inline, encoded or None
+
+
+def _sampling_summary(dataset: Dataset, sample_rows: int, anomaly_rows: Dict[str, np.ndarray]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Dict[str, float]]]]:
+    """
+    Describes how the analysed rows were drawn and, for random/stratified samples,
+    extrapolates the anomaly counts of each method to the whole source (95% CI).
+    """
+    if not dataset.sampling or dataset.total_rows is None:
+        return None, None
+    total = dataset.total_rows
+    sampling = {
+        "strategy": dataset.sampling,
+        "sample_rows": sample_rows,
+        "total_rows": total,
+        "fraction": sample_rows / total if total else 1.0,
+    }
+    # A head sample is not representative, so its counts are not extrapolated
+    if dataset.sampling == "head" or total <= sample_rows:
+        return sampling, None
+    estimates = {
+        method: {k: round(v, 1) for k, v in extrapolate_count(len(rows), sample_rows, total).items()}
+        for method, rows in anomaly_rows.items()
+    }
+    return sampling, estimates
+
+
+def _monotonic(callback: Callable[[str, int], None]) -> Callable[[str, int], None]:
+    # Stages report from several threads; never let the percentage go backwards
+    lock = threading.Lock()
+    last = [0]
+
+    def report(msg: str, pct: int) -> None:
+        with lock:
+            last[0] = max(last[0], pct)
+            callback(msg, last[0])
+
+    return report
+
 
+def run_on_dataset(
+    dataset: Dataset,
+    mapping_cfg: MappingConfig,
+    anomaly_cfg: AnomalyConfig,
+    save_dir: Optional[Path] = None,
+    save_samples_limit: int = 200,
+    progress_callback: Optional[Callable[[str, int], None]] = None,
+    cache: Optional[ResultCache] = None,
+    reference: Optional[Dict[str, Any]] = None,
+    models: Optional[ModelStore] = None,
+    model_scope: Optional[str] = None,
+    column_profiles: Optional[ColumnProfileCache] = None,
+) -> DatasetReport:
+    """
+    column_profiles: semantic column profiles of this run; the semantic stage fills it
+    and the mapping reads from it, so every column is pattern-matched once.
+    """
     if progress_callback:
-        progress_callback(f"Performing Semantic Mapping for {dataset.name}...", 50)
-        
-    # Semantic mapping
-    mapper = SemanticFieldMapper(
-        reference_fields=list(mapping_cfg.reference_fields),
-        synonyms=mapping_cfg.synonyms,
-        threshold=mapping_cfg.threshold,
-        epsilon=mapping_cfg.epsilon,
-    )
-    mapping_result = mapper.map_columns(df)
+        progress_callback = _monotonic(progress_callback)
+
+    cfg_key = None
+    if cache is not None and dataset.fingerprint:
+        cfg_key = config_key(mapping_cfg, anomaly_cfg, llm_model=default_model())
+        cached = cache.get(dataset.name, dataset.fingerprint, cfg_key)
+        if cached is not None:
+            if progress_callback:
+                progress_callback(f"Loaded cached analysis of {dataset.name}", 100)
+            return cached.model_copy(update={"cached": True})
+
+    lazy_results: Dict[str, Any] = {}
+    if column_profiles is None:
+        column_profiles = ColumnProfileCache()
+
+    def refine(_):
+        if dataset.lf is None:
+            # Enhance schema recognition for non-Parquet files (CSV/JSON) or where inference failed
+            return refine_types(dataset.df)
+        # Lazy mode: type refinement only collects the string columns; the refined frame and
+        # its profile are then collected together so both plans share a single scan
+        lf = refine_types_lazy(dataset.lf)
+        schema = lf.collect_schema()
+        df, profile_row = pl.collect_all([lf, lf.select(build_profile_exprs(schema))])
+        lazy_results["profile"] = profile_from_row(schema, profile_row.row(0, named=True))
+        return df
+
+    def schema_stage(r):
+        if progress_callback:
+            progress_callback(f"Inferring schema for {dataset.name}...", 10)
+        return infer_schema(r["refine"])
+
+    def statistics_stage(r):
+        df = r["refine"]
+        # One fused Polars pass over all columns; the helpers below are views over it
+        profile = lazy_results.get("profile") or profile_dataframe(df)
+        stats = {
+            "missing_ratios": calculate_missing_ratios(df, profile=profile),
+            "numeric_stats": calculate_numeric_stats(df, profile=profile),
+            "text_stats": calculate_text_stats(df, profile=profile),
+            "categorical_cols": detect_categorical(df, profile=profile),
+        }
+        if dataset.column_stats and dataset.total_rows:
+            _apply_exact_stats(stats, df.schema, dataset.column_stats, dataset.total_rows)
+        return stats
+
+    def llm_stage(r):
+        if progress_callback:
+            progress_callback(f"Generating LLM insights for {dataset.name}...", 30)
+        return _llm_enrichment(dataset.name, r["refine"], r["schema"], r["semantic"])
 
-    # Anomaly detection
-    numeric_cols = select_numeric_columns(df_anom, exclude=["row_idx"])
-    (
-        anomalies_counts,
-        anomalies_saved,
-        anomalies_rows,
-        anomalies_previews,
-        anomaly_explanation,
-    ) = _detect_all_anomalies(
-        dataset_name=dataset.name,
-        df_anom=df_anom,
-        schema=schema,
-        mapping_cfg=mapping_cfg,
-        anomaly_cfg=anomaly_cfg,
-        numeric_cols=numeric_cols,
-        save_dir=save_dir,
-        save_samples_limit=save_samples_limit,
-        progress_callback=progress_callback,
-    )
-    if anomaly_explanation:
-        llm_insights["anomaly_explanation"] = anomaly_explanation
+    def mapping_stage(r):
+        if progress_callback:
+            progress_callback(f"Performing Semantic Mapping for {dataset.name}...", 50)
+        mapper = SemanticFieldMapper(
+            reference_fields=list(mapping_cfg.reference_fields),
+            synonyms=mapping_cfg.synonyms,
+            threshold=mapping_cfg.threshold,
+            epsilon=mapping_cfg.epsilon,
+            profile_cache=column_profiles,
+            dataset=dataset.name,
+        )
+        return mapper.map_columns(r["refine"])
+
+    def anomalies_stage(r):
+        # Create a version with row index specifically for anomaly tracking
+        df_anom = r["refine"].with_row_index("row_idx")
+        virtual_columns: List[str] = []
+        if anomaly_cfg.nested_fields:
+            df_anom = unnest_fields(df_anom, numeric_only=True)
+            virtual_columns = df_anom.columns[r["refine"].width + 1:]
+        numeric_cols = select_numeric_columns(df_anom, exclude=["row_idx"])
+        quartiles = None
+        if anomaly_cfg.iqr_backend == "sketch" and dataset.column_stats:
+            # Streamed sources sketched every row; their quartiles beat those of the sample
+            quartiles = {
+                c: {"q1": s["q1"], "q3": s["q3"]} for c, s in dataset.column_stats.items() if s.get("q1") is not None
+            }
+        return _detect_all_anomalies(
+            dataset_name=dataset.name,
+            df_anom=df_anom,
+            mapping_cfg=mapping_cfg,
+            anomaly_cfg=anomaly_cfg,
+            numeric_cols=numeric_cols,
+            save_dir=save_dir,
+            save_samples_limit=save_samples_limit,
+            progress_callback=progress_callback,
+            reference=reference,
+            quartiles=quartiles,
+            models=models,
+            # Without an explicit scope a stored model is only reused for identical data
+            model_scope=model_scope or dataset.fingerprint,
+            virtual_columns=virtual_columns,
+        )
 
-    return DatasetReport(
+    # Dependency graph: everything reads the refined frame; the LLM stages additionally
+    # need the schema, semantic types or anomaly previews, the mapping the semantic
+    # profiles (it only reads them from the cache). Independent stages overlap.
+    stages = [
+        Stage("refine", refine),
+        Stage("schema", schema_stage, deps=["refine"]),
+        Stage("nested", lambda r: (detect_nested_structures(r["refine"]), profile_nested(r["refine"])), deps=["refine"]),
+        Stage("statistics", statistics_stage, deps=["refine"]),
+        Stage(
+            "semantic",
+            lambda r: SemanticTypeDetector().detect(r["refine"], cache=column_profiles, dataset=dataset.name),
+            deps=["refine"],
+        ),
+        Stage("llm_enrichment", llm_stage, deps=["refine", "schema", "semantic"]),
+        Stage("mapping", mapping_stage, deps=["refine", "semantic"]),
+        Stage("anomalies", anomalies_stage, deps=["refine"]),
+        Stage(
+            "anomaly_explanation",
+            lambda r: _explain_anomalies(dataset.name, r["schema"], r["anomalies"].previews),
+            deps=["schema", "anomalies"],
+        ),
+    ]
+    results, stage_timings = run_stages(stages, max_workers=anomaly_cfg.stage_workers)
+
+    df = results["refine"]
+    stats = results["statistics"]
+    statistics = {
+        "missing_ratios": stats["missing_ratios"],
+        "numeric_stats": stats["numeric_stats"],
+        "text_stats": stats["text_stats"],
+        "row_count": df.height,
+        "col_count": df.width,
+    }
+    if dataset.total_rows is not None:
+        statistics["source_row_count"] = dataset.total_rows
+    llm_insights = results["llm_enrichment"]
+    if results["anomaly_explanation"]:
+        llm_insights["anomaly_explanation"] = results["anomaly_explanation"]
+    mapping_result = results["mapping"]
+    anomalies: AnomalyResults = results["anomalies"]
+    sampling, anomaly_estimates = _sampling_summary(dataset, df.height, anomalies.rows)
+    inline_rows, encoded_rows = _report_rows(anomalies.rows, anomaly_cfg.inline_rows_limit)
+
+    report = DatasetReport(
         name=dataset.name,
         path=str(dataset.path) if dataset.path else None,
-        rows=rows,
-        cols=cols,
-        schema=schema,
-        semantic_types=semantic_types,
+        rows=df.height,
+        cols=df.width,
+        schema=results["schema"],
+        semantic_types=results["semantic"],
         statistics=statistics,
-        nested_structures=nested_cols,
-        categorical_cols=categorical_cols,
+        nested_structures=results["nested"][0],
+        nested_profile=results["nested"][1],
+        categorical_cols=stats["categorical_cols"],
         llm_insights=llm_insights,
         mapping=mapping_result.get("mapping", {}),
         ambiguous=mapping_result.get("ambiguous", []),
         unmapped=mapping_result.get("unmapped", []),
-        anomalies=anomalies_counts,
-        anomaly_samples_saved=anomalies_saved,
-        anomaly_rows=anomalies_rows,
-        anomaly_previews=anomalies_previews,
+        anomalies=anomalies.counts,
+        anomaly_samples_saved=anomalies.saved,
+        anomaly_rows=inline_rows,
+        anomaly_rows_encoded=encoded_rows,
+        anomaly_previews=anomalies.previews,
+        top_anomalies=anomalies.top,
+        stage_timings={s.name: round(stage_timings[s.name], 4) for s in stages},
+        sampling=sampling,
+        anomaly_estimates=anomaly_estimates,
+    )
+    if cfg_key is not None and _llm_failed(llm_insights, anomalies.previews):
+        # A report without LLM insights (e.g. Ollama down) would be served for every later run
+        logger.info(f"Not caching analysis of {dataset.name}: LLM enrichment failed")
+    elif cfg_key is not None:
+        try:
+            cache.put(dataset.name, dataset.fingerprint, cfg_key, report)
+        except OSError as e:  # a full or read-only cache must not fail the run
+            logger.warning(f"Could not cache analysis of {dataset.name}: {e}")
+    return report
+
+
+class _RunProgress:
+    """
+    Folds per-dataset progress (0-100) into one monotonic run-level percentage,
+    so callbacks stay coherent when several datasets are analysed at once.
+    Datasets are keyed by their position in the source (names need not be unique);
+    `total` comes from the schema pass and may undercount, so the result is capped at `end`.
+    """
+
+    def __init__(self, callback: Callable[[str, int], None], total: int, start: int = 5, end: int = 95) -> None:
+        self.callback = callback
+        self.total = max(total, 1)
+        self.start = start
+        self.end = end
+        self.fractions: Dict[int, float] = {}
+        self.last_pct = start
+        self.lock = threading.Lock()
+
+    def update(self, key: int, msg: str, pct: int) -> None:
+        with self.lock:
+            self.fractions[key] = max(self.fractions.get(key, 0.0), min(pct, 100) / 100)
+            overall = self.start + (self.end - self.start) * sum(self.fractions.values()) / self.total
+            self.last_pct = max(self.last_pct, min(int(overall), self.end))
+            self.callback(msg, self.last_pct)
+
+    def for_dataset(self, key: int) -> Callable[[str, int], None]:
+        return partial(self.update, key)
+
+
+def run_incremental(
+    dataset: Dataset,
+    mapping_cfg: MappingConfig,
+    anomaly_cfg: AnomalyConfig,
+    store: IncrementalStore,
+    save_dir: Optional[Path] = None,
+    progress_callback: Optional[Callable[[str, int], None]] = None,
+    models: Optional[ModelStore] = None,
+) -> DatasetReport:
+    """
+    Analyses the rows appended to `dataset` since the last run. They are folded into
+    the persisted profile first, so the report carries whole-table statistics and the
+    detectors score the new rows against z-score/IQR thresholds and category
+    frequencies of the full history. The state only advances once the analysis succeeded.
+    With `models`, the Isolation Forest fitted on the first batch scores all later ones.
+    """
+    if dataset.df is None or "_error" in dataset.df.columns:
+        return run_on_dataset(dataset, mapping_cfg, anomaly_cfg, save_dir, progress_callback=progress_callback)
+
+    state = store.load(dataset.name)
+    if not state.profile.row_count:
+        # Sketch precision is fixed when the profile is created and persists across runs
+        state.profile = StreamingProfile.for_error(anomaly_cfg.quantile_error)
+    state.profile.update(dataset.df)
+    dataset.column_stats = state.profile.column_stats()
+    dataset.total_rows = state.profile.row_count
+    report = run_on_dataset(
+        dataset, mapping_cfg, anomaly_cfg, save_dir,
+        progress_callback=progress_callback,
+        reference=state.profile.detector_reference(),
+        models=models,
+        model_scope="incremental",
+    )
+    state.watermark = dataset.watermark
+    store.save(state)
+    report.incremental = {
+        "watermark_column": store.watermark_column,
+        "previous_watermark": dataset.since,
+        "watermark": dataset.watermark,
+        "new_rows": dataset.df.height,
+        "total_rows": state.profile.row_count,
+    }
+    return report
+
+
+def _analyse_job(
+    job: Tuple[Dataset, MappingConfig, Optional[Path], Optional[Callable[[str, int], None]]],
+    anomaly_cfg: AnomalyConfig,
+    cache: Optional[ResultCache] = None,
+    incremental: Optional[IncrementalStore] = None,
+    models: Optional[ModelStore] = None,
+) -> DatasetReport:
+    dataset, mapping_cfg, ds_save_dir, callback = job
+    if incremental is not None:
+        return run_incremental(
+            dataset, mapping_cfg, anomaly_cfg, incremental, ds_save_dir, progress_callback=callback, models=models
+        )
+    return run_on_dataset(
+        dataset, mapping_cfg, anomaly_cfg, ds_save_dir, progress_callback=callback, cache=cache, models=models
     )
 
 
@@ -320,58 +756,90 @@ def run_assistant(
     anomaly_cfg: Optional[AnomalyConfig] = None,
     save_dir: Optional[Path] = None,
     progress_callback: Optional[Callable[[str, int], None]] = None,
+    cache: Optional[ResultCache] = None,
+    incremental: Optional[IncrementalStore] = None,
+    models: Optional[ModelStore] = None,
 ) -> AssistantReport:
+    """
+    Analyses every dataset of `source`.
+    cache: reuse reports of unchanged datasets (see src.assistant.cache).
+    incremental: only read rows appended since the previous run and merge them into
+    the persisted per-dataset state (see src.assistant.incremental); the cache is not
+    used in this mode since every increment is new data.
+    models: persist fitted Isolation Forests and reuse them for unchanged data and
+    later increments (see src.assistant.model_store).
+    """
     anomaly_cfg = anomaly_cfg or AnomalyConfig()
     datasets_reports: List[DatasetReport] = []
 
     if save_dir:
         save_dir.mkdir(parents=True, exist_ok=True)
 
-    # 1. Buffer all datasets to memory to enable global analysis
-    # Note: For very large data, we might want to just scan schemas first, 
-    # but DataSource.iter_datasets yields dataframes directly.
-    all_datasets: List[Dataset] = list(source.iter_datasets())
-    
-    # 2. Global Schema Discovery
+    # 1. Global Schema Discovery
+    # A cheap pass that only collects column names, so no dataset is held in memory
+    # while the mapping targets are being assembled.
     if progress_callback:
         progress_callback("Scanning global schemas...", 5)
     # Collect all unique column names across all datasets to use as potential mapping targets
     global_columns = set()
-    for ds in all_datasets:
-        global_columns.update(ds.df.columns)
-        
-    # 3. Process each dataset with dynamic mapping
-    for dataset in all_datasets:
-        ds_save_dir = save_dir / dataset.name.replace("/", "__") if save_dir else None
-        
-        # Dynamic Mapping Logic:
-        # The reference fields for this dataset should be:
-        #   User provided fields (explicit targets)
-        #   + All columns from OTHER tables (implicit targets)
-        #   - Columns in THIS table (avoid self-mapping if names are identical, though mapper handles exact match)
-        
-        # We keep user provided fields as high priority. 
-        # The mapper treats all reference fields equally, but we can rely on the fact that
-        # if a column matches a user field, it's a good map.
-        # If it matches another table's column, it's also a good map (cross-table link).
-        
-        current_cols = set(dataset.df.columns)
-        # Potential targets from other tables
-        other_table_cols = global_columns - current_cols
-        
-        # Combine user refs and other table cols
-        # Use a set to avoid duplicates
-        dynamic_refs = set(mapping_cfg.reference_fields) | other_table_cols
-        
-        # Create a specific config for this dataset
-        dynamic_mapping_cfg = MappingConfig(
-            reference_fields=list(dynamic_refs),
-            synonyms=mapping_cfg.synonyms,
-            threshold=mapping_cfg.threshold,
-            epsilon=mapping_cfg.epsilon
-        )
-        
-        report = run_on_dataset(dataset, dynamic_mapping_cfg, anomaly_cfg, ds_save_dir, progress_callback=progress_callback)
+    n_datasets = 0
+    for ds_schema in source.iter_schemas():
+        global_columns.update(ds_schema.columns)
+        n_datasets += 1
+
+    use_processes = anomaly_cfg.max_workers > 1 and anomaly_cfg.executor == "process"
+    progress = _RunProgress(progress_callback, n_datasets) if progress_callback else None
+
+    def jobs():
+        # 2. Stream datasets: load, analyse, report and release one at a time.
+        # Peak memory is bounded by the largest tables in flight (max_workers), not the whole source.
+        datasets = source.iter_datasets(since=incremental.watermarks()) if incremental else source.iter_datasets()
+        for index, dataset in enumerate(datasets):
+            ds_save_dir = save_dir / dataset.name.replace("/", "__") if save_dir else None
+
+            # Dynamic Mapping Logic:
+            # The reference fields for this dataset should be:
+            #   User provided fields (explicit targets)
+            #   + All columns from OTHER tables (implicit targets)
+            #   - Columns in THIS table (avoid self-mapping if names are identical, though mapper handles exact match)
+
+            # We keep user provided fields as high priority.
+            # The mapper treats all reference fields equally, but we can rely on the fact that
+            # if a column matches a user field, it's a good map.
+            # If it matches another table's column, it's also a good map (cross-table link).
+
+            current_cols = set(dataset.columns)
+            # Potential targets from other tables
+            other_table_cols = global_columns - current_cols
+
+            # Combine user refs and other table cols
+            # Use a set to avoid duplicates
+            dynamic_refs = set(mapping_cfg.reference_fields) | other_table_cols
+
+            # Create a specific config for this dataset
+            dynamic_mapping_cfg = MappingConfig(
+                reference_fields=list(dynamic_refs),
+                synonyms=mapping_cfg.synonyms,
+                threshold=mapping_cfg.threshold,
+                epsilon=mapping_cfg.epsilon
+            )
+
+            # Callbacks cannot cross process boundaries; those runs report completion from here instead
+            callback = progress.for_dataset(index) if progress and not use_processes else None
+            yield dataset, dynamic_mapping_cfg, ds_save_dir, callback
+            # Drop our reference before the generator loads the next dataset
+            del dataset
+
+    # 3. Analyse datasets on the worker pool; results come back in source order
+    reports = ordered_map(
+        partial(_analyse_job, anomaly_cfg=anomaly_cfg, cache=cache, incremental=incremental, models=models),
+        jobs(),
+        max_workers=anomaly_cfg.max_workers,
+        kind="process" if use_processes else "thread",
+    )
+    for index, report in enumerate(reports):
+        if progress:
+            progress.update(index, f"Finished analysis of {report.name}", 100)
         datasets_reports.append(report)
 
     root = getattr(source, "root", None)
@@ -0,0 +1,267 @@
+"""
+Sampling layer shared by the data sources.
+
+All strategies return the sample together with the size of the population it was drawn
+from, so the runner can record the sampling fraction and extrapolate anomaly counts.
+- head: first n rows (cheap, but biased for time-ordered data)
+- random: uniform sample (Parquet row groups, streaming reservoir for CSV/NDJSON, SQL pushdown)
+- row_groups: Parquet only, stratified by row group
+- stratified: proportional per value of a column, every value gets at least one row
+  (as long as there are no more values than rows to sample)
+"""
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
+
+import numpy as np
+import polars as pl
+
+from src.utils.logger import logger
+
+SamplingStrategy = Literal["head", "random", "row_groups", "stratified"]
+ParquetSampling = Literal["head", "random", "row_groups"]
+
+
+def _proportional_allocation(sizes: List[int], n: int, min_per_stratum: int = 0) -> List[int]:
+    """
+    Splits n over strata proportionally to their sizes (largest remainder method);
+    the result never sums to more than n. min_per_stratum rows are reserved per stratum
+    first so small strata are represented; if that alone would exceed n it is ignored.
+    """
+    base = [min(min_per_stratum, s) for s in sizes]
+    if sum(base) > n:
+        base = [0] * len(sizes)
+    rest = [s - b for s, b in zip(sizes, base)]
+    n_rest, total = n - sum(base), sum(rest)
+    if n_rest <= 0 or total == 0:
+        return base
+    exact = [n_rest * r / total for r in rest]
+    alloc = [int(x) for x in exact]
+    by_remainder = sorted(range(len(sizes)), key=lambda i: exact[i] - alloc[i], reverse=True)
+    for i in by_remainder[: n_rest - sum(alloc)]:
+        alloc[i] += 1
+    return [min(a + b, s) for a, b, s in zip(alloc, base, sizes)]
+
+
+def read_parquet_sample(
+    path: str | Path,
+    n: int,
+    strategy: ParquetSampling = "head",
+    seed: int = 42,
+) -> Tuple[pl.DataFrame, int]:
+    """
+    Reads at most `n` rows of a Parquet file using its row-group metadata, so only the
+    row groups that contribute rows are decoded, one at a time.
+
+    - head: first n rows; stops after the row group that reaches n.
+    - random: uniform random n rows over the whole file (without replacement).
+    - row_groups: stratified, every row group contributes proportionally to its size.
+
+    Returns (sample, total row count of the file).
+    """
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    meta = pf.metadata
+    total = meta.num_rows
+    group_rows = [meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+
+    if n >= total:
+        return pl.from_arrow(pf.read()), total
+
+    if strategy == "head":
+        groups, covered = [], 0
+        for i, rows in enumerate(group_rows):
+            groups.append(i)
+            covered += rows
+            if covered >= n:
+                break
+        return pl.from_arrow(pf.read_row_groups(groups)).head(n), total
+
+    rng = np.random.default_rng(seed)
+    if strategy == "random":
+        picks = np.sort(rng.choice(total, size=n, replace=False))
+        offsets = np.cumsum([0] + group_rows)
+        group_of = np.searchsorted(offsets, picks, side="right") - 1
+        per_group = {int(g): picks[group_of == g] - offsets[g] for g in np.unique(group_of)}
+    elif strategy == "row_groups":
+        per_group = {
+            g: np.sort(rng.choice(group_rows[g], size=k, replace=False))
+            for g, k in enumerate(_proportional_allocation(group_rows, n))
+            if k > 0
+        }
+    else:
+        raise ValueError(f"Unknown parquet sampling strategy: {strategy}. Allowed are 'head', 'random', 'row_groups'.")
+
+    frames = [pl.from_arrow(pf.read_row_group(g).take(idx)) for g, idx in per_group.items()]
+    if not frames:
+        return pl.from_arrow(pf.schema_arrow.empty_table()), total
+    return pl.concat(frames), total
+
+
+def parquet_footer_stats(path: str | Path) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+    """
+    Collects exact whole-file column statistics from the Parquet footer.
+
+    A column is only reported when every row group carries a null count; min/max are
+    only reported for numeric columns whose row groups all carry min/max (or are all-null).
+    Nested columns are skipped.
+
+    Returns (total row count, {column: {"null_count": int, "min": ..., "max": ...}}).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    meta = pq.ParquetFile(path).metadata
+    arrow_schema = meta.schema.to_arrow_schema()
+    stats: Dict[str, Dict[str, Any]] = {}
+    for j in range(meta.num_columns):
+        col_path = meta.schema.column(j).path
+        if "." in col_path:
+            continue
+        arrow_type = arrow_schema.field(col_path).type
+        numeric = pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+
+        null_count, mins, maxs = 0, [], []
+        has_nulls, has_min_max = True, numeric
+        for i in range(meta.num_row_groups):
+            rg = meta.row_group(i)
+            st = rg.column(j).statistics
+            if st is None or not st.has_null_count:
+                has_nulls = has_min_max = False
+                break
+            null_count += st.null_count
+            if st.has_min_max:
+                mins.append(st.min)
+                maxs.append(st.max)
+            elif st.null_count != rg.num_rows:
+                has_min_max = False
+        if not has_nulls:
+            continue
+        entry: Dict[str, Any] = {"null_count": null_count}
+        if has_min_max and mins:
+            entry["min"] = min(mins)
+            entry["max"] = max(maxs)
+        stats[col_path] = entry
+    return meta.num_rows, stats
+
+
+def reservoir_sample(batches: Iterable[pl.DataFrame], n: int, seed: int = 42) -> Tuple[pl.DataFrame, int]:
+    """
+    Uniform sample of n rows from a stream of batches (Algorithm R, vectorised per batch).
+    Memory is bounded by n rows plus one batch. Returns (sample, rows seen).
+    """
+    rng = np.random.default_rng(seed)
+    reservoir: Optional[pl.DataFrame] = None
+    seen = 0
+    for batch in batches:
+        b = batch.height
+        fill = max(0, min(n - seen, b))
+        if fill:
+            head = batch.slice(0, fill)
+            reservoir = head if reservoir is None else pl.concat([reservoir, head])
+        if b > fill:
+            idx = np.arange(fill, b)
+            # Row seen+i replaces a uniform slot in [0, seen+i] if that slot is inside the reservoir
+            slots = rng.integers(0, seen + idx + 1)
+            hit = slots < n
+            slots, rows = slots[hit], idx[hit]
+            if len(slots):
+                # When a slot is drawn twice within a batch the later row wins
+                rev_slots, rev_rows = slots[::-1], rows[::-1]
+                uniq, first = np.unique(rev_slots, return_index=True)
+                order = np.arange(n)
+                order[uniq] = n + rev_rows[first]
+                reservoir = pl.concat([reservoir, batch])[order]
+        seen += b
+    if reservoir is None:
+        return pl.DataFrame(), seen
+    return reservoir, seen
+
+
+def stratified_sample(lf: pl.LazyFrame, n: int, column: str, seed: int = 42) -> Tuple[pl.DataFrame, int]:
+    """
+    Proportional stratified sample of at most n rows on `column`; every distinct value
+    gets at least one row, so rare categories survive sampling. A column with more
+    distinct values than n (e.g. an id) cannot be stratified, so n rows are drawn
+    uniformly instead. Only `column` is scanned to plan the sample.
+    Returns (sample, total rows).
+    """
+    if column not in lf.collect_schema().names():
+        raise KeyError(f"Column '{column}' does not exist in the dataset.")
+    strata = lf.select(pl.col(column)).with_row_index("_row").collect()
+    total = strata.height
+    if n >= total:
+        return lf.collect(), total
+
+    groups = strata.group_by(column, maintain_order=True).agg(pl.col("_row"))
+    rng = np.random.default_rng(seed)
+    if groups.height > n:
+        logger.warning(
+            f"'{column}' has {groups.height} distinct values, more than the {n} rows to sample; sampling uniformly"
+        )
+        picks = np.sort(rng.choice(total, size=n, replace=False))
+    else:
+        members = groups["_row"].to_list()
+        alloc = _proportional_allocation([len(m) for m in members], n, min_per_stratum=1)
+        picks = np.sort(np.concatenate([
+            rng.choice(np.asarray(m), size=k, replace=False) for m, k in zip(members, alloc) if k > 0
+        ]))
+    sample = lf.with_row_index("_row").filter(pl.col("_row").is_in(picks)).drop("_row").collect()
+    return sample, total
+
+
+def sql_sample_query(
+    table: str,
+    n: int,
+    total: int,
+    strategy: SamplingStrategy = "random",
+    column: Optional[str] = None,
+) -> str:
+    """
+    Builds a query that samples about n of `total` rows inside Dremio.
+    - random: hash-modulo on `column` when given (deterministic), else RANDOM() < fraction
+    - stratified: ROW_NUMBER() per value of `column`, keeping ceil(fraction * stratum size),
+      at most n rows (the first row of each stratum is preferred when cutting)
+    The helper columns _rn/_cnt of the stratified query are dropped by the caller.
+    """
+    fraction = min(1.0, n / total) if total else 1.0
+    if strategy == "random":
+        if column:
+            modulo = max(1, math.floor(total / n))
+            return f'SELECT * FROM {table} WHERE MOD(ABS(HASH("{column}")), {modulo}) = 0 LIMIT {n}'
+        return f"SELECT * FROM {table} WHERE RANDOM() < {fraction:.10f} LIMIT {n}"
+    if strategy == "stratified":
+        if not column:
+            raise ValueError("Stratified sampling requires a column.")
+        return (
+            f'SELECT * FROM (SELECT t.*, '
+            f'ROW_NUMBER() OVER (PARTITION BY "{column}" ORDER BY RANDOM()) AS _rn, '
+            f'COUNT(*) OVER (PARTITION BY "{column}") AS _cnt FROM {table} t) '
+            f'WHERE _rn <= CEIL(_cnt * {fraction:.10f}) ORDER BY _rn, RANDOM() LIMIT {n}'
+        )
+    if strategy == "head":
+        return f"SELECT * FROM {table} LIMIT {n}"
+    raise ValueError(f"Unknown SQL sampling strategy: {strategy}. Allowed are 'head', 'random', 'stratified'.")
+
+
+def extrapolate_count(flagged: int, sample_rows: int, total_rows: int, z: float = 1.96) -> Dict[str, float]:
+    """
+    Scales a count observed in a sample to the population with a Wilson score interval
+    (finite population corrected). Returns {"estimate", "ci_low", "ci_high"} in rows.
+    """
+    if sample_rows <= 0 or total_rows <= 0:
+        return {"estimate": 0.0, "ci_low": 0.0, "ci_high": 0.0}
+    p = flagged / sample_rows
+    fpc = math.sqrt((total_rows - sample_rows) / (total_rows - 1)) if total_rows > 1 else 0.0
+    z = z * fpc
+    denom = 1 + z * z / sample_rows
+    centre = (p + z * z / (2 * sample_rows)) / denom
+    half = z * math.sqrt(p * (1 - p) / sample_rows + z * z / (4 * sample_rows * sample_rows)) / denom
+    return {
+        "estimate": p * total_rows,
+        "ci_low": max(0.0, centre - half) * total_rows,
+        "ci_high": min(1.0, centre + half) * total_rows,
+    }
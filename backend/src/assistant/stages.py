@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+@dataclass
+class Stage:
+    """
+    One node of the per-dataset analysis graph.
+    `func` receives a dict with the results of the stages listed in `deps`.
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Sequence[str] = field(default_factory=tuple)
+
+
+def _validate(stages: Sequence[Stage]) -> None:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {names}")
+    known = set(names)
+    for s in stages:
+        unknown = [d for d in s.deps if d not in known]
+        if unknown:
+            raise ValueError(f"Stage '{s.name}' depends on unknown stages: {unknown}")
+    # Kahn's algorithm: every stage must become runnable eventually
+    done: set = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [s for s in remaining if all(d in done for d in s.deps)]
+        if not ready:
+            raise ValueError(f"Stage graph has a cycle among: {[s.name for s in remaining]}")
+        done.update(s.name for s in ready)
+        remaining = [s for s in remaining if s.name not in done]
+
+
+def _timed(stage: Stage, inputs: Dict[str, Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = stage.func(inputs)
+    return result, time.perf_counter() - start
+
+
+def run_stages(stages: Sequence[Stage], max_workers: int = 4) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Executes a stage graph, starting every stage as soon as its dependencies finished.
+    Independent stages overlap on a thread pool (e.g. a network-bound LLM call next to
+    CPU-bound detectors, which release the GIL inside Polars/NumPy/sklearn).
+
+    Returns (results by stage name, wall time in seconds by stage name).
+    With max_workers <= 1 stages run serially in declaration order.
+    The first stage exception is re-raised after running stages have finished.
+    """
+    _validate(stages)
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+
+    if max_workers <= 1:
+        for s in stages:
+            results[s.name], timings[s.name] = _timed(s, {d: results[d] for d in s.deps})
+        return results, timings
+
+    pending: List[Stage] = list(stages)
+    running: Dict[Future, Stage] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for s in [s for s in pending if all(d in results for d in s.deps)]:
+                pending.remove(s)
+                running[pool.submit(_timed, s, {d: results[d] for d in s.deps})] = s
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                s = running.pop(fut)
+                results[s.name], timings[s.name] = fut.result()
+    return results, timings
@@ -1,22 +1,12 @@
 import os
 from src.connection.connection import get_connection
+from src.connection.pool import get_pool
 from src.utils.logger import logger
 import polars as pl
-import adbc_driver_flightsql.dbapi as flight_sql
 
 def _get_dbapi_connection():
-    """Create a DBAPI connection using credentials from get_connection()."""
-    conn_dict = get_connection()
-    uri = conn_dict.get('uri')
-    username = conn_dict.get('username')
-    password = conn_dict.get('password')
-    
-    # Connect using DBAPI
-    # This handles grpc:// (plaintext) and grpc+tls:// (TLS) correctly
-    return flight_sql.connect(uri, db_kwargs={
-        "username": username,
-        "password": password,
-    })
+    """Check out a pooled DBAPI connection (use as a context manager)."""
+    return get_pool(get_connection()).connection()
 
 
 def list_tables(space_path="lakehouse.datalake.raw"):
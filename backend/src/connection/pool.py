@@ -0,0 +1,239 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from src.utils.logger import logger
+
+
+def _connect_flight_sql(connection_info: dict) -> Any:
+    """Opens one ADBC Flight SQL connection (TLS handshake + auth)."""
+    import adbc_driver_flightsql.dbapi as flight_sql
+
+    # This handles grpc:// (plaintext) and grpc+tls:// (TLS) correctly
+    return flight_sql.connect(connection_info['uri'], db_kwargs={
+        "username": connection_info.get('username'),
+        "password": connection_info.get('password'),
+    })
+
+
+def _ping(conn: Any) -> None:
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DBAPI connections.
+    - max_size: upper bound of open connections; further checkouts wait for a free one
+      (up to `acquire_timeout` seconds, then TimeoutError)
+    - idle_timeout: idle connections older than this are closed on the next checkout
+    - health checks: a connection idle for more than `health_check_interval` seconds, or
+      one whose last user raised, is pinged before reuse and replaced if the ping fails
+    A connection is only ever used by one thread at a time.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        health_check_interval: float = 30.0,
+        acquire_timeout: float = 30.0,
+        ping: Callable[[Any], None] = _ping,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self._ping = ping
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        # (connection, last returned at); most recently used at the right end
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._open = 0
+        self._closed = False
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "creations": 0,
+            "closed": 0,
+            "health_check_failures": 0,
+        }
+
+    def _close(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Closing pooled connection failed: {e}")
+
+    def _take(self) -> Tuple[Optional[Any], float]:
+        """Reserves a slot; returns an idle connection (or None = open a new one) and its idle time."""
+        expired = []
+        start = time.monotonic()
+        waited = False
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    now = time.monotonic()
+                    while self._idle and now - self._idle[0][1] > self.idle_timeout:
+                        expired.append(self._idle.popleft()[0])
+                        self._open -= 1
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        break
+                    if self._open < self.max_size:
+                        self._open += 1
+                        conn, returned_at = None, now
+                        break
+                    if not waited:
+                        waited = True
+                        self._metrics["waits"] += 1
+                    remaining = self.acquire_timeout - (now - start)
+                    if remaining <= 0:
+                        raise TimeoutError(f"No pooled connection available after {self.acquire_timeout}s")
+                    self._cond.wait(remaining)
+                self._metrics["checkouts"] += 1
+                self._metrics["closed"] += len(expired)
+                if waited:
+                    self._metrics["wait_seconds"] += time.monotonic() - start
+        finally:
+            for old in expired:
+                self._close(old)
+        return conn, time.monotonic() - returned_at
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._open -= 1
+            self._metrics["closed"] += 1
+            self._cond.notify()
+
+    def _healthy(self, conn: Any) -> bool:
+        try:
+            self._ping(conn)
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check, replacing it: {e}")
+            with self._cond:
+                self._metrics["health_check_failures"] += 1
+            return False
+
+    def _acquire(self) -> Any:
+        conn, idle_for = self._take()
+        if conn is not None and idle_for > self.health_check_interval and not self._healthy(conn):
+            self._close(conn)
+            conn = None
+        if conn is None:
+            # Connect outside the lock, the handshake can take a while
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._metrics["creations"] += 1
+        return conn
+
+    def _return(self, conn: Any, failed: bool) -> None:
+        if failed and not self._healthy(conn):
+            self._close(conn)
+            self._release_slot()
+            return
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                self._metrics["closed"] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+                return
+        self._close(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Checks out a connection for the duration of the `with` block."""
+        conn = self._acquire()
+        failed = False
+        try:
+            yield conn
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._return(conn, failed)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._metrics,
+                "wait_seconds": round(self._metrics["wait_seconds"], 4),
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def close(self) -> None:
+        """Closes idle connections; checked-out ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._metrics["closed"] += len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close(conn)
+
+
+_pools: Dict[Tuple[str, Optional[str]], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(connection_info: dict) -> ConnectionPool:
+    """
+    Returns the process-wide pool for a Dremio endpoint and user, creating it on first use.
+    Sized by DREMIO_POOL_MAX_SIZE (default 4) and DREMIO_POOL_IDLE_TIMEOUT seconds (default 300).
+    """
+    key = (connection_info['uri'], connection_info.get('username'))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            info = dict(connection_info)
+            pool = ConnectionPool(
+                lambda: _connect_flight_sql(info),
+                max_size=int(os.getenv('DREMIO_POOL_MAX_SIZE', '4')),
+                idle_timeout=float(os.getenv('DREMIO_POOL_IDLE_TIMEOUT', '300')),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of all pools, keyed by endpoint URI (and user)."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {f"{user}@{uri}" if user else uri: pool.metrics() for (uri, user), pool in pools.items()}
+
+
+@atexit.register
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
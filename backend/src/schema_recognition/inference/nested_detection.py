@@ -1,7 +1,181 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import polars as pl
+
+NESTED_DTYPES = (pl.List, pl.Array, pl.Struct)
+LIST_DTYPES = (pl.List, pl.Array)
+# Path segment for the elements of a List/Array, e.g. "orders[].price"
+ELEMENTS = "[]"
+
+Frame = Union[pl.DataFrame, pl.LazyFrame]
+
+
 def detect_nested_structures(df: 'pl.DataFrame'):
-    """Gibt die Spalten zurück, die verschachtelte Daten enthalten (Liste, Dikt etc)."""
-    nested_cols = []
-    for name, dtype in df.schema.items():
-        if dtype in ['list', 'struct']:  # polars Datentypen für nested
-            nested_cols.append(name)
-    return nested_cols
+    """Gibt die Spalten zurück, die verschachtelte Daten enthalten (List, Array, Struct)."""
+    return [name for name, dtype in df.schema.items() if isinstance(dtype, NESTED_DTYPES)]
+
+
+@dataclass
+class NestedField:
+    """
+    A nested column or a field below one.
+
+    - path: "address.zip" for a Struct field, "orders[]" for the elements of a list,
+      "orders[].price" for a field of those elements
+    - segments: the column name followed by field names and ELEMENTS
+    - depth: nesting levels below the top-level column (0 for the column itself)
+    - in_list: reached through a list, so it holds one value per element, not per row
+    """
+    path: str
+    segments: Tuple[str, ...]
+    dtype: pl.DataType
+    depth: int
+    in_list: bool
+
+    @property
+    def is_leaf(self) -> bool:
+        return not isinstance(self.dtype, NESTED_DTYPES)
+
+
+def _walk(path: str, segments: Tuple[str, ...], dtype: pl.DataType, in_list: bool, out: List[NestedField]) -> None:
+    if isinstance(dtype, pl.Struct):
+        for f in dtype.fields:
+            child = NestedField(f"{path}.{f.name}", segments + (f.name,), f.dtype, len(segments), in_list)
+            out.append(child)
+            _walk(child.path, child.segments, f.dtype, in_list, out)
+    elif isinstance(dtype, LIST_DTYPES):
+        child = NestedField(path + ELEMENTS, segments + (ELEMENTS,), dtype.inner, len(segments), True)
+        out.append(child)
+        _walk(child.path, child.segments, dtype.inner, True, out)
+
+
+def nested_fields(schema: Dict[str, pl.DataType]) -> List[NestedField]:
+    """
+    The nested columns of `schema` (depth 0) and everything below them, depth first
+    (Struct fields and list elements).
+    """
+    out: List[NestedField] = []
+    for name, dtype in schema.items():
+        if isinstance(dtype, NESTED_DTYPES):
+            out.append(NestedField(name, (name,), dtype, 0, False))
+            _walk(name, (name,), dtype, False, out)
+    return out
+
+
+def _schema(frame: Frame) -> Dict[str, pl.DataType]:
+    return dict(frame.collect_schema() if isinstance(frame, pl.LazyFrame) else frame.schema)
+
+
+def _resolve(schema: Dict[str, pl.DataType], paths: Optional[Sequence[str]]) -> List[NestedField]:
+    fields = nested_fields(schema)
+    if paths is None:
+        return fields
+    by_path = {f.path: f for f in fields}
+    missing = [p for p in paths if p not in by_path]
+    if missing:
+        raise KeyError(f"Unknown nested field(s): {', '.join(missing)}")
+    return [by_path[p] for p in paths]
+
+
+def _list_len(expr: pl.Expr, dtype: pl.DataType) -> pl.Expr:
+    return expr.arr.len() if isinstance(dtype, pl.Array) else expr.list.len()
+
+
+def field_expr(schema: Dict[str, pl.DataType], field: NestedField) -> pl.Expr:
+    """
+    Expression for the values of `field`: Struct fields are selected (row-aligned),
+    lists are exploded (one value per element; null and empty lists contribute nothing).
+    """
+    expr = pl.col(field.segments[0])
+    dtype = schema[field.segments[0]]
+    for segment in field.segments[1:]:
+        if segment == ELEMENTS:
+            expr = expr.filter(_list_len(expr, dtype) > 0).explode()
+            dtype = dtype.inner
+        else:
+            expr = expr.struct.field(segment)
+            dtype = next(f.dtype for f in dtype.fields if f.name == segment)
+    return expr
+
+
+def profile_nested(frame: Frame, paths: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Profile of the nested fields of `frame` (all of them, or `paths`), by path:
+    dtype, depth, in_list, values (rows, or elements for fields inside lists) and nulls;
+    for lists also the element counts (min/max/mean over the non-null lists).
+    All statistics come from one select on the nested columns; nothing is flattened.
+    """
+    schema = _schema(frame)
+    fields = _resolve(schema, paths)
+    if not fields:
+        return {}
+    exprs = []
+    for i, f in enumerate(fields):
+        values = field_expr(schema, f)
+        exprs += [values.len().alias(f"{i}:values"), values.null_count().alias(f"{i}:nulls")]
+        if isinstance(f.dtype, LIST_DTYPES):
+            lengths = _list_len(values, f.dtype)
+            exprs += [lengths.min().alias(f"{i}:len_min"), lengths.max().alias(f"{i}:len_max"),
+                      lengths.mean().alias(f"{i}:len_mean")]
+    columns = sorted({f.segments[0] for f in fields})
+    out = frame.select(columns).select(exprs)
+    row = (out.collect() if isinstance(out, pl.LazyFrame) else out).row(0, named=True)
+
+    profile = {}
+    for i, f in enumerate(fields):
+        entry: Dict[str, Any] = {
+            "dtype": str(f.dtype),
+            "depth": f.depth,
+            "in_list": f.in_list,
+            "values": row[f"{i}:values"],
+            "nulls": row[f"{i}:nulls"],
+        }
+        if isinstance(f.dtype, LIST_DTYPES):
+            entry["list_length"] = {
+                "min": row[f"{i}:len_min"],
+                "max": row[f"{i}:len_max"],
+                "mean": round(row[f"{i}:len_mean"], 4) if row[f"{i}:len_mean"] is not None else None,
+            }
+        profile[f.path] = entry
+    return profile
+
+
+def unnest_fields(frame: Frame, paths: Optional[Sequence[str]] = None, numeric_only: bool = False) -> Frame:
+    """
+    Adds Struct fields as virtual columns named by their path ("address.zip"), so the
+    flat detectors see them. Only fields outside lists are row-aligned; by default all
+    non-nested ones are added (use explode_field for list elements). Struct fields share
+    the buffers of their column and a LazyFrame stays lazy, so no flattened copy is made.
+    """
+    schema = _schema(frame)
+    fields = [f for f in _resolve(schema, paths) if not f.in_list]
+    if paths is None:
+        fields = [f for f in fields if f.is_leaf]
+    if numeric_only:
+        fields = [f for f in fields if f.dtype.is_numeric()]
+    fields = [f for f in fields if f.path not in schema]  # never shadow a real column
+    if not fields:
+        return frame
+    return frame.with_columns([field_expr(schema, f).alias(f.path) for f in fields])
+
+
+def explode_field(frame: Frame, path: str, row_index: str = "row_idx") -> Frame:
+    """
+    One row per value of `path` (through any number of lists) with the position of
+    the row it belongs to in `row_index`. Only the path's column is carried through
+    the explodes; a LazyFrame stays lazy.
+    """
+    schema = _schema(frame)
+    field = _resolve(schema, [path])[0]
+    root = field.segments[0]
+    dtype = schema[root]
+    out = frame.with_row_index(row_index).select(pl.col(row_index), pl.col(root).alias(path))
+    for segment in field.segments[1:]:
+        if segment == ELEMENTS:
+            out = out.filter(_list_len(pl.col(path), dtype) > 0).explode(path)
+            dtype = dtype.inner
+        else:
+            out = out.with_columns(pl.col(path).struct.field(segment).alias(path))
+            dtype = next(f.dtype for f in dtype.fields if f.name == segment)
+    return out
@@ -0,0 +1,144 @@
+import polars as pl
+from typing import Any, Dict, Iterable, List, Optional
+
+NUMERIC_DTYPES = (pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64, pl.Float32, pl.Float64)
+CATEGORICAL_DTYPES = (pl.Utf8, pl.Int8, pl.Int16, pl.Int32, pl.Int64)
+
+SECTIONS = frozenset({"missing", "numeric", "text", "categorical"})
+
+
+def _column_exprs(i: int, name: str, dtype: pl.DataType, sections: Iterable[str], text_sample_limit: int, top_k: int) -> List[pl.Expr]:
+    # Aliases use the column position so arbitrary column names cannot collide
+    col = pl.col(name)
+    exprs: List[pl.Expr] = []
+    if "missing" in sections:
+        exprs.append(col.null_count().alias(f"{i}:null_count"))
+        if dtype == pl.Utf8:
+            exprs.append((col == "").sum().alias(f"{i}:empty_count"))
+    if "numeric" in sections and dtype in NUMERIC_DTYPES:
+        exprs += [
+            col.count().alias(f"{i}:count"),
+            col.mean().alias(f"{i}:mean"),
+            col.min().alias(f"{i}:min"),
+            col.max().alias(f"{i}:max"),
+            col.std().alias(f"{i}:std"),
+            (col == 0).sum().alias(f"{i}:zeros"),
+        ]
+    if "text" in sections and dtype == pl.Utf8:
+        sample = col.head(text_sample_limit)  # Limit for performance
+        exprs += [
+            sample.n_unique().alias(f"{i}:sample_unique"),
+            sample.value_counts(sort=True).head(top_k).implode().alias(f"{i}:top_values"),
+        ]
+    if "categorical" in sections and dtype in CATEGORICAL_DTYPES:
+        exprs.append(col.n_unique().alias(f"{i}:n_unique"))
+    return exprs
+
+
+def build_profile_exprs(
+    schema: pl.Schema,
+    sections: Optional[Iterable[str]] = None,
+    text_sample_limit: int = 10000,
+    top_k: int = 3,
+) -> List[pl.Expr]:
+    """
+    Builds the aggregation expressions for all columns of `schema`.
+    They evaluate to a single row and work on both DataFrames and LazyFrames.
+    """
+    sections = SECTIONS if sections is None else frozenset(sections)
+    unknown = sections - SECTIONS
+    if unknown:
+        raise ValueError(f"Unknown profile sections: {sorted(unknown)}")
+
+    exprs: List[pl.Expr] = [pl.len().alias("row_count")]
+    for i, (name, dtype) in enumerate(schema.items()):
+        exprs += _column_exprs(i, name, dtype, sections, text_sample_limit, top_k)
+    return exprs
+
+
+def profile_from_row(schema: pl.Schema, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Unpacks the single result row of `build_profile_exprs` into per-column stats."""
+    names = list(schema.names())
+    columns: Dict[str, Dict[str, Any]] = {name: {"dtype": str(dtype)} for name, dtype in schema.items()}
+    for key, value in row.items():
+        if key == "row_count":
+            continue
+        i, stat = key.split(":", 1)
+        columns[names[int(i)]][stat] = value
+    return {"row_count": row["row_count"], "columns": columns}
+
+
+def profile_dataframe(
+    df: pl.DataFrame | pl.LazyFrame,
+    sections: Optional[Iterable[str]] = None,
+    text_sample_limit: int = 10000,
+    top_k: int = 3,
+) -> Dict[str, Any]:
+    """
+    Profiles all columns in a single `df.select(...)`, so Polars evaluates the
+    aggregations of every column in one parallel pass instead of one scan per
+    column and statistic.
+
+    sections: subset of {"missing", "numeric", "text", "categorical"} (default: all).
+
+    Returns {"row_count": int, "columns": {col: {stat: value}}}; a column only
+    carries the stats that apply to its dtype.
+    """
+    schema = df.collect_schema()
+    exprs = build_profile_exprs(schema, sections, text_sample_limit, top_k)
+    out = df.select(exprs)
+    if isinstance(out, pl.LazyFrame):
+        out = out.collect()
+    return profile_from_row(schema, out.row(0, named=True))
+
+
+def _top_values(name: str, counts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"value": str(c[name]), "count": c["count"]} for c in counts or []]
+
+
+def missing_ratios_from_profile(profile: Dict[str, Any]) -> Dict[str, float]:
+    total = profile["row_count"]
+    ratios = {}
+    for col, stats in profile["columns"].items():
+        missing = stats["null_count"] + (stats.get("empty_count") or 0)
+        ratios[col] = missing / total if total > 0 else 0.0
+    return ratios
+
+
+def numeric_stats_from_profile(profile: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    out = {}
+    for col, stats in profile["columns"].items():
+        if not stats.get("count"):  # non-numeric or all-null
+            continue
+        out[col] = {
+            "mean": stats["mean"],
+            "min": stats["min"],
+            "max": stats["max"],
+            "std": stats["std"] if stats["count"] > 1 else 0.0,
+            "zeros": stats["zeros"],
+        }
+    return out
+
+
+def text_stats_from_profile(profile: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    out = {}
+    for col, stats in profile["columns"].items():
+        if "sample_unique" not in stats:
+            continue
+        out[col] = {
+            "unique_count": stats["sample_unique"],
+            "top_values": _top_values(col, stats["top_values"]),
+        }
+    return out
+
+
+def categorical_from_profile(profile: Dict[str, Any], threshold: float = 0.05) -> List[str]:
+    total = profile["row_count"]
+    out = []
+    for col, stats in profile["columns"].items():
+        n_unique = stats.get("n_unique")
+        if n_unique is None:
+            continue
+        if total > 0 and (n_unique / total) < threshold and n_unique < 100:  # Cap at 100 unique values
+            out.append(col)
+    return out
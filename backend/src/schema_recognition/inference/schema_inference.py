@@ -1,14 +1,115 @@
+import io
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple
+
 import polars as pl
 from src.utils.cleaning import clean_column_name
 
+# Rows Polars reads to infer CSV dtypes (the same bound the loaders use)
+CSV_INFER_ROWS = 10_000
+# Lines of an NDJSON file the schema is sniffed from
+NDJSON_SNIFF_LINES = 1000
+# File schemas kept in memory (least recently used are dropped first)
+SCHEMA_CACHE_SIZE = 4096
+
+_schema_cache: "OrderedDict[Tuple, Dict[str, pl.DataType]]" = OrderedDict()
+_schema_cache_lock = threading.Lock()
+
+
+def _csv_schema(path: Path, infer_rows: int | None) -> Dict[str, pl.DataType]:
+    # Same options and header fallback as LocalFilesDataSource._scan_csv
+    try:
+        return dict(pl.scan_csv(
+            path, has_header=True, null_values=[''], try_parse_dates=True, infer_schema_length=infer_rows
+        ).collect_schema())
+    except pl.ComputeError:
+        schema = pl.scan_csv(
+            path, has_header=False, null_values=[''], try_parse_dates=True, infer_schema_length=infer_rows
+        ).collect_schema()
+        return {f"column_{i}": dtype for i, dtype in enumerate(schema.values())}
+
+
+def _ndjson_schema(path: Path, lines: int) -> Dict[str, pl.DataType]:
+    with open(path, "rb") as f:
+        head = b"".join(itertools.islice(f, lines))
+    return dict(pl.read_ndjson(io.BytesIO(head)).schema)
+
+
+def _json_schema(path: Path, lines: int) -> Dict[str, pl.DataType]:
+    with open(path, "rb") as f:
+        start = f.read(1024).lstrip()
+    if start.startswith(b"["):
+        # A JSON array has no lines to sniff, it has to be parsed whole
+        return dict(pl.read_json(path).schema)
+    return _ndjson_schema(path, lines)
+
+
+def file_fingerprint(file_path: str | os.PathLike) -> Tuple[str, int, int]:
+    """Path, mtime and size: identify the file content without reading it."""
+    path = Path(file_path)
+    st = path.stat()
+    return str(path.resolve()), st.st_mtime_ns, st.st_size
+
+
+def read_file_schema(
+    file_path: str | os.PathLike,
+    csv_infer_rows: int | None = CSV_INFER_ROWS,
+    ndjson_lines: int = NDJSON_SNIFF_LINES,
+) -> Dict[str, pl.DataType]:
+    """
+    Column names and dtypes of a CSV/Parquet/JSON file from metadata, without loading its rows.
+
+    - Parquet: the footer
+    - CSV: the header plus dtypes inferred from the first `csv_infer_rows` rows (None = all)
+    - NDJSON (.jsonl/.ndjson, .json without a top-level array): the first `ndjson_lines` lines
+    - JSON arrays are read whole (no other way to get at their schema)
+    Results are cached by file fingerprint, so a file that did not change is not opened again.
+    """
+    path = Path(file_path)
+    key = (*file_fingerprint(path), csv_infer_rows, ndjson_lines)
+    with _schema_cache_lock:
+        cached = _schema_cache.get(key)
+        if cached is not None:
+            _schema_cache.move_to_end(key)
+            return dict(cached)
+
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        schema = dict(pl.read_parquet_schema(path))
+    elif suffix == ".csv":
+        schema = _csv_schema(path, csv_infer_rows)
+    elif suffix in (".jsonl", ".ndjson"):
+        schema = _ndjson_schema(path, ndjson_lines)
+    elif suffix == ".json":
+        schema = _json_schema(path, ndjson_lines)
+    else:
+        raise ValueError(f"Unsupported file type: {path.suffix}")
+
+    with _schema_cache_lock:
+        _schema_cache[key] = schema
+        while len(_schema_cache) > SCHEMA_CACHE_SIZE:
+            _schema_cache.popitem(last=False)
+    return dict(schema)
+
+
+def clear_schema_cache() -> None:
+    with _schema_cache_lock:
+        _schema_cache.clear()
+
+
 def infer_schema_from_csv(file_path: str, sample_rows: int | None = 1000):
-    """Erkennt das Schema einer CSV-Datei (Spaltennamen, Datentypen)."""
-    df = pl.read_csv(file_path, n_rows=sample_rows)
-    schema = {clean_column_name(name): str(dtype) for name, dtype in df.schema.items()}
-    return schema
+    """Erkennt das Schema einer CSV-Datei (Typen aus den ersten `sample_rows` Zeilen, None = alle)."""
+    return infer_schema_from_file(file_path, csv_infer_rows=sample_rows)
 
 def infer_schema_from_parquet(file_path: str):
-    """Erkennt das Schema einer Parquet-Datei."""
-    df = pl.read_parquet(file_path)
-    schema = {clean_column_name(name): str(dtype) for name, dtype in df.schema.items()}
-    return schema
+    """Erkennt das Schema einer Parquet-Datei (nur aus dem Footer, ohne Daten zu lesen)."""
+    return infer_schema_from_file(file_path)
+
+def infer_schema_from_file(file_path: str, csv_infer_rows: int | None = CSV_INFER_ROWS):
+    """Erkennt das Schema einer CSV-/Parquet-/JSON-Datei aus Metadaten (siehe read_file_schema)."""
+    schema = read_file_schema(file_path, csv_infer_rows=csv_infer_rows)
+    return {clean_column_name(name): str(dtype) for name, dtype in schema.items()}
@@ -1,5 +1,7 @@
 import re
-from typing import Dict, List, Any, Optional
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 import polars as pl
 from src.semantic_field_mapping.patterns import (
     EMAIL_RE, URL_RE, UUID_RE, DATE_RE, DATETIME_RE, PRICE_RE, PHONE_RE
@@ -9,6 +11,44 @@ from src.semantic_field_mapping.patterns import (
 IP_RE = re.compile(r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$")
 CREDIT_CARD_RE = re.compile(r"^(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3(?:0[0-5]|[68][0-9])[0-9]{11}|6(?:011|5[0-9]{2})[0-9]{12}|(?:2131|1800|35\d{3})\d{11})$")
 
+@dataclass
+class ColumnProfile:
+    """Semantic profile of one string column: pattern match shares of its sample and the detected type."""
+    ratios: Dict[str, float]
+    semantic_type: Optional[str]
+
+
+ProfileKey = Tuple[str, str, Optional[int], int, int]
+
+
+class ColumnProfileCache:
+    """
+    Per-run cache of column profiles, keyed by dataset, column, sample size and a hash
+    of the sampled values, so an unchanged column is never pattern-matched twice.
+    The stages of a run (semantic detection, mapping, LLM enrichment) share one instance;
+    safe to use from several threads.
+    """
+
+    def __init__(self) -> None:
+        self._profiles: Dict[ProfileKey, ColumnProfile] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: ProfileKey) -> Optional[ColumnProfile]:
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return profile
+
+    def put(self, key: ProfileKey, profile: ColumnProfile) -> None:
+        with self._lock:
+            self._profiles[key] = profile
+
+
 class SemanticTypeDetector:
     """
     Detects semantic types of columns based on value patterns.
@@ -26,29 +66,115 @@ class SemanticTypeDetector:
         "Credit Card": CREDIT_CARD_RE,
     }
 
-    def detect(self, df: pl.DataFrame, sample_size: int = 200) -> Dict[str, str]:
+    @staticmethod
+    def _regex(pattern: "re.Pattern[str]") -> str:
+        # Polars (Rust regex) spelling of a Python pattern: flags become inline flags.
+        # All patterns are anchored with ^, so str.contains behaves like re.match.
+        return ("(?i)" if pattern.flags & re.IGNORECASE else "") + pattern.pattern
+
+    def match_ratios(self, df: pl.DataFrame, sample_size: Optional[int] = 200) -> Dict[str, Dict[str, float]]:
+        """
+        Share of the sampled values of every string column that match each pattern.
+
+        All patterns of all columns are evaluated in one select (`str.contains` on the
+        first `sample_size` non-null values, stripped; None = the whole column), so the
+        matching runs in native code and in parallel across columns.
+        Columns without non-null values are left out.
+        """
+        columns = [c for c, dtype in df.schema.items() if dtype == pl.Utf8]
+        if not columns:
+            return {}
+        exprs = []
+        for i, col in enumerate(columns):
+            values = self._sample(col, sample_size).str.strip_chars()
+            exprs.append(values.len().alias(f"{i}:n"))
+            for type_name, pattern in self.PATTERNS.items():
+                # Empty values match nothing but count towards the total
+                exprs.append(values.str.contains(self._regex(pattern)).mean().alias(f"{i}:{type_name}"))
+        row = df.select(exprs).row(0, named=True)
+        return {
+            col: {type_name: row[f"{i}:{type_name}"] for type_name in self.PATTERNS}
+            for i, col in enumerate(columns)
+            if row[f"{i}:n"]
+        }
+
+    @staticmethod
+    def _sample(col: str, sample_size: Optional[int]) -> pl.Expr:
+        values = pl.col(col).drop_nulls()
+        return values.head(sample_size) if sample_size is not None else values
+
+    def _profile_keys(
+        self, df: pl.DataFrame, columns: List[str], sample_size: Optional[int], dataset: str
+    ) -> Dict[str, ProfileKey]:
+        # Content hash of exactly the values the detector samples, all columns in one select.
+        # The shares do not depend on the order of the sample, so an order-free sum suffices.
+        exprs = []
+        for i, col in enumerate(columns):
+            values = self._sample(col, sample_size)
+            exprs += [values.len().alias(f"{i}:n"), values.hash(seed=0).sum().alias(f"{i}:hash")]
+        row = df.select(exprs).row(0, named=True)
+        return {
+            col: (dataset, col, sample_size, row[f"{i}:n"], row[f"{i}:hash"] or 0)
+            for i, col in enumerate(columns)
+        }
+
+    def profiles(
+        self,
+        df: pl.DataFrame,
+        sample_size: Optional[int] = 200,
+        cache: Optional[ColumnProfileCache] = None,
+        dataset: str = "",
+    ) -> Dict[str, ColumnProfile]:
+        """
+        Profiles of all string columns. With a `cache`, columns already profiled for
+        `dataset` with the same sampled values are taken from it and only the others
+        are matched (in one select).
+        """
+        columns = [c for c, dtype in df.schema.items() if dtype == pl.Utf8]
+        if not columns:
+            return {}
+        keys = self._profile_keys(df, columns, sample_size, dataset) if cache is not None else {}
+        profiles = {}
+        for col in columns:
+            profile = cache.get(keys[col]) if cache is not None else None
+            if profile is not None:
+                profiles[col] = profile
+        missing = [c for c in columns if c not in profiles]
+        if missing:
+            ratios = self.match_ratios(df.select(missing), sample_size)
+            for col in missing:
+                col_ratios = ratios.get(col, {})
+                profiles[col] = ColumnProfile(col_ratios, self._best_type(col_ratios))
+                if cache is not None:
+                    cache.put(keys[col], profiles[col])
+        return {c: profiles[c] for c in columns}
+
+    def detect(
+        self,
+        df: pl.DataFrame,
+        sample_size: Optional[int] = 200,
+        cache: Optional[ColumnProfileCache] = None,
+        dataset: str = "",
+    ) -> Dict[str, str]:
         """
         Returns a dictionary mapping column names to their detected semantic type.
         Only returns columns where a type was confidently detected.
+        Only string columns are checked; see match_ratios for the sampling and
+        profiles for the cache.
         """
-        semantic_types = {}
-        
-        for col in df.columns:
-            # Skip non-string columns for regex matching (mostly)
-            # We could cast, but let's stick to string-likes for now
-            if not df[col].dtype == pl.Utf8:
-                continue
-                
-            # Sample non-null values
-            sample = df[col].drop_nulls().head(sample_size).to_list()
-            if not sample:
-                continue
-            
-            best_type = self._match_type(sample)
-            if best_type:
-                semantic_types[col] = best_type
-                
-        return semantic_types
+        return {
+            col: profile.semantic_type
+            for col, profile in self.profiles(df, sample_size, cache, dataset).items()
+            if profile.semantic_type
+        }
+
+    @staticmethod
+    def _best_type(ratios: Dict[str, float]) -> Optional[str]:
+        # Threshold: > 50% match; the first pattern in PATTERNS order wins
+        for type_name, ratio in ratios.items():
+            if ratio > 0.5:
+                return type_name
+        return None
 
     def _match_type(self, values: List[str]) -> Optional[str]:
         """
@@ -56,21 +182,6 @@ class SemanticTypeDetector:
         """
         if not values:
             return None
-            
-        counts = {k: 0 for k in self.PATTERNS.keys()}
-        total = len(values)
-        
-        for val in values:
-            val_str = str(val).strip()
-            if not val_str:
-                continue
-            for type_name, pattern in self.PATTERNS.items():
-                if pattern.match(val_str):
-                    counts[type_name] += 1
-        
-        # Threshold: > 50% match
-        for type_name, count in counts.items():
-            if count / total > 0.5:
-                return type_name
-                
-        return None
+        df = pl.DataFrame({"value": [str(v) for v in values]}, schema={"value": pl.Utf8})
+        ratios = self.match_ratios(df, sample_size=None).get("value")
+        return self._best_type(ratios) if ratios else None
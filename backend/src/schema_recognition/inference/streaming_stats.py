@@ -0,0 +1,233 @@
+import math
+
+import polars as pl
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from src.schema_recognition.inference.profiler import NUMERIC_DTYPES, CATEGORICAL_DTYPES
+from src.utils.sketches import KLLSketch, k_for_error
+
+
+def _kind(dtype: pl.DataType) -> str:
+    if dtype in NUMERIC_DTYPES:
+        return "numeric"
+    if dtype == pl.Utf8:
+        return "text"
+    return "other"
+
+
+class StreamingProfile:
+    """
+    Column statistics that are computed batch by batch and merged, so a table can be
+    profiled in bounded memory while its record batches are still arriving.
+
+    Per column: null count, empty strings, and for numeric columns count/mean/M2
+    (merged with Chan's parallel update), min/max, zeros and a KLL quantile sketch.
+    Value counts are kept exactly for columns with at most `max_distinct` distinct
+    values and dropped for the rest.
+
+    The profile can be persisted with `to_dict`/`from_dict`, which is what incremental
+    runs use to fold newly appended rows into the statistics of earlier runs.
+    """
+
+    def __init__(self, max_distinct: int = 1000, sketch_k: int = 200) -> None:
+        self.max_distinct = max_distinct
+        self.sketch_k = sketch_k
+        self.row_count = 0
+        # Column kind ("numeric", "text", "other") as first seen; later batches are cast to it
+        self.kinds: Dict[str, str] = {}
+        self.columns: Dict[str, Dict[str, Any]] = {}
+        self.value_counts: Dict[str, Optional[Dict[Any, int]]] = {}
+        self.sketches: Dict[str, KLLSketch] = {}
+
+    @classmethod
+    def for_error(cls, quantile_error: float, max_distinct: int = 1000) -> "StreamingProfile":
+        """Profile whose quantile sketches have a rank error of about `quantile_error`."""
+        return cls(max_distinct, k_for_error(quantile_error))
+
+    def _align(self, batch: pl.DataFrame) -> pl.DataFrame:
+        casts = {}
+        for name, dtype in batch.schema.items():
+            kind = self.kinds.get(name)
+            if kind is None:
+                self.kinds[name] = _kind(dtype)
+                self.columns[name] = {"null_count": 0}
+                if dtype in CATEGORICAL_DTYPES:
+                    self.value_counts[name] = {}
+            elif kind != _kind(dtype):
+                # e.g. an all-null CSV column inferred as String in one batch only
+                casts[name] = pl.Float64 if kind == "numeric" else pl.Utf8
+        return batch.cast(casts, strict=False) if casts else batch
+
+    def update(self, batch: pl.DataFrame) -> None:
+        """Folds one batch into the running statistics."""
+        batch = self._align(batch)
+        if batch.height == 0:
+            return
+        self.merge(self._profile_batch(batch))
+
+    def _profile_batch(self, batch: pl.DataFrame) -> "StreamingProfile":
+        # One fused select per batch, analogous to profiler.build_profile_exprs
+        exprs = []
+        for i, (name, dtype) in enumerate(batch.schema.items()):
+            col = pl.col(name)
+            exprs.append(col.null_count().alias(f"{i}:null_count"))
+            if dtype == pl.Utf8:
+                exprs.append((col == "").sum().alias(f"{i}:empty_count"))
+            if dtype in NUMERIC_DTYPES:
+                # NaN is not a value (KLLSketch.update drops it too); it would poison mean/M2
+                col = col.fill_nan(None) if dtype.is_float() else col
+                exprs += [
+                    col.count().alias(f"{i}:count"),
+                    col.mean().alias(f"{i}:mean"),
+                    (col.var(ddof=0) * col.count()).alias(f"{i}:m2"),
+                    col.min().alias(f"{i}:min"),
+                    col.max().alias(f"{i}:max"),
+                    (col == 0).sum().alias(f"{i}:zeros"),
+                ]
+        row = batch.select(exprs).row(0, named=True)
+
+        part = StreamingProfile(self.max_distinct, self.sketch_k)
+        part.row_count = batch.height
+        names = batch.columns
+        for key, value in row.items():
+            i, stat = key.split(":", 1)
+            part.columns.setdefault(names[int(i)], {})[stat] = value
+        for name, dtype in batch.schema.items():
+            if dtype in NUMERIC_DTYPES:
+                part.sketches[name] = KLLSketch(self.sketch_k).update(batch.get_column(name).drop_nulls().to_numpy())
+        for name in self.value_counts:
+            if self.value_counts[name] is None or name not in batch.schema:
+                continue
+            vc = batch.get_column(name).drop_nulls().value_counts()
+            if vc.height > self.max_distinct:
+                part.value_counts[name] = None
+                continue
+            part.value_counts[name] = dict(zip(vc[name].to_list(), vc["count"].to_list()))
+        return part
+
+    def merge(self, other: "StreamingProfile") -> "StreamingProfile":
+        """Merges the statistics of `other` (e.g. another batch or partition) into this one."""
+        for name, kind in other.kinds.items():
+            self.kinds.setdefault(name, kind)
+        for name, theirs in other.columns.items():
+            ours = self.columns.setdefault(name, {"null_count": 0})
+            ours["null_count"] += theirs.get("null_count", 0)
+            if "empty_count" in theirs:
+                ours["empty_count"] = ours.get("empty_count", 0) + theirs["empty_count"]
+            if theirs.get("count"):
+                _merge_moments(ours, theirs)
+        for name, sketch in other.sketches.items():
+            if name in self.sketches:
+                self.sketches[name].merge(sketch)
+            else:
+                self.sketches[name] = sketch
+        for name, counts in other.value_counts.items():
+            ours_vc = self.value_counts.get(name, {})
+            if ours_vc is None or counts is None:
+                self.value_counts[name] = None
+                continue
+            for value, n in counts.items():
+                ours_vc[value] = ours_vc.get(value, 0) + n
+            # Too many distinct values: not categorical, stop tracking
+            self.value_counts[name] = ours_vc if len(ours_vc) <= self.max_distinct else None
+        self.row_count += other.row_count
+        return self
+
+    def column_stats(self, top_k: int = 3) -> Dict[str, Dict[str, Any]]:
+        """
+        Exact statistics per column in the `Dataset.column_stats` format:
+        null_count (+ empty_count), min/max/mean/std/zeros (plus sketched q1/median/q3)
+        for numeric columns and n_unique/top_values for columns whose value counts were kept.
+        """
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, stats in self.columns.items():
+            entry: Dict[str, Any] = {"null_count": stats["null_count"]}
+            if "empty_count" in stats:
+                entry["empty_count"] = stats["empty_count"]
+            n = stats.get("count", 0)
+            if n:
+                entry.update(
+                    min=stats["min"],
+                    max=stats["max"],
+                    mean=stats["mean"],
+                    std=(stats["m2"] / (n - 1)) ** 0.5 if n > 1 else 0.0,
+                    zeros=stats["zeros"],
+                )
+            if name in self.sketches and self.sketches[name].n:
+                entry["q1"], entry["median"], entry["q3"] = self.sketches[name].quantiles([0.25, 0.5, 0.75])
+            counts = self.value_counts.get(name)
+            if counts is not None:
+                # Ties are broken by value so the result does not depend on batch order
+                top = sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0])))[:top_k]
+                entry["n_unique"] = len(counts)
+                entry["top_values"] = [{"value": str(v), "count": c} for v, c in top]
+            out[name] = entry
+        return out
+
+    def detector_reference(self) -> Dict[str, Any]:
+        """
+        Whole-history statistics for the anomaly detectors: population mean/std
+        (z-score), q1/q3 (IQR) per numeric column and the value counts of
+        low-cardinality columns (categorical frequencies).
+        q1/q3 carry the rank error of the profile's sketches, which is fixed by `sketch_k`
+        when the profile is created (see `for_error`); it cannot be tightened afterwards.
+        """
+        columns: Dict[str, Dict[str, float]] = {}
+        for name, stats in self.columns.items():
+            n = stats.get("count", 0)
+            if not n:
+                continue
+            ref = {"mean": stats["mean"], "std": math.sqrt(stats["m2"] / n)}
+            sketch = self.sketches.get(name)
+            if sketch is not None and sketch.n:
+                ref["q1"], ref["q3"] = sketch.quantiles([0.25, 0.75])
+            columns[name] = ref
+        value_counts = {name: dict(vc) for name, vc in self.value_counts.items() if vc is not None}
+        return {"total_rows": self.row_count, "columns": columns, "value_counts": value_counts}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_distinct": self.max_distinct,
+            "sketch_k": self.sketch_k,
+            "row_count": self.row_count,
+            "kinds": self.kinds,
+            "columns": self.columns,
+            # JSON objects only have string keys, so value counts are stored as pairs
+            "value_counts": {n: (list(vc.items()) if vc is not None else None) for n, vc in self.value_counts.items()},
+            "sketches": {n: s.to_dict() for n, s in self.sketches.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamingProfile":
+        profile = cls(data["max_distinct"], data["sketch_k"])
+        profile.row_count = data["row_count"]
+        profile.kinds = dict(data["kinds"])
+        profile.columns = {n: dict(s) for n, s in data["columns"].items()}
+        profile.value_counts = {
+            n: ({v: c for v, c in pairs} if pairs is not None else None) for n, pairs in data["value_counts"].items()
+        }
+        profile.sketches = {n: KLLSketch.from_dict(s) for n, s in data["sketches"].items()}
+        return profile
+
+
+def _merge_moments(ours: Dict[str, Any], theirs: Dict[str, Any]) -> None:
+    n_a, n_b = ours.get("count", 0), theirs["count"]
+    if n_a == 0:
+        for key in ("count", "mean", "m2", "min", "max", "zeros"):
+            ours[key] = theirs[key]
+        return
+    n = n_a + n_b
+    delta = theirs["mean"] - ours["mean"]
+    ours["mean"] += delta * n_b / n
+    ours["m2"] += theirs["m2"] + delta * delta * n_a * n_b / n
+    ours["count"] = n
+    ours["min"] = min(ours["min"], theirs["min"])
+    ours["max"] = max(ours["max"], theirs["max"])
+    ours["zeros"] += theirs["zeros"]
+
+
+def profile_batches(batches: Iterable[pl.DataFrame], profile: StreamingProfile) -> Iterator[pl.DataFrame]:
+    """Passes batches through unchanged while folding each one into `profile`."""
+    for batch in batches:
+        profile.update(batch)
+        yield batch
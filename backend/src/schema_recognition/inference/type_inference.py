@@ -1,124 +1,148 @@
 import polars as pl
-from typing import List
+from typing import Callable, Dict, List, Sequence, Union
+
+# Rows of the head sample used to reject impossible types before touching the full data
+SAMPLE_ROWS = 1000
+
+_BOOL_VALUES = ["true", "false", "0", "1", "yes", "no"]
+_BOOL_MAP = {
+    "true": True, "false": False,
+    "1": True, "0": False,
+    "yes": True, "no": False,
+    "t": True, "f": False,
+    "y": True, "n": False,
+}
+
+# Candidate types in order of preference, as casts of a string expression.
+# Polars newer versions do not support casting Utf8View to Boolean directly, so
+# booleans are mapped; unmapped values become null instead of raising for dirty data.
+_CASTS: Dict[str, Callable[[pl.Expr], pl.Expr]] = {
+    "bool": lambda e: e.str.to_lowercase().replace_strict(_BOOL_MAP, default=None, return_dtype=pl.Boolean),
+    "int": lambda e: e.cast(pl.Int64, strict=False),
+    "float": lambda e: e.cast(pl.Float64, strict=False),
+    "date": lambda e: e.str.to_date(strict=False),
+    "datetime": lambda e: e.str.to_datetime(strict=False),
+}
+
+
+def _valid(col_name: str) -> pl.Expr:
+    # Non-null, non-empty values: empty strings would become nulls in every cast
+    return pl.col(col_name).filter(pl.col(col_name).is_not_null() & (pl.col(col_name) != ""))
+
+
+def _check(col_name: str, kind: str) -> pl.Expr:
+    """True if every valid value of the column casts to `kind` without becoming null."""
+    values = _valid(col_name)
+    if kind == "bool":
+        # Only two distinct (case-sensitive) spellings, all boolean-like
+        return (values.n_unique() <= 2) & values.str.to_lowercase().is_in(_BOOL_VALUES).all()
+    return _CASTS[kind](values).null_count() == 0
+
+
+def _run_checks(frame: Union[pl.DataFrame, pl.LazyFrame], checks: Dict[str, pl.Expr]) -> Dict[str, bool]:
+    # All checks of all columns in one select, so Polars evaluates them in parallel
+    if not checks:
+        return {}
+    exprs = [e.alias(k) for k, e in checks.items()]
+    try:
+        out = frame.select(exprs)
+        row = (out.collect() if isinstance(out, pl.LazyFrame) else out).row(0, named=True)
+    except Exception:
+        # One unparseable column must not fail the batch: fall back to one check at a time
+        row = {}
+        for k, e in checks.items():
+            try:
+                out = frame.select(e.alias(k))
+                row[k] = (out.collect() if isinstance(out, pl.LazyFrame) else out).item()
+            except Exception:
+                row[k] = False
+    return {k: bool(v) for k, v in row.items()}
+
+
+def _sample_checks(columns: Sequence[str]) -> Dict[str, pl.Expr]:
+    checks = {f"{c}\0{kind}": _check(c, kind) for c in columns for kind in _CASTS}
+    checks.update({f"{c}\0n": _valid(c).len() for c in columns})
+    return checks
+
+
+def infer_string_casts(
+    frame: Union[pl.DataFrame, pl.LazyFrame],
+    columns: Sequence[str],
+    sample_rows: int = SAMPLE_ROWS,
+) -> Dict[str, pl.Expr]:
+    """
+    Cast expression per string column (the plain column if no better type fits).
+
+    1. Every candidate type of every column is tested on the first `sample_rows`
+       rows in one select. A type that fails on the sample cannot hold for the whole
+       column (date formats are inferred from the first value either way), so text
+       columns are usually settled here. Columns without values in those rows are
+       sampled from their first non-empty values.
+    2. The surviving candidates are confirmed on all rows, again in one select, and
+       the first one (bool, int, float, date, datetime) that holds is chosen.
+    Columns without any non-empty value are kept as they are.
+    """
+    columns = list(columns)
+    if not columns:
+        return {}
+    sampled = _run_checks(frame.head(sample_rows), _sample_checks(columns))
+    blind = [c for c in columns if not sampled[f"{c}\0n"]]
+    if blind:
+        # No value in the first rows (e.g. a column filled later): sample its first
+        # non-empty values instead; a column without any keeps its type
+        out = frame.select([_valid(c).head(sample_rows).implode() for c in blind])
+        firsts = (out.collect() if isinstance(out, pl.LazyFrame) else out).row(0, named=True)
+        longest = max(len(v) for v in firsts.values())
+        padded = pl.DataFrame(
+            {c: v + [None] * (longest - len(v)) for c, v in firsts.items()}, schema={c: pl.Utf8 for c in blind}
+        )
+        sampled.update(_run_checks(padded, _sample_checks(blind)))
+
+    survivors = {c: [k for k in _CASTS if sampled[f"{c}\0{k}"]] for c in columns}
+    full_checks = {f"{c}\0{kind}": _check(c, kind) for c, kinds in survivors.items() for kind in kinds}
+    confirmed = _run_checks(frame, full_checks)
+
+    exprs = {}
+    for c in columns:
+        expr = pl.col(c)
+        if sampled[f"{c}\0n"]:
+            kind = next((k for k in survivors[c] if confirmed[f"{c}\0{k}"]), None)
+            if kind is not None:
+                expr = _CASTS[kind](expr)
+        exprs[c] = expr
+    return exprs
+
 
 def refine_col_type(df: pl.DataFrame, col_name: str) -> pl.Expr:
     """
     Attempts to infer a better type for a given string column.
     Returns an expression that casts the column, or the original column expression if no better type is found.
     """
-    
-    # helper to check if cast is valid
-    # valid means: number of nulls after cast is roughly same as before (allowing for empty strings becoming null)
-    # But wait, original empty strings -> null in cast?
-    # We should filter out empty strings first to verify "real" values.
-    
-    expr = pl.col(col_name)
-    
-    # Get non-null, non-empty values
-    valid_values = df.filter(
-        pl.col(col_name).is_not_null() & (pl.col(col_name) != "")
-    )
-    
-    if valid_values.height == 0:
-        return expr # Keep as is (or cast to something? No, Null/String is fine)
-    
-    # Try Boolean
-    # Boolean cast is tricky, Polars supports "true"/"false".
-    # Let's check unique values.
-    n_unique = valid_values[col_name].n_unique()
-    if n_unique <= 2:
-        # Check if values are boolean-like
-        unique_vals = set(valid_values[col_name].unique().to_list())
-        lower_vals = {str(v).lower() for v in unique_vals}
-        if lower_vals.issubset({"true", "false", "0", "1", "yes", "no"}):
-             # Polars newer versions do not support casting Utf8View to Boolean directly.
-             # We must map the strings to boolean values instead.
-             try:
-                 bool_map = {
-                     "true": True, "false": False,
-                     "1": True, "0": False,
-                     "yes": True, "no": False,
-                     "t": True, "f": False,
-                     "y": True, "n": False
-                 }
-                 # Apply lower() and replace with boolean values
-                 # We must use strict=False to ensure unmapped values become null 
-                 # instead of throwing an error for dirty data
-                 casted = expr.str.to_lowercase().replace(bool_map, default=None)
-                 
-                 # Verify that the casted column hasn't introduced more nulls than before
-                 # valid_values was our non-null subset
-                 test_casted = valid_values.select(pl.col(col_name).str.to_lowercase().replace(bool_map, default=None))
-                 if test_casted.null_count().item() == 0:
-                     return casted
-             except Exception as e:
-                 pass
-
-    # Try Integer
-    try:
-        # Check if we can cast to Int64 without creating NEW nulls (ignoring original nulls/empties)
-        # We use the 'valid_values' subset to test
-        
-        # Note: '1.0' cannot be cast to Int strictly in some contexts, but Polars strict=False might make it null
-        # We want to support "123". "123.0" -> Float usually.
-        
-        casted = valid_values.select(pl.col(col_name).cast(pl.Int64, strict=False))
-        if casted.null_count().item() == 0:
-            return expr.cast(pl.Int64, strict=False)
-    except:
-        pass
-
-    # Try Float
-    try:
-        casted = valid_values.select(pl.col(col_name).cast(pl.Float64, strict=False))
-        if casted.null_count().item() == 0:
-            return expr.cast(pl.Float64, strict=False)
-    except:
-        pass
+    return infer_string_casts(df, [col_name])[col_name]
 
-    # Try Date
-    try:
-        # try_parse_dates is standard in read_csv, but here we do it per column
-        # str.to_date works for ISO and common formats
-        casted = valid_values.select(pl.col(col_name).str.to_date(strict=False))
-        if casted.null_count().item() == 0:
-            return expr.str.to_date(strict=False)
-    except:
-        pass
-
-    # Try Datetime
-    try:
-        # We need to handle various formats. str.to_datetime without format string infers?
-        # Polars has `str.to_datetime` that takes `time_unit` etc.
-        # Ideally we use `str.strptime` if we know format, but we don't.
-        # Polars has an inference engine for CSV, but not exposed easily for single col?
-        # Let's try generic to_datetime with strict=False
-        casted = valid_values.select(pl.col(col_name).str.to_datetime(strict=False))
-        if casted.null_count().item() == 0:
-            return expr.str.to_datetime(strict=False)
-    except:
-        pass
-        
-    return expr
 
 def refine_types(df: pl.DataFrame) -> pl.DataFrame:
     """
     Iterate over Utf8 columns and attempt to infer specific types.
+    All string columns are inferred together (see infer_string_casts) and cast in one with_columns.
+    """
+    str_cols = [name for name, dtype in df.schema.items() if dtype == pl.Utf8]
+    if not str_cols:
+        return df
+    casts = infer_string_casts(df, str_cols)
+    return df.with_columns([casts[name].alias(name) for name in str_cols])
+
+
+def refine_types_lazy(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Lazy counterpart of refine_types.
+    The cast checks run as two aggregating queries on the plan (projection pushdown keeps
+    Parquet scans to the Utf8 columns), without collecting the column values; the casts
+    are then appended to the plan.
     """
-    new_exprs = []
-    has_changes = False
-    
-    for name, dtype in df.schema.items():
-        if dtype == pl.Utf8:
-            new_expr = refine_col_type(df, name)
-            # We can't easily check if new_expr is different from original expr object
-            # But we can assume we construct a list of expressions
-            if new_expr is not None:
-                new_exprs.append(new_expr.alias(name))
-                # How to know if it changed?
-                # We'll just run with_columns. Polars optimizes no-ops.
-        else:
-            new_exprs.append(pl.col(name))
-            
-    # We apply all at once
-    return df.with_columns(new_exprs)
+    schema = lf.collect_schema()
+    str_cols = [name for name, dtype in schema.items() if dtype == pl.Utf8]
+    if not str_cols:
+        return lf
+    casts = infer_string_casts(lf.select(str_cols), str_cols)
+    return lf.with_columns([casts[name].alias(name) for name in str_cols])
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
 import polars as pl
 
@@ -10,6 +10,9 @@ from pathlib import Path
 from .normalize import normalize_name
 from .scorers import base_name_scores, aggregate_score
 
+if TYPE_CHECKING:
+    from src.schema_recognition.inference.semantic import ColumnProfileCache
+
 # Load default synonyms
 SYNONYMS_FILE = Path(__file__).parent / "synonyms.json"
 DEFAULT_SYNONYMS = {}
@@ -20,6 +23,13 @@ if SYNONYMS_FILE.exists():
     except Exception:
         pass
 
+# dtypes that get a small score boost
+NUMERIC_DTYPES = (
+    pl.Int8, pl.Int16, pl.Int32, pl.Int64,
+    pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64,
+    pl.Float32, pl.Float64,
+)
+
 
 @dataclass
 class Candidate:
@@ -45,6 +55,9 @@ class SemanticFieldMapper:
              mark the column as ambiguous.
     strategy: 'auto'|'exact'|'normalized'|'fuzz 1y' — currently advisory; 'auto' uses all.
     force: if True, accept best above threshold even if ambiguous.
+    profile_cache: ColumnProfileCache shared with the rest of a run, so the semantic types of
+             `dataset`'s columns are looked up instead of detected again.
+    dataset: name of the dataset the mapped frames belong to (the cache key).
     """
 
     def __init__(
@@ -55,6 +68,8 @@ class SemanticFieldMapper:
         epsilon: float = 0.03,
         strategy: str = "auto",
         force: bool = False,
+        profile_cache: Optional["ColumnProfileCache"] = None,
+        dataset: str = "",
     ) -> None:
         self.reference_fields: List[str] = list(reference_fields)
         # normalize synonym keys but keep original refs list
@@ -74,36 +89,40 @@ class SemanticFieldMapper:
         self.epsilon = float(epsilon)
         self.strategy = strategy
         self.force = force
+        self.profile_cache = profile_cache
+        self.dataset = dataset
+
+    def _semantic_types(self, df: "pl.DataFrame") -> Dict[str, str]:
+        # Semantic types of all columns of `df` at once (cached per column, see ColumnProfileCache)
+        try:
+            from src.schema_recognition.inference.semantic import SemanticTypeDetector
+            return SemanticTypeDetector().detect(df, cache=self.profile_cache, dataset=self.dataset)
+        except Exception:
+            return {}
 
     def _scores_for_column(
         self,
         col_name: str,
         series: Optional["pl.Series"] = None,
+        semantic_types: Optional[Dict[str, str]] = None,
     ) -> List[Candidate]:
+        """
+        semantic_types: detected types of the frame `series` belongs to (map_columns
+        detects them for all columns at once); without them a given series is detected alone.
+        """
         # pattern hints/boosts from values
         dtype_boost = 0.0
-        pattern_boost = 0.0
         detected_type = None
-        
+
         if series is not None and pl is not None:
-            try:
-                # Use SemanticTypeDetector for strong signals
-                from src.schema_recognition.inference.semantic import SemanticTypeDetector
-                detector = SemanticTypeDetector()
-                # We only need to check this specific column
-                # Create a temporary DataFrame for the detector
-                temp_df = pl.DataFrame({col_name: series})
-                detected_types = detector.detect(temp_df)
-                detected_type = detected_types.get(col_name)
-                
-                # dtype boosts: numeric/string hints
-                dt = getattr(series, "dtype", None)
-                if dt in (getattr(pl, "Int8", None), getattr(pl, "Int16", None), getattr(pl, "Int32", None), getattr(pl, "Int64", None),
-                          getattr(pl, "UInt8", None), getattr(pl, "UInt16", None), getattr(pl, "UInt32", None), getattr(pl, "UInt64", None),
-                          getattr(pl, "Float32", None), getattr(pl, "Float64", None)):
-                    dtype_boost = 0.02
-            except Exception:
-                pass
+            if semantic_types is None:
+                semantic_types = self._semantic_types(pl.DataFrame({col_name: series}))
+            # Use SemanticTypeDetector for strong signals
+            detected_type = semantic_types.get(col_name)
+
+            # dtype boosts: numeric/string hints
+            if series.dtype in NUMERIC_DTYPES:
+                dtype_boost = 0.02
 
         candidates: List[Candidate] = []
         for ref in self.reference_fields:
@@ -157,9 +176,10 @@ class SemanticFieldMapper:
             "unmapped": [],
             "scores": {},
         }
+        semantic_types = self._semantic_types(df) if df is not None else None
         for col in columns:
             series = df[col] if (df is not None and col in df.columns) else None
-            cands = self._scores_for_column(col, series=series)
+            cands = self._scores_for_column(col, series=series, semantic_types=semantic_types)
             result["scores"][col] = {c.ref: c.score for c in cands}
             if not cands:
                 result["unmapped"].append(col)
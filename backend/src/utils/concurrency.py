@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Literal, Optional, TypeVar
+
+# NOTE: this module must not import polars. Process workers run `_limit_worker_threads`
+# before anything imports polars, which is what makes POLARS_MAX_THREADS effective.
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+ExecutorKind = Literal["thread", "process"]
+
+
+def _limit_worker_threads(n_threads: int) -> None:
+    # Avoid oversubscription: every worker process would otherwise start a full-size Polars pool
+    os.environ.setdefault("POLARS_MAX_THREADS", str(n_threads))
+
+
+def make_executor(max_workers: int, kind: ExecutorKind = "thread") -> Executor:
+    """
+    Creates a worker pool.
+    - thread: for I/O-bound work (SQL fetches, LLM calls); Polars/NumPy release the GIL.
+    - process: for CPU-bound Python work; uses 'spawn' since forking a process with a
+      running Polars thread pool can deadlock.
+    """
+    if kind == "process":
+        n_threads = max(1, (os.cpu_count() or 1) // max_workers)
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_limit_worker_threads,
+            initargs=(n_threads,),
+        )
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Unknown executor: {kind}. Allowed are 'thread', 'process'.")
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = 1,
+    kind: ExecutorKind = "thread",
+    max_pending: Optional[int] = None,
+) -> Iterator[R]:
+    """
+    Lazily applies `fn` to `items` on a worker pool and yields results in input order.
+
+    At most `max_pending` items (default: `max_workers`) are submitted but not yet
+    yielded, so a slow item never lets the input iterator run ahead unboundedly.
+    With max_workers <= 1 everything runs inline in the calling thread.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    max_pending = max(1, max_pending or max_workers)
+    with make_executor(max_workers, kind) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            del item
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
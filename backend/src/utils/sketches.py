@@ -0,0 +1,106 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+# The rank error stays around 1.7/k; 2/k leaves headroom, so k=200 ~ 1%
+_RANK_ERROR_FACTOR = 2.0
+
+
+def k_for_error(epsilon: float) -> int:
+    """Compactor size for a typical rank error of `epsilon` (e.g. 0.01 = 1% of the rows)."""
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon must be in (0, 1)")
+    return max(8, int(math.ceil(_RANK_ERROR_FACTOR / epsilon)))
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Keeps a stack of compactors; items on level h stand for 2**h input values.
+    A full level is sorted and every other item (random offset) is promoted to the
+    next level, so memory stays below about 3k items for any stream length while the
+    rank error stays around 1.7/k (about 1% for the default k=200).
+    Sketches built on different partitions can be merged; NaNs are ignored.
+    `KLLSketch.with_error(0.005)` sizes k for a target rank error.
+    The compaction offsets are drawn from a seeded generator, so results are reproducible.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = 0) -> None:
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def with_error(cls, epsilon: float, seed: Optional[int] = 0) -> "KLLSketch":
+        return cls(k=k_for_error(epsilon), seed=seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays on this level
+            keep, items = items[: len(items) % 2], items[len(items) % 2:]
+            promoted = items[self._rng.integers(0, 2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Capacities shrink when a level is added, so re-check from the bottom
+            level = 0
+
+    def update(self, values: Iterable[float]) -> "KLLSketch":
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += int(values.size)
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Approximate quantiles for qs in [0, 1] (None while the sketch is empty)."""
+        if self.n == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lv), 2.0 ** h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        ranks = np.clip(np.asarray(qs, dtype=float), 0.0, 1.0) * cum[-1]
+        idx = np.minimum(np.searchsorted(cum, ranks, side="left"), len(items) - 1)
+        return [float(v) for v in items[idx]]
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "n": self.n, "levels": [lv.tolist() for lv in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KLLSketch":
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.levels = [np.asarray(lv, dtype=float) for lv in data["levels"]] or [np.empty(0)]
+        return sketch
@@ -32,3 +32,150 @@ def test_invalid_method(sample_numeric_df):
 def test_missing_columns(sample_numeric_df):
     with pytest.raises(KeyError, match="Column 'non_existent' does not exist in the DataFrame."):
         detect_anomalies(sample_numeric_df, method="zscore", columns=["non_existent"], threshold=2.0)
+
+def test_multi_column_flags_match_single_column():
+    from src.anomaly_detection.rules import iqr_anomalies, iqr_flags, z_score_anomalies, z_score_flags
+    df = pl.DataFrame({
+        "a": [1.0, 2.0, float("nan"), 2.5, 50.0, 1.5, None, 2.0],
+        "b": [10, 11, 12, -40, 10, 11, 12, 10],
+        "const": [1.0] * 8,
+    })
+    cols = ["a", "b", "const"]
+    for flags, single in (
+        (z_score_flags(df, cols, threshold=2.0), lambda c: z_score_anomalies(df, c, threshold=2.0)),
+        (iqr_flags(df, cols), lambda c: iqr_anomalies(df, c)),
+    ):
+        assert flags.mask.columns == cols
+        for c in cols:
+            assert df.filter(flags.mask[c]).equals(single(c))
+        assert flags.rows.tolist() == [3, 4]
+        assert flags.counts == {"a": 1, "b": 1, "const": 0}
+
+def test_flags_use_reference_statistics():
+    from src.anomaly_detection.rules import iqr_flags, z_score_flags
+    df = pl.DataFrame({"x": [10.0, 11.0, 12.0]})
+    assert z_score_flags(df, ["x"], reference={"x": {"mean": 0.0, "std": 1.0}}).rows.tolist() == [0, 1, 2]
+    assert iqr_flags(df, ["x"], reference={"x": {"q1": 10.0, "q3": 10.5}}).rows.tolist() == [2]
+
+def test_iqr_sketch_backend_close_to_exact():
+    import numpy as np
+    from src.anomaly_detection.rules import column_sketches, iqr_flags, sketch_quartiles
+    rng = np.random.default_rng(0)
+    df = pl.DataFrame({"x": rng.lognormal(size=200_000), "empty": pl.Series([None] * 200_000, dtype=pl.Float64)})
+    exact = iqr_flags(df, ["x", "empty"])
+    sketched = iqr_flags(df, ["x", "empty"], backend="sketch", quantile_error=0.01, batch_rows=20_000)
+    assert sketched.counts["empty"] == 0
+    # Bounds move by at most ~1% in rank, so the flagged fraction barely changes
+    assert abs(sketched.counts["x"] - exact.counts["x"]) / df.height < 0.01
+
+    # Sketches of separate partitions (e.g. workers) merge into whole-column quartiles
+    parts = [column_sketches([part], ["x"]) for part in df.iter_slices(50_000)]
+    merged = parts[0]["x"]
+    for p in parts[1:]:
+        merged.merge(p["x"])
+    q = sketch_quartiles({"x": merged})["x"]
+    values = np.sort(df["x"].to_numpy())
+    assert abs(np.searchsorted(values, q["q1"]) / len(values) - 0.25) < 0.02
+    assert abs(np.searchsorted(values, q["q3"]) / len(values) - 0.75) < 0.02
+
+def test_iqr_unknown_backend(sample_numeric_df):
+    from src.anomaly_detection.rules import iqr_flags
+    with pytest.raises(ValueError, match="Unknown quantile backend"):
+        iqr_flags(sample_numeric_df, ["value"], backend="tdigest")
+
+def test_mad_method(sample_numeric_df):
+    anomalies = detect_anomalies(sample_numeric_df, method="mad", columns=["value"], threshold=3.5)
+    assert anomalies["value"].to_list() == [100.0]
+
+def test_mad_flags_mostly_constant_column():
+    from src.anomaly_detection.rules import mad_flags
+    # MAD is 0 when most values are equal; the mean absolute deviation takes over
+    df = pl.DataFrame({"x": [5.0] * 20 + [6.0, 50.0], "const": [1.0] * 22})
+    flags = mad_flags(df, ["x", "const"])
+    assert flags.rows.tolist() == [21]
+    assert flags.counts["const"] == 0
+
+def test_hampel_flags_local_spikes_in_order():
+    import numpy as np
+    from src.anomaly_detection.rules import hampel_flags
+    trend = np.arange(200, dtype=float)  # a global rule sees no outlier in a steady trend
+    trend[[50, 120]] += 15
+    df = pl.DataFrame({"seq": list(range(200)), "value": trend})
+    assert hampel_flags(df, ["value"]).rows.tolist() == [50, 120]
+    shuffled = df.sample(fraction=1.0, shuffle=True, seed=0)
+    rows = hampel_flags(shuffled, ["value"], order_by="seq").rows
+    assert sorted(shuffled["seq"].gather(rows).to_list()) == [50, 120]
+    assert detect_anomalies(df, method="hampel", columns=["value"], threshold=3.0).height == 2
+
+def test_scores_agree_with_flags():
+    import numpy as np
+    from src.anomaly_detection import rules
+    rng = np.random.default_rng(3)
+    df = pl.DataFrame({"a": rng.standard_t(2, 2000), "b": rng.normal(size=2000), "c": [None] * 2000},
+                      schema_overrides={"c": pl.Float64})
+    for name in ("z_score", "iqr", "mad", "hampel"):
+        flags = getattr(rules, f"{name}_flags")(df, ["a", "b", "c"])
+        scores = getattr(rules, f"{name}_scores")(df, ["a", "b", "c"])
+        assert scores.rows.tolist() == flags.rows.tolist(), name
+        assert scores.column_counts == flags.counts and scores.count == flags.total
+        assert scores.scores.dtype == np.float32 and len(scores.scores) == df.height
+
+def test_score_batches_with_reference_matches_whole_frame():
+    from functools import partial
+    import numpy as np
+    from src.anomaly_detection.utils import score_batches, z_score_scores
+    df = pl.DataFrame({"x": np.random.default_rng(0).normal(size=10_000)}).with_columns(
+        pl.when(pl.int_range(10_000) == 7_777).then(50.0).otherwise(pl.col("x")).alias("x")
+    )
+    whole = z_score_scores(df, ["x"])
+    reference = {"x": {"mean": df["x"].mean(), "std": df["x"].std(ddof=0)}}
+    batched = score_batches(df.iter_slices(1_000), partial(z_score_scores, columns=["x"], reference=reference))
+    np.testing.assert_allclose(batched.scores, whole.scores, rtol=1e-6)
+    assert batched.rows.tolist() == whole.rows.tolist() and 7_777 in batched.rows
+    table = batched.to_arrow()
+    assert table.column_names == ["score", "is_anomaly"] and table.num_rows == df.height
+    assert batched.take(df, 1)["x"].to_list() == df["x"].gather(batched.rows[:1]).to_list()
+
+def test_missing_value_and_isolation_forest_scores(sample_numeric_df):
+    import numpy as np
+    from src.anomaly_detection.isolation_forest import decision_scores
+    from src.anomaly_detection.missing_values import missing_value_scores
+    df = pl.DataFrame({"a": [1, 2, None], "b": ["x", "", None]})
+    scores = missing_value_scores(df, threshold=2)
+    assert scores.scores.tolist() == [0, 1, 2] and scores.rows.tolist() == [2]
+    decision = decision_scores(np.array([0.1, -0.2, np.nan], dtype=np.float32))
+    assert decision.rows.tolist() == [1] and np.isnan(decision.scores[2])
+
+def test_categorical_scores_flag_rare_values():
+    from src.anomaly_detection.categorical import categorical_scores, detect_categorical_anomalies
+    df = pl.DataFrame({
+        "status": ["ok"] * 300 + ["rare"] + ["ok"] * 99,
+        "code": [1, 2] * 200,
+        "note": ["x"] * 395 + [None] * 5,  # nulls are never a rare value
+        "id": list(range(400)),  # all distinct: not categorical
+    })
+    scores = categorical_scores(df)
+    assert scores.rows.tolist() == [300]
+    assert scores.scores[300] > scores.scores[0]
+    assert detect_categorical_anomalies(df)["id"].to_list() == [300]
+    # Rarity judged by given frequencies instead of those of the frame
+    frequencies = {"status": {"ok": 5, "rare": 995}}
+    assert categorical_scores(df, frequencies=frequencies, total_rows=1000).rows.size == 399
+    assert not categorical_scores(df.head(0)).mask.any()
+
+def test_ensemble_top_rows_match_full_sort():
+    import numpy as np
+    from src.anomaly_detection.scoring import AnomalyScores, ensemble
+    rng = np.random.default_rng(5)
+    n = 5_000
+    a = AnomalyScores(rng.normal(size=n).astype(np.float32), rng.random(n) < 0.05)
+    b = AnomalyScores(rng.exponential(size=n).astype(np.float32) * 100, rng.random(n) < 0.05)
+    b.scores[:10] = np.nan  # unscored rows count as 0
+    matrix = ensemble({"a": a, "b": b}, weights={"b": 3.0})
+    assert matrix.matrix.shape == (n, 2) and matrix.matrix.min() >= 0 and matrix.matrix.max() <= 1
+    np.testing.assert_allclose(matrix.combined, (matrix.matrix[:, 0] + 3 * matrix.matrix[:, 1]) / 4, rtol=1e-6)
+    flagged = np.flatnonzero(a.mask | b.mask)
+    expected = flagged[np.argsort(-matrix.combined[flagged], kind="stable")][:20]
+    assert matrix.top(20).tolist() == expected.tolist()
+    assert len(matrix.top(10 * n)) == flagged.size and matrix.top(0).size == 0
+    assert matrix.to_arrow().column_names == ["a", "b", "combined"]
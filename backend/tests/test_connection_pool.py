@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from src.connection.pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self, n):
+        self.n = n
+        self.closed = False
+        self.broken = False
+
+    def close(self):
+        self.closed = True
+
+
+def _make_pool(**kwargs):
+    created = []
+
+    def connect():
+        conn = FakeConnection(len(created))
+        created.append(conn)
+        return conn
+
+    def ping(conn):
+        if conn.broken:
+            raise ConnectionError("stream reset")
+
+    return ConnectionPool(connect, ping=ping, **kwargs), created
+
+
+def test_connections_are_reused():
+    pool, created = _make_pool()
+    for _ in range(5):
+        with pool.connection() as conn:
+            assert conn is created[0]
+    metrics = pool.metrics()
+    assert metrics["checkouts"] == 5
+    assert metrics["creations"] == 1
+    assert metrics["idle"] == 1 and metrics["in_use"] == 0
+
+
+def test_max_size_makes_checkouts_wait():
+    pool, created = _make_pool(max_size=2)
+    release = threading.Event()
+    in_use = []
+
+    def worker():
+        with pool.connection() as conn:
+            in_use.append(conn)
+            release.wait(5)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    assert len(in_use) == 2
+    release.set()
+    for t in threads:
+        t.join()
+    metrics = pool.metrics()
+    assert metrics["creations"] == 2
+    assert metrics["waits"] == 2
+    assert metrics["checkouts"] == 4
+
+
+def test_acquire_timeout():
+    pool, _ = _make_pool(max_size=1, acquire_timeout=0.05)
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+
+
+def test_idle_connections_expire():
+    pool, created = _make_pool(idle_timeout=0.0)
+    with pool.connection():
+        pass
+    time.sleep(0.01)
+    with pool.connection() as conn:
+        assert conn is created[1]
+    assert created[0].closed
+    assert pool.metrics()["closed"] == 1
+
+
+def test_broken_connection_is_replaced_after_error():
+    pool, created = _make_pool()
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.broken = True
+            raise RuntimeError("query failed")
+    with pool.connection() as conn:
+        assert conn is created[1]
+    assert created[0].closed
+    assert pool.metrics()["health_check_failures"] == 1
+
+
+def test_query_error_keeps_healthy_connection():
+    pool, created = _make_pool()
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("syntax error")
+    with pool.connection() as conn:
+        assert conn is created[0]
+
+
+def test_close_closes_idle_connections():
+    pool, created = _make_pool()
+    with pool.connection():
+        pass
+    pool.close()
+    assert created[0].closed
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pass
@@ -0,0 +1,102 @@
+import datetime as dt
+from unittest.mock import patch
+
+import numpy as np
+import polars as pl
+import pytest
+
+from src.assistant.datasource import LakehouseSQLDataSource, LocalFilesDataSource
+from src.assistant.incremental import IncrementalState, IncrementalStore
+from src.assistant.runner import AnomalyConfig, MappingConfig, run_assistant
+from src.schema_recognition.inference.streaming_stats import StreamingProfile
+from src.utils.sketches import KLLSketch
+
+
+def _frame(start, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pl.DataFrame({
+        "ts": [dt.datetime(2024, 1, 1) + dt.timedelta(minutes=i) for i in range(start, start + n)],
+        "amount": rng.normal(100, 10, n).round(2),
+        "cat": rng.choice(["a", "b", "c"], n).tolist(),
+    })
+
+
+def _run(root, store, watermark_column=None):
+    return run_assistant(
+        LocalFilesDataSource(root, watermark_column=watermark_column),
+        MappingConfig(reference_fields=[]),
+        AnomalyConfig(use_isolation_forest=False),
+        incremental=store,
+    ).datasets[0]
+
+
+def test_kll_sketch_quantiles_and_merge():
+    values = np.random.default_rng(1).normal(size=200_000)
+    whole = KLLSketch().update(values)
+    merged = KLLSketch().update(values[:50_000]).merge(KLLSketch(seed=1).update(values[50_000:]))
+    ordered = np.sort(values)
+    for sketch in (whole, merged):
+        assert sketch.n == len(values)
+        for q, v in zip([0.25, 0.5, 0.75], sketch.quantiles([0.25, 0.5, 0.75])):
+            assert abs(np.searchsorted(ordered, v) / len(values) - q) < 0.02
+        assert sum(len(lv) for lv in sketch.levels) < 3 * sketch.k
+
+
+def test_profile_round_trip():
+    profile = StreamingProfile()
+    profile.update(_frame(0, 500))
+    restored = StreamingProfile.from_dict(profile.to_dict())
+    assert restored.column_stats() == profile.column_stats()
+    assert restored.detector_reference() == profile.detector_reference()
+
+
+@pytest.mark.parametrize("watermark_column", [None, "ts"])
+@patch("src.assistant.llm_client.LLMClient._generate", return_value=None)
+def test_only_new_rows_are_analysed(_, tmp_path, watermark_column):
+    root = tmp_path / "data"
+    root.mkdir()
+    store = IncrementalStore(tmp_path / "state", watermark_column)
+    base = _frame(0, 1000)
+    base.write_csv(root / "t.csv")
+    first = _run(root, store, watermark_column)
+    assert first.rows == 1000 and first.incremental["total_rows"] == 1000
+
+    # One outlier and one unseen category among the appended rows
+    new = _frame(1000, 50, seed=1).with_columns(
+        pl.when(pl.int_range(50) == 3).then(1000.0).otherwise(pl.col("amount")).alias("amount"),
+        pl.when(pl.int_range(50) == 4).then(pl.lit("zz")).otherwise(pl.col("cat")).alias("cat"),
+    )
+    pl.concat([base, new]).write_csv(root / "t.csv")
+    second = _run(root, store, watermark_column)
+    assert second.rows == 50
+    assert second.incremental["previous_watermark"] == first.incremental["watermark"]
+    assert second.incremental["total_rows"] == 1050
+    assert second.anomaly_rows["zscore"] == [3]
+    assert second.anomaly_rows["categorical"] == [4]
+    # Whole-table statistics, not those of the 50 new rows
+    amount = pl.concat([base, new])["amount"]
+    assert second.statistics["numeric_stats"]["amount"]["mean"] == pytest.approx(amount.mean())
+    assert second.statistics["numeric_stats"]["amount"]["min"] == amount.min()
+
+    third = _run(root, store, watermark_column)
+    assert third.rows == 0
+    assert third.incremental["watermark"] == second.incremental["watermark"]
+    assert third.incremental["total_rows"] == 1050
+
+
+def test_changed_watermark_column_starts_over(tmp_path):
+    IncrementalStore(tmp_path, None).save(IncrementalState(name="t.csv", watermark=10))
+    assert IncrementalStore(tmp_path, None).watermarks() == {"t.csv": 10}
+    assert IncrementalStore(tmp_path, "ts").load("t.csv").watermark is None
+    assert IncrementalStore(tmp_path, "ts").watermarks() == {}
+
+
+def test_sql_increment_queries():
+    source = LakehouseSQLDataSource(connection_uri="grpc://x", query="SELECT 1")
+    # Without ORDER BY Dremio returns rows in no particular order, so OFFSET marks are unusable
+    with pytest.raises(ValueError, match="watermark_column"):
+        next(source.iter_datasets(since={}))
+    source = LakehouseSQLDataSource(connection_uri="grpc://x", query="SELECT 1", watermark_column="ts")
+    assert source._increment_query("t", "2024-01-01 10:00:00") == (
+        "SELECT * FROM t WHERE \"ts\" > '2024-01-01 10:00:00' ORDER BY \"ts\""
+    )
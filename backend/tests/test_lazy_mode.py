@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import polars as pl
+
+from src.assistant.datasource import LocalFilesDataSource
+from src.assistant.runner import AnomalyConfig, MappingConfig, run_assistant
+from src.schema_recognition.inference.type_inference import refine_types, refine_types_lazy
+
+
+def _write_data(root):
+    n = 300
+    pl.DataFrame({
+        "amount": [float(i % 17) for i in range(n - 1)] + [900.0],
+        "code": [str(i % 5) for i in range(n)],
+        "email": [f"user{i}@example.com" for i in range(n)],
+    }).write_parquet(root / "orders.parquet")
+    (root / "people.csv").write_text("id,name,joined\n" + "".join(f"{i},n{i},2024-01-0{i % 9 + 1}\n" for i in range(50)))
+
+
+def test_lazy_source_yields_lazyframes(tmp_path):
+    _write_data(tmp_path)
+    datasets = list(LocalFilesDataSource(root=tmp_path, max_rows=10, lazy=True).iter_datasets())
+    assert all(ds.df is None and isinstance(ds.lf, pl.LazyFrame) for ds in datasets)
+    assert all(ds.lf.collect().height == 10 for ds in datasets)
+
+
+def test_refine_types_lazy_matches_eager():
+    df = pl.DataFrame({"a": ["1", "2", None], "b": ["x", "y", "z"], "c": [1.5, 2.5, 3.5]})
+    assert refine_types_lazy(df.lazy()).collect().equals(refine_types(df))
+
+
+def test_refine_types_sample_then_confirm():
+    from src.schema_recognition.inference.type_inference import infer_string_casts
+    n = 3000
+    df = pl.DataFrame({
+        "flag": ["yes", "no", ""] * (n // 3),
+        "int_then_text": ["1"] * (n - 1) + ["x"],  # passes the sample, fails on all rows
+        "int_then_float": ["1"] * (n - 1) + ["1.5"],  # falls through to the next candidate
+        "late": [None] * 2000 + ["2024-01-02"] * (n - 2000),  # nothing in the head sample
+        "empty": [""] * n,
+        "text": ["abc"] * n,
+    })
+    refined = refine_types(df)
+    assert refined.schema == {
+        "flag": pl.Boolean, "int_then_text": pl.String, "int_then_float": pl.Float64,
+        "late": pl.Date, "empty": pl.String, "text": pl.String,
+    }
+    assert refined["flag"].null_count() == n // 3
+    casts = infer_string_casts(df.lazy(), df.columns, sample_rows=10)
+    assert df.select(**casts).schema == refined.schema
+
+
+def test_lazy_run_matches_eager_run(tmp_path):
+    _write_data(tmp_path)
+    with patch("src.assistant.llm_client.LLMClient._generate", return_value=None):
+        reports = [
+            run_assistant(LocalFilesDataSource(root=tmp_path, lazy=lazy), MappingConfig(reference_fields=["email"]))
+            for lazy in (False, True)
+        ]
+    eager, lazy = ([ds for ds in r.datasets] for r in reports)
+    for e, l in zip(eager, lazy):
+        assert e.schema == l.schema
+        assert e.statistics["missing_ratios"] == l.statistics["missing_ratios"]
+        assert e.categorical_cols == l.categorical_cols
+        assert e.anomalies == l.anomalies
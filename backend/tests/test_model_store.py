@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+import numpy as np
+import polars as pl
+from sklearn.ensemble import IsolationForest
+
+from src.anomaly_detection.isolation_forest import isolation_forest_scores
+from src.assistant.datasource import LocalFilesDataSource
+from src.assistant.model_store import ModelStore
+from src.assistant.runner import AnomalyConfig, MappingConfig, run_assistant
+
+
+def _frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    x[::97] = None
+    return pl.DataFrame({"x": x, "y": rng.normal(size=n)}).with_columns(pl.col("x").fill_nan(None))
+
+
+def test_chunked_scores_match_fit_predict():
+    df = _frame()
+    _, scores = isolation_forest_scores(df, ["x", "y"], contamination=0.05, chunk_rows=333)
+    complete = df.drop_nulls()
+    expected = IsolationForest(contamination=0.05, n_estimators=100, random_state=42).fit_predict(complete.to_numpy())
+    assert np.isnan(scores[::97]).all()
+    assert ((scores[~np.isnan(scores)] < 0) == (expected == -1)).all()
+
+
+def test_subsampled_fit_keeps_contamination():
+    df = _frame(20_000)
+    model, scores = isolation_forest_scores(df, ["x", "y"], contamination=0.02, max_samples=2000)
+    assert model.n_features_in_ == 2
+    assert abs(np.nanmean(scores < 0) - 0.02) < 0.01
+
+
+@patch("src.assistant.llm_client.LLMClient._generate", return_value=None)
+def test_models_are_reused_for_unchanged_data(_, tmp_path):
+    root = tmp_path / "data"
+    root.mkdir()
+    _frame().write_csv(root / "a.csv")
+    store = ModelStore(tmp_path / "models")
+
+    def run(**cfg):
+        return run_assistant(
+            LocalFilesDataSource(root), MappingConfig(reference_fields=[]),
+            AnomalyConfig(use_zscore=False, use_iqr=False, **cfg), models=store,
+        ).datasets[0]
+
+    first = run()
+    assert store.stats()["models"] == 1
+    with patch("src.anomaly_detection.isolation_forest.fit_isolation_forest") as fit:
+        second = run()
+    fit.assert_not_called()
+    assert second.anomaly_rows["isolation_forest"] == first.anomaly_rows["isolation_forest"]
+
+    # Different parameters need a new model, which replaces the stored one
+    with patch("src.anomaly_detection.isolation_forest.fit_isolation_forest", wraps=lambda *a, **k: None) as fit:
+        run(contamination=0.05)
+    fit.assert_called_once()
+    store.invalidate("a.csv")
+    assert store.stats()["models"] == 0
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+from src.schema_recognition.inference.nested_detection import (
+    detect_nested_structures,
+    explode_field,
+    nested_fields,
+    profile_nested,
+    unnest_fields,
+)
+
+
+@pytest.fixture
+def nested_df():
+    return pl.DataFrame({
+        "id": [1, 2, 3, 4],
+        "orders": [[{"price": 1.5, "tags": ["a"]}, {"price": 2.0, "tags": []}], [], None, [{"price": None, "tags": ["b", "c"]}]],
+        "addr": [{"zip": 1000, "geo": {"lat": 1.0}}, None, {"zip": None, "geo": None}, {"zip": 3, "geo": {"lat": 2.5}}],
+        "fixed": pl.Series([[1, 2], [3, 4], [5, 6], [7, 8]], dtype=pl.Array(pl.Int64, 2)),
+    })
+
+
+def test_detect_nested_structures(nested_df):
+    assert detect_nested_structures(nested_df) == ["orders", "addr", "fixed"]
+    assert detect_nested_structures(pl.DataFrame({"a": [1], "b": ["x"]})) == []
+
+
+def test_nested_fields_walks_structs_and_lists(nested_df):
+    fields = {f.path: (f.depth, f.in_list) for f in nested_fields(nested_df.schema)}
+    assert fields == {
+        "orders": (0, False),
+        "orders[]": (1, True),
+        "orders[].price": (2, True),
+        "orders[].tags": (2, True),
+        "orders[].tags[]": (3, True),
+        "addr": (0, False),
+        "addr.zip": (1, False),
+        "addr.geo": (1, False),
+        "addr.geo.lat": (2, False),
+        "fixed": (0, False),
+        "fixed[]": (1, True),
+    }
+
+
+def test_profile_nested_in_one_select(nested_df):
+    with patch.object(pl.DataFrame, "select", autospec=True, side_effect=pl.DataFrame.select) as mock_select:
+        profile = profile_nested(nested_df)
+    # One projection of the nested columns, one select for all statistics
+    assert mock_select.call_count == 2
+
+    assert profile["orders"]["list_length"] == {"min": 0, "max": 2, "mean": 1.0}
+    assert profile["orders"]["nulls"] == 1
+    # Elements of the non-empty lists only
+    assert (profile["orders[].price"]["values"], profile["orders[].price"]["nulls"]) == (3, 1)
+    assert profile["orders[].tags[]"]["values"] == 3
+    assert (profile["addr.zip"]["values"], profile["addr.zip"]["nulls"]) == (4, 2)
+    assert profile["fixed"]["list_length"] == {"min": 2, "max": 2, "mean": 2.0}
+
+    lazy = profile_nested(nested_df.lazy(), ["orders[].tags"])
+    assert lazy == {"orders[].tags": {
+        "dtype": "List(String)", "depth": 2, "in_list": True, "values": 3, "nulls": 0,
+        "list_length": {"min": 0, "max": 2, "mean": 1.0},
+    }}
+    with pytest.raises(KeyError):
+        profile_nested(nested_df, ["addr.street"])
+
+
+def test_unnest_fields_adds_row_aligned_virtual_columns(nested_df):
+    out = unnest_fields(nested_df)
+    assert out.columns == [*nested_df.columns, "addr.zip", "addr.geo.lat"]
+    assert out["addr.zip"].to_list() == [1000, None, None, 3]
+    assert out["addr.geo.lat"].to_list() == [1.0, None, None, 2.5]
+
+    lazy = unnest_fields(nested_df.lazy(), ["addr.zip"])
+    assert isinstance(lazy, pl.LazyFrame)
+    assert lazy.collect_schema().names()[-1] == "addr.zip"
+    assert unnest_fields(pl.DataFrame({"a": [1]})).columns == ["a"]
+
+
+def test_explode_field_keeps_the_source_row(nested_df):
+    tags = explode_field(nested_df, "orders[].tags[]")
+    assert tags.rows() == [(0, "a"), (3, "b"), (3, "c")]
+    prices = explode_field(nested_df.lazy(), "orders[].price").collect()
+    assert prices.rows() == [(0, 1.5), (0, 2.0), (3, None)]
+
+
+def test_runner_scores_struct_fields_and_reports_profile():
+    from src.assistant.datasource import Dataset
+    from src.assistant.runner import AnomalyConfig, MappingConfig, run_on_dataset
+
+    values = [float(i % 10) for i in range(200)]
+    values[42] = 1e6
+    df = pl.DataFrame({"id": list(range(200)), "m": [{"v": v, "tags": ["x"]} for v in values]})
+    cfg = dict(use_isolation_forest=False, use_iqr=False, use_missing_values=False)
+
+    report = run_on_dataset(Dataset(name="t", path=None, df=df), MappingConfig(reference_fields=[]), AnomalyConfig(**cfg))
+    assert report.nested_structures == ["m"]
+    assert report.nested_profile["m.tags"]["list_length"] == {"min": 1, "max": 1, "mean": 1.0}
+    assert report.anomaly_rows["zscore"] == [42]
+    assert report.anomaly_previews["zscore"][0]["m.v"] == 1e6
+
+    flat = run_on_dataset(
+        Dataset(name="t", path=None, df=df), MappingConfig(reference_fields=[]), AnomalyConfig(nested_fields=False, **cfg)
+    )
+    assert flat.anomalies["zscore"] == 0
@@ -0,0 +1,127 @@
+import math
+import random
+import time
+from unittest.mock import patch
+
+import polars as pl
+
+from src.assistant.datasource import DataSource, Dataset, DatasetSchema
+from src.assistant.runner import AnomalyConfig, MappingConfig, run_assistant
+from src.utils.concurrency import ordered_map
+
+
+class FramesSource(DataSource):
+    def __init__(self, frames):
+        self.frames = frames
+
+    def iter_datasets(self):
+        for name, df in self.frames.items():
+            yield Dataset(name=name, path=None, df=df)
+
+
+def _slow_square(x):
+    time.sleep(random.uniform(0, 0.02))
+    return x * x
+
+
+def test_ordered_map_keeps_input_order():
+    assert list(ordered_map(_slow_square, range(20), max_workers=4)) == [x * x for x in range(20)]
+
+
+def test_ordered_map_bounds_pending_items():
+    consumed = []
+
+    def items():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    results = ordered_map(_slow_square, items(), max_workers=2, max_pending=2)
+    next(results)
+    # One result yielded, so at most max_pending further items may have been pulled
+    assert len(consumed) <= 3
+    assert list(results) == [x * x for x in range(1, 10)]
+
+
+def test_ordered_map_process_pool():
+    assert list(ordered_map(math.sqrt, [4.0, 9.0, 16.0], max_workers=2, kind="process")) == [2.0, 3.0, 4.0]
+
+
+def test_run_assistant_parallel_is_deterministic():
+    frames = {f"t{i}": pl.DataFrame({f"col{i}": [1.0, 2.0, 3.0, 50.0]}) for i in range(6)}
+    progress = []
+
+    with patch("src.assistant.llm_client.LLMClient._generate", return_value=None):
+        report = run_assistant(
+            FramesSource(frames),
+            MappingConfig(reference_fields=[]),
+            AnomalyConfig(max_workers=3),
+            progress_callback=lambda msg, pct: progress.append(pct),
+        )
+
+    assert [ds.name for ds in report.datasets] == list(frames)
+    # Run-level progress never goes backwards even with interleaved datasets
+    assert progress == sorted(progress)
+    assert progress[-1] == 95
+
+
+class ListSource(DataSource):
+    """Datasets as (name, frame) pairs; names may repeat, the schema pass may see fewer."""
+
+    def __init__(self, frames, schema_count):
+        self.frames = frames
+        self.schema_count = schema_count
+
+    def iter_datasets(self):
+        for name, df in self.frames:
+            yield Dataset(name=name, path=None, df=df)
+
+    def iter_schemas(self):
+        for name, df in self.frames[:self.schema_count]:
+            yield DatasetSchema(name=name, path=None, columns=df.columns)
+
+
+def _progress(source):
+    progress = []
+    with patch("src.assistant.llm_client.LLMClient._generate", return_value=None):
+        run_assistant(
+            source,
+            MappingConfig(reference_fields=[]),
+            AnomalyConfig(use_isolation_forest=False),
+            progress_callback=lambda msg, pct: progress.append(pct),
+        )
+    return progress
+
+
+def test_run_progress_counts_datasets_with_the_same_name():
+    df = pl.DataFrame({"a": [1.0, 2.0, 3.0]})
+    progress = _progress(ListSource([("x.csv", df), ("x.csv", df)], schema_count=2))
+    assert progress == sorted(progress)
+    assert progress[-1] == 95
+
+
+def test_run_progress_is_capped_when_the_schema_pass_undercounts():
+    df = pl.DataFrame({"a": [1.0, 2.0, 3.0]})
+    progress = _progress(ListSource([(f"t{i}", df) for i in range(3)], schema_count=1))
+    assert progress == sorted(progress)
+    assert max(progress) == 95
+
+
+def test_report_ranks_rows_flagged_by_several_detectors_first():
+    values = [float(i % 10) for i in range(200)]
+    values[17] = 500.0  # extreme in both columns
+    values[90] = 40.0
+    df = pl.DataFrame({"a": values, "b": [v * 2 for v in values], "c": ["x"] * 199 + [None]})
+
+    with patch("src.assistant.llm_client.LLMClient._generate", return_value=None):
+        report = run_assistant(
+            FramesSource({"t": df}),
+            MappingConfig(reference_fields=[]),
+            AnomalyConfig(use_isolation_forest=False, top_anomalies=3),
+        )
+    top = report.datasets[0].top_anomalies
+    assert top["detectors"] == list(report.datasets[0].anomaly_rows)
+    assert top["rows"][0]["row"] == 17 and {r["row"] for r in top["rows"]} == {17, 90, 199}
+    assert top["rows"][0]["methods"] == ["zscore", "iqr"]
+    assert top["rows"][0]["values"]["a"] == 500.0
+    assert len(top["rows"]) == 3
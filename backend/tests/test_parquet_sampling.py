@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+
+from src.assistant.datasource import LocalFilesDataSource
+from src.assistant.runner import MappingConfig, run_assistant
+from src.assistant.sampling import parquet_footer_stats, read_parquet_sample
+
+
+@pytest.fixture
+def parquet_file(tmp_path):
+    path = tmp_path / "big.parquet"
+    df = pl.DataFrame({
+        "id": list(range(1000)),
+        "value": [None if i % 10 == 0 else float(i) for i in range(1000)],
+        "label": [f"l{i % 7}" for i in range(1000)],
+    })
+    df.write_parquet(path, row_group_size=100, statistics=True)
+    return path
+
+
+def test_head_sampling_reads_only_needed_row_groups(parquet_file):
+    with patch.object(pq.ParquetFile, "read_row_groups", autospec=True, side_effect=pq.ParquetFile.read_row_groups) as mock_read:
+        df, total = read_parquet_sample(parquet_file, 150, strategy="head")
+    assert total == 1000
+    assert df["id"].to_list() == list(range(150))
+    assert list(mock_read.call_args.args[1]) == [0, 1]
+
+
+def test_random_sampling_is_uniform_and_reproducible(parquet_file):
+    a, _ = read_parquet_sample(parquet_file, 200, strategy="random", seed=1)
+    b, _ = read_parquet_sample(parquet_file, 200, strategy="random", seed=1)
+    assert a.equals(b)
+    assert a.height == 200 and a["id"].n_unique() == 200
+    # Late rows are reachable, unlike with a plain head()
+    assert a["id"].max() > 900
+
+
+def test_row_group_stratified_sampling(parquet_file):
+    df, _ = read_parquet_sample(parquet_file, 100, strategy="row_groups")
+    per_group = df.group_by(pl.col("id") // 100).len()
+    assert per_group.height == 10
+    assert per_group["len"].to_list() == [10] * 10
+
+
+def test_footer_stats_are_exact(parquet_file):
+    total, stats = parquet_footer_stats(parquet_file)
+    assert total == 1000
+    assert stats["value"] == {"null_count": 100, "min": 1.0, "max": 999.0}
+    assert stats["id"]["min"] == 0 and stats["id"]["max"] == 999
+    assert "min" not in stats["label"]
+
+
+def test_footer_stats_prefill_report(parquet_file):
+    source = LocalFilesDataSource(root=parquet_file.parent, max_rows=50)
+    with patch("src.assistant.llm_client.LLMClient._generate", return_value=None):
+        report = run_assistant(source, MappingConfig(reference_fields=[]))
+    stats = report.datasets[0].statistics
+    assert stats["row_count"] == 50
+    assert stats["source_row_count"] == 1000
+    assert stats["numeric_stats"]["id"]["max"] == 999
+    assert stats["missing_ratios"]["value"] == 0.1
@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+from src.schema_recognition.inference.profiler import profile_dataframe
+from src.schema_recognition.inference.statistics import (
+    calculate_missing_ratios,
+    calculate_numeric_stats,
+    calculate_text_stats,
+    detect_categorical,
+)
+
+
+@pytest.fixture
+def mixed_df():
+    return pl.DataFrame({
+        "amount": [1.0, 0.0, None, 3.0] * 20,
+        "qty": [1, 1, 2, 2] * 20,
+        "status": ["a", "", None, "a"] * 20,
+        "empty": pl.Series([None] * 80, dtype=pl.Float64),
+    })
+
+
+def test_profile_runs_a_single_select(mixed_df):
+    with patch.object(pl.DataFrame, "select", autospec=True, side_effect=pl.DataFrame.select) as mock_select:
+        profile_dataframe(mixed_df)
+    assert mock_select.call_count == 1
+
+
+def test_views_over_profile(mixed_df):
+    profile = profile_dataframe(mixed_df)
+
+    assert calculate_missing_ratios(mixed_df, profile=profile) == {
+        "amount": 0.25, "qty": 0.0, "status": 0.5, "empty": 1.0,
+    }
+
+    numeric = calculate_numeric_stats(mixed_df, profile=profile)
+    assert set(numeric) == {"amount", "qty"}  # all-null column skipped
+    assert numeric["amount"]["mean"] == pytest.approx(4 / 3)
+    assert numeric["amount"]["zeros"] == 20
+    assert numeric["qty"]["min"] == 1 and numeric["qty"]["max"] == 2
+
+    text = calculate_text_stats(mixed_df, profile=profile)
+    assert text["status"]["unique_count"] == 3
+    assert text["status"]["top_values"][0] == {"value": "a", "count": 40}
+
+    assert detect_categorical(mixed_df, profile=profile) == ["qty", "status"]
+
+
+def test_views_match_without_shared_profile(mixed_df):
+    profile = profile_dataframe(mixed_df)
+    assert calculate_missing_ratios(mixed_df) == calculate_missing_ratios(mixed_df, profile=profile)
+    assert calculate_numeric_stats(mixed_df) == calculate_numeric_stats(mixed_df, profile=profile)
+    assert detect_categorical(mixed_df) == detect_categorical(mixed_df, profile=profile)
+
+
+def test_profile_rejects_unknown_sections(mixed_df):
+    with pytest.raises(ValueError, match="Unknown profile sections"):
+        profile_dataframe(mixed_df, sections={"histogram"})
@@ -0,0 +1,96 @@
+import os
+import time
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+from src.assistant.cache import ResultCache, config_key
+from src.assistant.datasource import LocalFilesDataSource, frame_fingerprint
+from src.assistant.runner import AnomalyConfig, MappingConfig, run_assistant
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    root = tmp_path / "data"
+    root.mkdir()
+    pl.DataFrame({"id": list(range(50)), "amount": [float(i % 9) for i in range(50)]}).write_csv(root / "a.csv")
+    return root
+
+
+def _run(root, cache):
+    return run_assistant(
+        LocalFilesDataSource(root),
+        MappingConfig(reference_fields=["amount"]),
+        AnomalyConfig(use_isolation_forest=False),
+        cache=cache,
+    )
+
+
+@patch("src.assistant.llm_client.LLMClient._generate", return_value="ok")
+def test_second_run_is_served_from_cache(_, data_dir, tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    first = _run(data_dir, cache)
+    with patch("src.assistant.runner.run_stages") as mock_stages:
+        second = _run(data_dir, cache)
+    mock_stages.assert_not_called()
+    assert second.datasets[0].cached
+    assert not first.datasets[0].cached
+    assert second.datasets[0].statistics == first.datasets[0].statistics
+    assert cache.stats()["hits"] == 1
+
+
+@patch("src.assistant.llm_client.LLMClient._generate", return_value=None)
+def test_run_without_llm_insights_is_not_cached(_, data_dir, tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    _run(data_dir, cache)
+    assert cache.stats()["entries"] == 0
+    assert not _run(data_dir, cache).datasets[0].cached
+
+
+@patch("src.assistant.llm_client.LLMClient._generate", return_value="ok")
+def test_changed_file_misses(_, data_dir, tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    _run(data_dir, cache)
+    path = data_dir / "a.csv"
+    path.write_text(path.read_text() + "50,1.0\n")
+    report = _run(data_dir, cache)
+    assert not report.datasets[0].cached
+    assert report.datasets[0].rows == 51
+
+
+def test_config_key_ignores_execution_settings():
+    mapping = MappingConfig(reference_fields=["b", "a"])
+    base = config_key(mapping, AnomalyConfig())
+    assert config_key(MappingConfig(reference_fields=["a", "b"]), AnomalyConfig(max_workers=4, stage_workers=1)) == base
+    assert config_key(mapping, AnomalyConfig(z_threshold=2.5)) != base
+
+
+def test_frame_fingerprint_tracks_content():
+    df = pl.DataFrame({"a": [1, 2, 3]})
+    assert frame_fingerprint(df, "t") == frame_fingerprint(df.clone(), "t")
+    assert frame_fingerprint(df, "t") != frame_fingerprint(df.with_columns(pl.lit(4).alias("a")), "t")
+
+
+def test_lru_eviction_and_invalidation(tmp_path):
+    from src.api.models import DatasetReport
+
+    report = DatasetReport(
+        name="x", path=None, rows=0, cols=0, schema={}, semantic_types={}, statistics={},
+        nested_structures=[], categorical_cols=[], llm_insights={}, mapping={}, ambiguous={},
+        unmapped=[], anomalies={}, anomaly_samples_saved={},
+    )
+    cache = ResultCache(tmp_path / "cache", max_entries=2)
+    for i, name in enumerate(["a", "b"]):
+        cache.put(name, "fp", "cfg", report)
+        # mtime resolution is coarse on some filesystems
+        os.utime(cache._path(name, "fp", "cfg"), (time.time() - 10 + i, time.time() - 10 + i))
+    assert cache.get("a", "fp", "cfg") is not None  # a is now the most recently used
+    cache.put("c", "fp", "cfg", report)
+    assert cache.get("b", "fp", "cfg") is None
+    assert cache.get("a", "fp", "cfg") is not None
+
+    assert cache.invalidate("a") == 1
+    assert cache.get("a", "fp", "cfg") is None
+    assert cache.invalidate() == 1
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+import numpy as np
+import polars as pl
+import pytest
+
+from src.api.services import anomaly_row_page
+from src.assistant.datasource import LocalFilesDataSource
+from src.assistant.runner import AnomalyConfig, MappingConfig, run_assistant
+from src.utils.row_encoding import decode_rows, decode_rows_range, encode_rows
+
+
+@pytest.mark.parametrize("rows", [
+    [],
+    [0],
+    [7, 3, 3, 12],
+    list(range(1_000, 50_000)) + [10**9, 2**40],
+])
+def test_round_trip(rows):
+    encoded = encode_rows(rows)
+    expected = sorted(set(rows))
+    assert decode_rows(encoded).tolist() == expected
+    assert encoded["count"] == len(expected) and encoded["head"] == expected[:10]
+
+
+def test_encoding_is_compact():
+    rows = np.flatnonzero(np.random.default_rng(0).random(1_000_000) < 0.05)
+    encoded = encode_rows(rows)
+    assert len(encoded["data"]) < 3 * rows.size  # about 2 bytes per scattered row before base64
+    # A contiguous block is a single run
+    assert len(encode_rows(range(5_000_000, 9_000_000))["data"]) <= 12
+    with pytest.raises(ValueError):
+        decode_rows({**encoded, "encoding": "roaring"})
+
+
+def test_range_decode_matches_slice():
+    rows = np.flatnonzero(np.random.default_rng(1).random(20_000) < 0.3)
+    encoded = encode_rows(np.concatenate([rows, np.arange(30_000, 31_000)]))
+    full = decode_rows(encoded)
+    for start, stop in [(0, 1), (0, 10), (123, 4567), (full.size - 5, full.size + 50), (full.size, None), (7, 7)]:
+        assert decode_rows_range(encoded, start, stop).tolist() == full[start:stop].tolist()
+    assert decode_rows_range(encode_rows([]), 0, 10).size == 0
+
+
+@patch("src.assistant.llm_client.LLMClient._generate", return_value=None)
+def test_large_row_sets_are_encoded_and_paged(_, tmp_path):
+    pl.DataFrame({
+        "a": [1.0, None] * 100,
+        "b": [float(i) for i in range(200)],
+    }).write_csv(tmp_path / "t.csv")
+    report = run_assistant(
+        LocalFilesDataSource(tmp_path),
+        MappingConfig(reference_fields=[]),
+        AnomalyConfig(use_isolation_forest=False, inline_rows_limit=50),
+    )
+    ds = report.datasets[0]
+    assert "missing_values" not in ds.anomaly_rows
+    encoded = ds.anomaly_rows_encoded["missing_values"]
+    assert encoded["count"] == 100 and encoded["head"] == list(range(1, 20, 2))
+
+    data = report.model_dump(mode="json")
+    page = anomaly_row_page(data, "t.csv", "missing_values", offset=95, limit=10)
+    assert page["total"] == 100 and page["rows"] == [191, 193, 195, 197, 199]
+    assert anomaly_row_page(data, "t.csv", "zscore", 0, 10) is None
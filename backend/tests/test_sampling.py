@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+import numpy as np
+import polars as pl
+import pytest
+
+from src.assistant.datasource import Dataset, LakehouseSQLDataSource, LocalFilesDataSource
+from src.assistant.runner import _sampling_summary
+from src.assistant.sampling import extrapolate_count, reservoir_sample, sql_sample_query, stratified_sample
+
+
+def _batches(n_rows, batch_size):
+    for start in range(0, n_rows, batch_size):
+        yield pl.DataFrame({"id": list(range(start, min(start + batch_size, n_rows)))})
+
+
+def test_reservoir_is_bounded_and_unique():
+    df, seen = reservoir_sample(_batches(10_000, 300), 100, seed=1)
+    assert seen == 10_000
+    assert df.height == 100
+    assert df["id"].n_unique() == 100
+
+
+def test_reservoir_is_uniform():
+    # Every position must be equally likely, including rows of the first and last batch
+    hits = np.zeros(1000)
+    for seed in range(300):
+        df, _ = reservoir_sample(_batches(1000, 64), 50, seed=seed)
+        hits[df["id"].to_numpy()] += 1
+    first, last = hits[:500].mean(), hits[500:].mean()
+    assert abs(first - last) / last < 0.1
+
+
+def test_reservoir_smaller_than_n():
+    df, seen = reservoir_sample(_batches(30, 7), 100)
+    assert seen == 30
+    assert df["id"].to_list() == list(range(30))
+
+
+def test_stratified_keeps_rare_stratum():
+    lf = pl.LazyFrame({"cls": ["a"] * 990 + ["rare"] * 10, "v": list(range(1000))})
+    df, total = stratified_sample(lf, 50, "cls")
+    assert total == 1000
+    assert "rare" in df["cls"].to_list()
+    assert 50 <= df.height <= 51
+
+
+def test_stratified_sample_never_exceeds_n():
+    # Unique values: more strata than rows to sample
+    lf = pl.LazyFrame({"id": list(range(200_000))})
+    df, total = stratified_sample(lf, 100, "id")
+    assert total == 200_000
+    assert df.height == 100 and df["id"].n_unique() == 100
+
+    # Many small strata next to a large one: the per-stratum minimum still fits in n
+    lf = pl.LazyFrame({"cls": ["big"] * 9_000 + [f"c{i}" for i in range(90)]})
+    df, _ = stratified_sample(lf, 100, "cls")
+    assert df.height <= 100
+    assert df["cls"].n_unique() == 91
+
+
+def test_stratified_unknown_column():
+    with pytest.raises(KeyError):
+        stratified_sample(pl.LazyFrame({"a": [1]}), 1, "missing")
+
+
+def test_sql_sample_queries():
+    assert sql_sample_query("s.t", 10, 1000, "head") == "SELECT * FROM s.t LIMIT 10"
+    assert "MOD(ABS(HASH(\"id\")), 100) = 0" in sql_sample_query("s.t", 10, 1000, "random", "id")
+    assert "RANDOM() < 0.0100000000" in sql_sample_query("s.t", 10, 1000, "random")
+    stratified = sql_sample_query("s.t", 10, 1000, "stratified", "cls")
+    assert 'PARTITION BY "cls"' in stratified
+    assert stratified.endswith("LIMIT 10")
+    with pytest.raises(ValueError):
+        sql_sample_query("s.t", 10, 1000, "stratified")
+
+
+def test_extrapolate_count():
+    est = extrapolate_count(5, 100, 10_000)
+    assert est["estimate"] == pytest.approx(500)
+    assert est["ci_low"] < 500 < est["ci_high"]
+    # Sampling the whole population leaves no uncertainty
+    full = extrapolate_count(5, 100, 100)
+    assert full["ci_low"] == pytest.approx(5) and full["ci_high"] == pytest.approx(5)
+
+
+def test_local_random_sampling_on_csv(tmp_path):
+    pl.DataFrame({"id": list(range(500))}).write_csv(tmp_path / "a.csv")
+    source = LocalFilesDataSource(tmp_path, max_rows=40, sampling="random")
+    ds = next(source.iter_datasets())
+    assert ds.df.height == 40
+    assert ds.total_rows == 500
+    assert ds.sampling == "random"
+    assert ds.df["id"].max() > 40
+
+
+def test_sql_sampling_pushdown():
+    source = LakehouseSQLDataSource("grpc://x", query="SELECT * FROM t", max_rows=5, sampling="stratified", sampling_column="cls")
+    results = [pl.DataFrame({"n": [100]}), pl.DataFrame({"cls": ["a"] * 5, "_rn": [1] * 5, "_cnt": [100] * 5})]
+    with patch.object(source, "_execute_query", side_effect=results) as mock_exec:
+        ds = next(source.iter_datasets())
+    assert mock_exec.call_args_list[0].args[0] == "SELECT COUNT(*) AS n FROM (SELECT * FROM t) AS _q"
+    assert ds.df.columns == ["cls"]
+    assert ds.total_rows == 100
+
+
+def test_sampling_summary():
+    ds = Dataset(name="d", path=None, df=pl.DataFrame({"a": [1]}), total_rows=1000, sampling="random")
+    sampling, estimates = _sampling_summary(ds, 100, {"zscore": [1, 2]})
+    assert sampling["fraction"] == pytest.approx(0.1)
+    assert estimates["zscore"]["estimate"] == pytest.approx(20)
+
+    ds.sampling = "head"
+    assert _sampling_summary(ds, 100, {"zscore": [1]})[1] is None
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import polars as pl
+
+from src.assistant.datasource import LocalFilesDataSource
+from src.schema_recognition.inference.schema_inference import (
+    NDJSON_SNIFF_LINES,
+    clear_schema_cache,
+    infer_schema_from_csv,
+    infer_schema_from_file,
+    read_file_schema,
+)
+
+
+def test_schema_inference_sampling(tmp_path):
+    csv_path = tmp_path / "test.csv"
+    with open(csv_path, "w") as f:
+        f.write("col1,col2\n")
+        for i in range(2000):
+            f.write(f"{i},val{i}\n")
+
+    clear_schema_cache()
+    with patch("polars.read_csv") as mock_read_csv, \
+         patch("polars.scan_csv", side_effect=pl.scan_csv) as mock_scan_csv:
+        schema = infer_schema_from_csv(str(csv_path), sample_rows=500)
+        again = infer_schema_from_csv(str(csv_path), sample_rows=500)
+
+    # Schema only: no rows are read, dtypes come from the first sample_rows rows
+    mock_read_csv.assert_not_called()
+    assert mock_scan_csv.call_count == 1
+    assert mock_scan_csv.call_args.kwargs["infer_schema_length"] == 500
+    assert schema == again == {"col1": "Int64", "col2": "String"}
+
+
+def test_local_schema_pass_is_metadata_only_and_cached(tmp_path):
+    clear_schema_cache()
+    pl.DataFrame({"a": [1, 2], "b": ["x", "y"]}).write_parquet(tmp_path / "t.parquet")
+    (tmp_path / "c.csv").write_text("id,when\n1,2024-01-01\n2,2024-01-02\n")
+    # Only the first lines are sniffed: the broken line past them is never parsed
+    (tmp_path / "e.jsonl").write_text('{"k": 1, "v": "x"}\n' * NDJSON_SNIFF_LINES + "not json\n")
+    (tmp_path / "arr.json").write_text('[{"k": 1}, {"k": 2}]')
+
+    ds = LocalFilesDataSource(root=tmp_path)
+    schemas = {s.name: s.columns for s in ds.iter_schemas()}
+    assert schemas == {"t.parquet": ["a", "b"], "c.csv": ["id", "when"], "e.jsonl": ["k", "v"], "arr.json": ["k"]}
+    assert read_file_schema(tmp_path / "c.csv") == {"id": pl.Int64, "when": pl.Date}
+    assert read_file_schema(tmp_path / "e.jsonl") == {"k": pl.Int64, "v": pl.String}
+
+    # Unchanged files are answered from the cache without opening them
+    with patch("polars.read_parquet_schema") as footer, patch("polars.scan_csv") as scan:
+        again = {s.name: s.columns for s in LocalFilesDataSource(root=tmp_path).iter_schemas()}
+    footer.assert_not_called()
+    scan.assert_not_called()
+    assert again["t.parquet"] == ["a", "b"]
+
+    assert infer_schema_from_file(str(tmp_path / "t.parquet")) == {"a": "Int64", "b": "String"}
@@ -132,3 +132,50 @@ def test_threshold_blocks_weak_matches():
 
     assert res["mapping"] == {}
     assert res["unmapped"] == ["phone_number"]
+
+
+def test_semantic_type_detector_vectorised():
+    from src.schema_recognition.inference.semantic import SemanticTypeDetector
+
+    df = pl.DataFrame({
+        "email": ["a@x.com", " b@y.org ", "c@z.net", "", None],
+        "site": ["HTTP://example.com", "www.test.org", "https://q.io", "n/a", None],
+        "uid": ["550E8400-E29B-41D4-A716-446655440000"] * 4 + ["x"],
+        "text": ["foo", "bar", "baz", "qux", "quux"],
+        "empty": pl.Series([None] * 5, dtype=pl.Utf8),
+        "n": [1, 2, 3, 4, 5],
+    })
+    detector = SemanticTypeDetector()
+    # Empty strings count towards the total: 3/4 emails, 3/4 URLs (case-insensitive)
+    assert detector.detect(df) == {"email": "Email", "site": "URL", "uid": "UUID"}
+    ratios = detector.match_ratios(df)
+    assert set(ratios) == {"email", "site", "uid", "text"}
+    assert ratios["email"]["Email"] == pytest.approx(0.75)
+    # Sample of the first two non-null values only
+    assert detector.match_ratios(df, sample_size=2)["site"]["URL"] == 1.0
+    assert detector._match_type(["a@x.com", "b@y.org", "nope"]) == "Email"
+
+
+def test_mapper_reads_semantic_types_from_profile_cache():
+    from src.schema_recognition.inference.semantic import ColumnProfileCache, SemanticTypeDetector
+
+    df = pl.DataFrame({
+        "contact": ["a@x.com", "b@y.org", "c@z.net"],
+        "site": ["http://a.io", "www.b.org", "https://c.net"],
+        "n": [1, 2, 3],
+    })
+    cache = ColumnProfileCache()
+    types = SemanticTypeDetector().detect(df, cache=cache, dataset="ds")
+    assert types == {"contact": "Email", "site": "URL"}
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    mapper = SemanticFieldMapper(reference_fields=["email"], profile_cache=cache, dataset="ds")
+    uncached = SemanticFieldMapper(reference_fields=["email"]).map_columns(df)
+    assert mapper.map_columns(df) == uncached
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # Changed values or another dataset are profiled anew
+    changed = df.with_columns(pl.lit("plain text").alias("site"))
+    assert SemanticTypeDetector().detect(changed, cache=cache, dataset="ds") == {"contact": "Email"}
+    SemanticTypeDetector().detect(df, cache=cache, dataset="other")
+    assert (cache.hits, cache.misses) == (3, 5)
@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from src.assistant.stages import Stage, run_stages
+
+
+def test_run_stages_passes_dependency_results():
+    stages = [
+        Stage("a", lambda r: 2),
+        Stage("b", lambda r: r["a"] * 10, deps=["a"]),
+        Stage("c", lambda r: r["a"] + r["b"], deps=["a", "b"]),
+    ]
+    results, timings = run_stages(stages)
+    assert results == {"a": 2, "b": 20, "c": 22}
+    assert set(timings) == {"a", "b", "c"}
+
+
+def test_run_stages_overlaps_independent_stages():
+    def sleepy(_):
+        time.sleep(0.2)
+        return True
+
+    stages = [Stage("root", lambda r: None)] + [Stage(f"s{i}", sleepy, deps=["root"]) for i in range(3)]
+    start = time.perf_counter()
+    run_stages(stages, max_workers=3)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_run_stages_rejects_cycles_and_unknown_deps():
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages([Stage("a", lambda r: 1, deps=["b"]), Stage("b", lambda r: 1, deps=["a"])])
+    with pytest.raises(ValueError, match="unknown"):
+        run_stages([Stage("a", lambda r: 1, deps=["missing"])])
+
+
+def test_run_stages_propagates_errors():
+    def boom(_):
+        raise RuntimeError("stage failed")
+
+    with pytest.raises(RuntimeError, match="stage failed"):
+        run_stages([Stage("a", boom), Stage("b", lambda r: 1)], max_workers=2)
@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+import polars as pl
+
+from src.assistant.datasource import DataSource, Dataset, LocalFilesDataSource
+from src.assistant.runner import MappingConfig, run_assistant
+
+
+class RecordingSource(DataSource):
+    def __init__(self, frames):
+        self.frames = frames
+        self.events = []
+
+    def iter_datasets(self):
+        for name, df in self.frames.items():
+            self.events.append(f"load:{name}")
+            yield Dataset(name=name, path=None, df=df)
+
+
+def test_local_schema_pass_reads_no_rows(tmp_path):
+    pl.DataFrame({"a": [1, 2], "b": ["x", "y"]}).write_parquet(tmp_path / "t.parquet")
+    (tmp_path / "c.csv").write_text("id,name\n1,foo\n2,bar\n")
+
+    ds = LocalFilesDataSource(root=tmp_path)
+    with patch("polars.read_parquet") as mock_read_parquet, patch("polars.read_csv") as mock_read_csv:
+        schemas = {s.name: s.columns for s in ds.iter_schemas()}
+
+    mock_read_parquet.assert_not_called()
+    mock_read_csv.assert_not_called()
+    assert schemas == {"t.parquet": ["a", "b"], "c.csv": ["id", "name"]}
+
+
+def test_run_assistant_processes_one_dataset_at_a_time():
+    source = RecordingSource({
+        "t1": pl.DataFrame({"customer_id": [1, 2, 3]}),
+        "t2": pl.DataFrame({"cust_id": [4, 5, 6]}),
+    })
+
+    def fake_run_on_dataset(dataset, mapping_cfg, *args, **kwargs):
+        source.events.append(f"analyse:{dataset.name}")
+        return dataset.name, sorted(mapping_cfg.reference_fields)
+
+    with patch("src.assistant.runner.run_on_dataset", side_effect=fake_run_on_dataset), \
+         patch("src.assistant.runner.AssistantReport") as mock_report:
+        run_assistant(source, MappingConfig(reference_fields=["email"]))
+
+    # Schema pass loads everything once, then the data pass interleaves load/analyse
+    assert source.events == [
+        "load:t1", "load:t2",
+        "load:t1", "analyse:t1",
+        "load:t2", "analyse:t2",
+    ]
+    reports = mock_report.call_args.kwargs["datasets"]
+    assert reports == [("t1", ["cust_id", "email"]), ("t2", ["customer_id", "email"])]
+
@@ -0,0 +1,95 @@
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+from src.assistant.datasource import LakehouseSQLDataSource
+from src.schema_recognition.inference.streaming_stats import StreamingProfile
+
+
+@pytest.fixture
+def table():
+    return pl.DataFrame({
+        "id": list(range(1000)),
+        "value": [None if i % 10 == 0 else float(i % 37) for i in range(1000)],
+        "label": ["" if i % 50 == 0 else f"l{i % 7}" for i in range(1000)],
+    })
+
+
+def _batches(df, size):
+    return [df.slice(i, size) for i in range(0, df.height, size)]
+
+
+def test_batched_stats_match_full_table(table):
+    profile = StreamingProfile()
+    for batch in _batches(table, 128):
+        profile.update(batch)
+    stats = profile.column_stats()
+
+    assert profile.row_count == 1000
+    assert stats["value"]["null_count"] == 100
+    assert stats["value"]["mean"] == pytest.approx(table["value"].mean())
+    assert stats["value"]["std"] == pytest.approx(table["value"].std())
+    assert stats["value"]["min"] == 0.0 and stats["value"]["max"] == 36.0
+    assert stats["value"]["zeros"] == (table["value"] == 0).sum()
+    assert stats["label"]["empty_count"] == 20
+    assert stats["label"]["n_unique"] == 8
+    assert stats["label"]["top_values"][0]["count"] == table["label"].value_counts()["count"].max()
+
+
+def test_merge_partitions_equals_single_pass(table):
+    left, right = StreamingProfile(), StreamingProfile()
+    left.update(table.head(300))
+    right.update(table.tail(700))
+    single = StreamingProfile()
+    single.update(table)
+    merged = left.merge(right).column_stats()
+    for col, stats in single.column_stats().items():
+        assert merged[col].keys() == stats.keys()
+        for key, value in stats.items():
+            if key in ("q1", "median", "q3"):
+                # Sketched quantiles are approximate; compare by rank
+                ranks = table[col].drop_nulls().sort().search_sorted([value, merged[col][key]]) / table[col].count()
+                assert abs(ranks[0] - ranks[1]) < 0.03
+                continue
+            assert merged[col][key] == (pytest.approx(value) if isinstance(value, float) else value)
+
+
+def test_nan_is_excluded_from_moments():
+    profile = StreamingProfile()
+    profile.update(pl.DataFrame({"x": [1.0, float("nan"), 3.0, None]}))
+    stats = profile.column_stats()["x"]
+    assert (stats["mean"], stats["min"], stats["max"]) == (2.0, 1.0, 3.0)
+    assert stats["median"] in (1.0, 3.0)
+    ref = profile.detector_reference()["columns"]["x"]
+    assert ref["std"] == pytest.approx(1.0)
+
+
+def test_profile_for_error_sizes_the_sketches():
+    from src.utils.sketches import k_for_error
+
+    profile = StreamingProfile.for_error(0.001)
+    assert profile.sketch_k == k_for_error(0.001)
+    profile.update(pl.DataFrame({"x": [1.0, 2.0]}))
+    assert profile.sketches["x"].k == k_for_error(0.001)
+    assert StreamingProfile.from_dict(profile.to_dict()).sketch_k == profile.sketch_k
+
+
+def test_high_cardinality_value_counts_are_dropped(table):
+    profile = StreamingProfile(max_distinct=50)
+    for batch in _batches(table, 100):
+        profile.update(batch)
+    stats = profile.column_stats()
+    assert "top_values" not in stats["id"]
+    assert "top_values" in stats["label"]
+
+
+def test_streaming_source_keeps_reservoir_and_exact_stats(table):
+    source = LakehouseSQLDataSource("grpc://x", schema="s", max_rows=50, streaming=True)
+    with patch.object(source, "_iter_record_batches", return_value=iter(_batches(table, 128))) as mock_iter:
+        ds = next(source._fetch_table("t"))
+    mock_iter.assert_called_once_with('SELECT * FROM s."t"')
+    assert ds.df.height == 50
+    assert ds.total_rows == 1000
+    assert ds.sampling == "random"
+    assert ds.column_stats["value"]["null_count"] == 100
@@ -95,3 +95,58 @@ def test_cli_schema_mode():
             schema="lakehouse.datalake.raw",
             max_rows=0
         )
+
+def test_schema_mode_prefetch_keeps_discovery_order():
+    """Concurrent fetches are yielded in discovery order, including failed tables."""
+    import threading
+    import time
+
+    names = [f"t{i}" for i in range(6)]
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def mock_exec(query):
+        if "INFORMATION_SCHEMA" in query:
+            return pl.DataFrame({"TABLE_NAME": names})
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        # Later tables finish first
+        time.sleep(0.01 * (6 - int(query.split('"t')[1][0])))
+        with lock:
+            active[0] -= 1
+        if '"t3"' in query:
+            raise Exception("table gone")
+        return pl.DataFrame({"col1": [1]})
+
+    with patch("src.assistant.datasource.LakehouseSQLDataSource._execute_query", side_effect=mock_exec):
+        ds = LakehouseSQLDataSource(connection_uri="mock_uri", schema="s", max_rows=10, prefetch=3)
+        datasets = list(ds.iter_datasets())
+
+    assert [d.name for d in datasets] == ["s.t0", "s.t1", "s.t2", "s.t3 (error)", "s.t4", "s.t5"]
+    assert 1 < peak[0] <= 3
+
+
+def test_schema_mode_prefetch_is_capped_at_pool_size():
+    """prefetch > pool size must not leave fetches waiting for a connection until they time out."""
+    import time
+    from src.connection.pool import ConnectionPool
+
+    names = [f"t{i}" for i in range(6)]
+    pool = ConnectionPool(MagicMock, max_size=2, acquire_timeout=0.5, ping=lambda conn: None)
+    in_use = []
+
+    def slow_read(query, connection):
+        if "INFORMATION_SCHEMA" in query:
+            return pl.DataFrame({"TABLE_NAME": names})
+        in_use.append(pool.metrics()["in_use"])
+        time.sleep(0.3)
+        return pl.DataFrame({"col1": [1]})
+
+    with patch("src.connection.pool.get_pool", return_value=pool), \
+         patch("polars.read_database", side_effect=slow_read):
+        ds = LakehouseSQLDataSource(connection_uri={"uri": "grpc://mock"}, schema="s", prefetch=6)
+        datasets = list(ds.iter_datasets())
+
+    assert [d.name for d in datasets] == [f"s.{n}" for n in names]
+    assert max(in_use) <= 2
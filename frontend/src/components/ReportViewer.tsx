@@ -1,6 +1,6 @@
 import { useState } from 'react';
 import { BarChart, FileText, AlertTriangle, CheckCircle, Database, ChevronDown, ChevronRight } from 'lucide-react';
-import type { AssistantReport } from '../services/api';
+import type { AssistantReport, DatasetReport } from '../services/api';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from './ui/Card';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from './ui/Tabs';
 import { Badge } from './ui/Badge';
@@ -9,11 +9,71 @@ import { InfoTooltip } from './ui/InfoTooltip';
 const ANOMALY_TOOLTIPS: Record<string, string> = {
     zscore: 'Z-Score Analysis: Flags individual numeric values that deviate extremely far (typically > 3 standard deviations) from the column mean.',
     iqr: 'Interquartile Range (IQR): Flags numeric values that fall exceptionally far outside the normal middle 50% distribution of the column.',
+    mad: 'Modified Z-Score: Like the Z-Score, but measured from the median in units of the median absolute deviation, so a few extreme values cannot hide each other. Suited to skewed columns.',
+    hampel: 'Hampel Filter: Flags values in ordered data (e.g. time series) that deviate strongly from the median of their neighbouring rows.',
     isolation_forest: 'Isolation Forest: A machine learning model that flags entire rows containing unusual combinations of values across multiple numeric columns.',
     categorical: 'Categorical Frequency: Flags rows containing extremely rare text categories or misspelled values that appear in a tiny fraction of the dataset.',
     missing_values: 'Missing Data: Flags rows that contain an unusually high proportion of entirely empty or null values across their columns.',
 };
 
+const TOP_ANOMALIES_PAGE_SIZE = 10;
+
+function TopAnomalies({ top }: { top: NonNullable<DatasetReport['top_anomalies']> }) {
+    const [page, setPage] = useState(0);
+    const pages = Math.ceil(top.rows.length / TOP_ANOMALIES_PAGE_SIZE);
+    const rows = top.rows.slice(page * TOP_ANOMALIES_PAGE_SIZE, (page + 1) * TOP_ANOMALIES_PAGE_SIZE);
+
+    return (
+        <div className="mb-6">
+            <div className="text-xs uppercase text-gray-400 font-semibold mb-2 flex items-center gap-1">
+                Top Anomalies
+                <InfoTooltip content="Rows flagged by at least one detector, ranked by the weighted mean of all detectors' normalised scores (0-1). Rows flagged by several methods rank highest." />
+            </div>
+            <div className="overflow-x-auto">
+                <table className="w-full text-left border-collapse">
+                    <thead>
+                        <tr className="border-b border-gray-700">
+                            <th className="p-1 text-[10px] font-mono text-gray-400">Row Idx</th>
+                            <th className="p-1 text-[10px] font-mono text-gray-400">Score</th>
+                            <th className="p-1 text-[10px] font-mono text-gray-400">Methods</th>
+                            <th className="p-1 text-[10px] font-mono text-gray-400">Values</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {rows.map(row => (
+                            <tr key={row.row} className="border-b border-gray-800/50">
+                                <td className="p-1 text-[10px] font-mono text-gray-300">{row.row}</td>
+                                <td className="p-1 text-[10px] font-mono text-red-400">{row.score.toFixed(3)}</td>
+                                <td className="p-1">
+                                    <div className="flex flex-wrap gap-1">
+                                        {row.methods.map(m => (
+                                            <Badge key={m} variant="secondary" className="text-[10px]">{m}</Badge>
+                                        ))}
+                                    </div>
+                                </td>
+                                <td className="p-1 text-[10px] font-mono text-gray-400 max-w-[300px] truncate" title={JSON.stringify(row.values)}>
+                                    {Object.entries(row.values).slice(0, 4).map(([k, v]) => `${k}=${String(v)}`).join(', ')}
+                                </td>
+                            </tr>
+                        ))}
+                    </tbody>
+                </table>
+            </div>
+            {pages > 1 && (
+                <div className="flex items-center justify-end gap-2 mt-2 text-[10px] text-gray-400">
+                    <button className="px-2 py-0.5 rounded border border-gray-700 disabled:opacity-40" disabled={page === 0} onClick={() => setPage(p => p - 1)}>
+                        Prev
+                    </button>
+                    <span>{page + 1} / {pages}</span>
+                    <button className="px-2 py-0.5 rounded border border-gray-700 disabled:opacity-40" disabled={page >= pages - 1} onClick={() => setPage(p => p + 1)}>
+                        Next
+                    </button>
+                </div>
+            )}
+        </div>
+    );
+}
+
 export default function ReportViewer({ report }: { report: AssistantReport | null }) {
     const [expandedDatasets, setExpandedDatasets] = useState<Record<number, boolean>>({});
 
@@ -290,17 +350,23 @@ export default function ReportViewer({ report }: { report: AssistantReport | nul
                                                         <InfoTooltip content={ANOMALY_TOOLTIPS[method.toLowerCase()] || `Anomaly detection method: ${method}`} />
                                                     </div>
                                                     <div className="text-2xl font-bold text-red-400">{count}</div>
-                                                    {dataset.anomaly_rows?.[method] && dataset.anomaly_rows[method].length > 0 && (
-                                                        <div className="text-[10px] text-gray-400 mt-2 mb-1 font-mono break-all leading-tight">
-                                                            <span className="font-semibold text-gray-500">Row Idx:</span>{' '}
-                                                            {(() => {
-                                                                const rows = dataset.anomaly_rows![method].slice().sort((a, b) => a - b);
-                                                                const preview = rows.slice(0, 10).join(', ');
-                                                                const remaining = rows.length - 10;
-                                                                return remaining > 0 ? `${preview}, ... (+${remaining})` : preview;
-                                                            })()}
-                                                        </div>
-                                                    )}
+                                                    {(() => {
+                                                        // Large row sets arrive encoded, with their first rows inline
+                                                        const encoded = dataset.anomaly_rows_encoded?.[method];
+                                                        const rows = encoded
+                                                            ? encoded.head
+                                                            : (dataset.anomaly_rows?.[method] ?? []).slice().sort((a, b) => a - b);
+                                                        const total = encoded ? encoded.count : rows.length;
+                                                        if (total === 0) return null;
+                                                        const preview = rows.slice(0, 10).join(', ');
+                                                        const remaining = total - Math.min(rows.length, 10);
+                                                        return (
+                                                            <div className="text-[10px] text-gray-400 mt-2 mb-1 font-mono break-all leading-tight">
+                                                                <span className="font-semibold text-gray-500">Row Idx:</span>{' '}
+                                                                {remaining > 0 ? `${preview}, ... (+${remaining})` : preview}
+                                                            </div>
+                                                        );
+                                                    })()}
                                                     {dataset.anomaly_samples_saved?.[method] && (
                                                         <div className="text-[10px] text-gray-500 mt-1 truncate flex items-center gap-1">
                                                             <Database className="h-3 w-3" /> Saved to CSV
@@ -345,6 +411,10 @@ export default function ReportViewer({ report }: { report: AssistantReport | nul
                                             ))}
                                         </div>
 
+                                        {dataset.top_anomalies && dataset.top_anomalies.rows.length > 0 && (
+                                            <TopAnomalies top={dataset.top_anomalies} />
+                                        )}
+
                                         {/* AI Anomaly Explanation */}
                                         {dataset.llm_insights?.anomaly_explanation && (
                                             <div className="mb-6 p-4 bg-red-900/20 border border-red-800/50 rounded-lg">
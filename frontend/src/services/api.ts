@@ -47,7 +47,25 @@ export interface RunRequest {
         contamination?: number;
         n_estimators?: number;
         random_state?: number;
+        max_workers?: number;
+        executor?: 'thread' | 'process';
+        iqr_backend?: 'exact' | 'sketch';
+        quantile_error?: number;
+        use_mad?: boolean;
+        mad_threshold?: number;
+        use_hampel?: boolean;
+        hampel_window?: number;
+        hampel_threshold?: number;
+        hampel_order_by?: string;
+        isoforest_max_samples?: number | null;
+        isoforest_n_jobs?: number;
+        top_anomalies?: number;
+        ensemble_weights?: Record<string, number> | null;
+        inline_rows_limit?: number;
+        nested_fields?: boolean;
     };
+    use_cache?: boolean;
+    incremental?: boolean;
 }
 
 export interface DatasetReport {
@@ -63,8 +81,18 @@ export interface DatasetReport {
         text_stats?: Record<string, { unique_count: number; top_values: Array<{ value: string; count: number }> }>;
         row_count: number;
         col_count: number;
+        source_row_count?: number;
     };
     nested_structures: string[];
+    // Field path -> profile of List/Struct columns and their fields
+    nested_profile?: Record<string, {
+        dtype: string;
+        depth: number;
+        in_list: boolean;
+        values: number;
+        nulls: number;
+        list_length?: { min: number | null; max: number | null; mean: number | null };
+    }>;
     categorical_cols: string[];
     llm_insights: {
         descriptions: Record<string, string>;
@@ -77,7 +105,25 @@ export interface DatasetReport {
     anomalies: Record<string, number>;
     anomaly_samples_saved: Record<string, string | null>;
     anomaly_rows?: Record<string, number[]>;
+    // Large row sets, run-length/varint encoded (saved reports page them via /reports/{id}/anomaly_rows)
+    anomaly_rows_encoded?: Record<string, { encoding: string; count: number; head: number[]; data: string }> | null;
     anomaly_previews?: Record<string, Array<Record<string, any>>>;
+    top_anomalies?: {
+        detectors: string[];
+        weights: Record<string, number>;
+        rows: Array<{ row: number; score: number; methods: string[]; scores: number[]; values: Record<string, any> }>;
+    } | null;
+    stage_timings?: Record<string, number>;
+    sampling?: { strategy: string; sample_rows: number; total_rows: number; fraction: number } | null;
+    anomaly_estimates?: Record<string, { estimate: number; ci_low: number; ci_high: number }> | null;
+    cached?: boolean;
+    incremental?: {
+        watermark_column: string | null;
+        previous_watermark: string | number | null;
+        watermark: string | number | null;
+        new_rows: number;
+        total_rows: number;
+    } | null;
 }
 
 export interface AssistantReport {